@@ -0,0 +1,1405 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 09:12:41 2026
+
+Benchmarks for the file_io parsing and writing paths. Each benchmark writes synthetic
+TOA5 / EddyPro files to a temporary directory, times the current and legacy
+(or alternative) code paths on them and checks that the outputs agree.
+Benchmarks are run from the command line by name, e.g.:
+
+    python benchmarks.py date_parsing --n_rows 1000000
+"""
+
+import argparse as ap
+import os
+import pathlib
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import file_handler as fh
+import file_io as io
+import tob3_decoder as tob3
+
+#------------------------------------------------------------------------------
+### SYNTHETIC FILE CONSTRUCTORS ###
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def write_synthetic_TOA5(
+        abs_file_path: str | pathlib.Path, n_rows: int, n_cols: int=10,
+        freq: str='30min', n_bad_dates: int=0, n_dropped: int=0,
+        truncate_last_line: bool=False
+        ):
+    """Write a synthetic TOA5 file.
+
+    Args:
+        abs_file_path: absolute path (including file name) to write to.
+        n_rows: number of data records.
+        n_cols: number of numeric variables.
+        freq: the time step of the records.
+        n_bad_dates: number of records (evenly spaced) with malformed
+            timestamps.
+        n_dropped: number of records (randomly chosen) to drop, leaving gaps.
+        truncate_last_line: cut the final line after its third field (as for
+            a line that is still being written).
+
+    Returns:
+        None.
+
+    """
+
+    rng = np.random.default_rng(0)
+    index = pd.date_range(start='2020-01-01 00:30', periods=n_rows, freq=freq)
+    variables = [f'var_{i}' for i in range(n_cols)]
+    data = pd.DataFrame(
+        data=rng.normal(size=(n_rows, n_cols)).round(4),
+        index=index,
+        columns=variables
+        )
+    data.iloc[::97, 0] = np.nan
+    if n_dropped:
+        data = data.drop(
+            data.index[rng.choice(n_rows, size=n_dropped, replace=False)]
+            )
+    data = io.reformat_data(data=data, output_format='TOA5')
+    if n_bad_dates:
+        bad_locs = np.linspace(0, n_rows - 1, n_bad_dates).astype(int)
+        data.iloc[bad_locs, 0] = 'bad_date'
+    headers = pd.DataFrame(
+        data={'units': 'arb', 'sampling': 'Avg'},
+        index=pd.Index(variables, name='variable')
+        )
+    io.write_data_to_file(
+        headers=io.reformat_headers(headers=headers, output_format='TOA5'),
+        data=data,
+        abs_file_path=abs_file_path,
+        output_format='TOA5'
+        )
+    if truncate_last_line:
+        with open(abs_file_path, 'rb+') as f:
+            text = f.read()
+            start = text.rstrip(b'\n').rfind(b'\n') + 1
+            cut = start + len(b','.join(text[start:].split(b',')[:3]))
+            f.truncate(cut)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def write_synthetic_EddyPro(
+        abs_file_path: str | pathlib.Path, n_rows: int, n_cols: int=10,
+        freq: str='30min'
+        ):
+    """Write a synthetic EddyPro file.
+
+    Args:
+        abs_file_path: absolute path (including file name) to write to.
+        n_rows: number of data records.
+        n_cols: number of numeric variables.
+        freq: the time step of the records.
+
+    Returns:
+        None.
+
+    """
+
+    rng = np.random.default_rng(0)
+    index = pd.date_range(start='2020-01-01 00:30', periods=n_rows, freq=freq)
+    variables = [f'var_{i}' for i in range(n_cols)]
+    data = pd.DataFrame(
+        data=rng.normal(size=(n_rows, n_cols)).round(4),
+        index=index,
+        columns=variables
+        )
+    headers = pd.DataFrame(
+        data={'units': '[arb]'}, index=pd.Index(variables, name='variable')
+        )
+    io.write_data_to_file(
+        headers=io.reformat_headers(headers=headers, output_format='EddyPro'),
+        data=io.reformat_data(data=data, output_format='EddyPro'),
+        abs_file_path=abs_file_path,
+        output_format='EddyPro'
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def write_synthetic_TOB3(
+        abs_file_path: str | pathlib.Path, n_rows: int,
+        freq_hz: int=10, records_per_frame: int=10,
+        n_invalid_frames: int=0, shuffle_frames: bool=False
+        ) -> pd.DataFrame:
+    """Write a synthetic TOB3 file (IEEE4, FP2, ULONG and BOOL fields). If
+    the records do not fill the last frame, it is written as a minor frame.
+
+    Args:
+        abs_file_path: absolute path (including file name) to write to.
+        n_rows: number of data records.
+        freq_hz: the sampling frequency of the records.
+        records_per_frame: number of records in a full frame.
+        n_invalid_frames: number of frames (evenly spaced) with a bad
+            validation stamp, the records of which are not expected back.
+        shuffle_frames: whether to write the frames out of time order (as
+            after a ring memory wrap).
+
+    Returns:
+        The data expected from decoding the file.
+
+    """
+
+    rng = np.random.default_rng(0)
+    stamp = 0x1A2B
+    interval_ms = 1000 // freq_hz
+    start_ns = (
+        (pd.Timestamp('2024-01-01') - pd.Timestamp('1990-01-01')).value
+        )
+    fields = {
+        'Ux': 'IEEE4', 'Uy': 'IEEE4', 'Uz': 'IEEE4', 'Ts': 'IEEE4',
+        'CO2_density': 'FP2', 'H2O_density': 'FP2', 'diag_csat': 'ULONG',
+        'flag': 'BOOL'
+        }
+    record_dtype = tob3.get_record_dtype(data_types=list(fields.values()))
+
+    # Build records (FP2 encoded from random sign, exponent and mantissa)
+    records = np.zeros(n_rows, dtype=record_dtype)
+    expected = {}
+    for i, (name, data_type) in enumerate(fields.items()):
+        if data_type == 'IEEE4':
+            values = rng.normal(size=n_rows).astype('f4')
+            values[::101] = np.nan
+            records[f'f{i}'] = values
+        elif data_type == 'FP2':
+            sign = rng.integers(0, 2, n_rows)
+            exponent = rng.integers(0, 4, n_rows)
+            mantissa = rng.integers(0, 8190, n_rows)
+            words = (sign << 15) | (exponent << 13) | mantissa
+            values = (1 - 2 * sign) * mantissa / 10.0**exponent
+            words[::103], values[::103] = 0x9FFE, np.nan
+            records[f'f{i}'] = words
+        elif data_type == 'ULONG':
+            values = rng.integers(0, 2**32, n_rows).astype('u4')
+            records[f'f{i}'] = values
+        else:
+            values = rng.integers(0, 2, n_rows).astype('u1')
+            records[f'f{i}'] = values
+        expected[name] = values
+    record_nums = np.arange(n_rows)
+    expected = pd.DataFrame(
+        data={'RECORD': record_nums, **expected},
+        index=pd.DatetimeIndex(
+            pd.Timestamp('2024-01-01') +
+            pd.to_timedelta(record_nums * interval_ms, unit='ms'),
+            name='TIMESTAMP'
+            )
+        )
+
+    # Build frames
+    record_bytes = record_dtype.itemsize
+    frame_bytes = 16 + records_per_frame * record_bytes
+    frames = []
+    for first in range(0, n_rows, records_per_frame):
+        chunk = records[first: first + records_per_frame]
+        frame_ns = start_ns + first * interval_ms * 10**6
+        frame_header = np.array(
+            [frame_ns // 10**9, frame_ns % 10**9 // 10**5, first], dtype='<u4'
+            ).tobytes()
+        size = 16 + len(chunk) * record_bytes
+        footer = stamp << 16
+        if len(chunk) < records_per_frame:
+            footer |= (1 << 14) | size
+        body = frame_header + chunk.tobytes() + np.array(
+            [footer], dtype='<u4'
+            ).tobytes()
+        frames.append(bytes(frame_bytes - size) + body)
+    keep = np.ones(len(frames), dtype=bool)
+    if n_invalid_frames:
+        bad_locs = np.linspace(0, len(frames) - 1, n_invalid_frames).astype(int)
+        for loc in bad_locs:
+            frames[loc] = frames[loc][:-2] + bytes(2)
+        keep[bad_locs] = False
+        expected = expected[np.repeat(keep, records_per_frame)[:n_rows]]
+    if shuffle_frames:
+        frames = [frames[i] for i in rng.permutation(len(frames))]
+
+    # Write header and frames
+    header_lines = [
+        ['TOB3', 'TestSite', 'CR3000', '9999', 'CR3000.Std.32',
+         'CPU:test.CR3', '9999', '2024-01-01 00:00:00'],
+        ['ts_data', f'{interval_ms} MSEC', str(frame_bytes), '864000',
+         str(stamp), 'Sec100Usec', '0', '0', '0'],
+        list(fields.keys()),
+        ['m/s', 'm/s', 'm/s', 'C', 'mmol/m^3', 'mmol/m^3', '', ''],
+        ['Smp'] * len(fields),
+        list(fields.values())
+        ]
+    with open(abs_file_path, 'wb') as f:
+        for line in header_lines:
+            f.write(
+                (','.join(f'"{elem}"' for elem in line) + '\r\n').encode()
+                )
+        f.write(b''.join(frames))
+    return expected
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+### UTILITIES ###
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _time_it(func, n_repeats: int=3, **kwargs) -> tuple:
+    """Time a function call (best of n_repeats).
+
+    Args:
+        func: the function to time.
+        n_repeats: the number of repeats.
+        kwargs: passed to func.
+
+    Returns:
+        The best time in seconds, and the result of the last call.
+
+    """
+
+    times = []
+    for i in range(n_repeats):
+        start = time.perf_counter()
+        rslt = func(**kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times), rslt
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_get_data(
+        file: str | pathlib.Path, file_type: str
+        ) -> pd.core.frame.DataFrame:
+    """Replica of the original get_data path (combined parse_dates with
+    format inference, and coercion of any unparsed dates afterwards).
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        File data content.
+
+    """
+
+    configs = io.FILE_CONFIGS[file_type]
+    time_vars = list(configs['time_variables'].keys())
+    rows_to_skip = list(set([0] + list(configs['header_lines'].values())))
+    rows_to_skip.remove(configs['header_lines']['variable'])
+    return (
+        pd.read_csv(
+            file,
+            skiprows=rows_to_skip,
+            parse_dates={'DATETIME': time_vars},
+            keep_date_col=True,
+            na_values=configs['na_values'],
+            sep=configs['separator'],
+            engine='c',
+            on_bad_lines='warn',
+            low_memory=False
+            )
+        .set_index(keys='DATETIME')
+        .astype({x: object for x in time_vars})
+        .pipe(io._integrity_checks, non_numeric=configs['non_numeric_cols'])
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_coerce_numeric(
+        df: pd.core.frame.DataFrame, non_numeric: list
+        ) -> pd.core.frame.DataFrame:
+    """Replica of the original column-by-column numeric coercion in
+    _integrity_checks.
+
+    Args:
+        df: dataframe containing the data.
+        non_numeric: column names to ignore when coercing to numeric type.
+
+    Returns:
+        The coerced data.
+
+    """
+
+    non_nums = df.select_dtypes(include='object')
+    for col in non_nums.columns:
+        if col in non_numeric: continue
+        df[col] = pd.to_numeric(non_nums[col], errors='coerce')
+    return df
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_format_dates(index: pd.DatetimeIndex, file_type: str) -> dict:
+    """Replica of the original row-by-row timestamp formatting in
+    _TOA5ify_data / _EPify_data.
+
+    Args:
+        index: the index to format.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The formatted timestamp strings by time variable.
+
+    """
+
+    formatter = io.get_formatter(file_type=file_type, which='write_date')
+    date_series = pd.Series(index.to_pydatetime(), index=index)
+    if file_type == 'TOA5':
+        return {'TIMESTAMP': date_series.apply(formatter)}
+    return {
+        var: date_series.apply(formatter, which=var)
+        for var in io.FILE_CONFIGS[file_type]['time_variables'].keys()
+        }
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_count_lines(file: str | pathlib.Path) -> int:
+    """Replica of the original line-by-line count in get_file_n_lines.
+
+    Args:
+        file: absolute path of file to parse.
+
+    Returns:
+        The number of lines.
+
+    """
+
+    with open(file, 'rb') as f:
+        return sum(1 for _ in f)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_get_end_date(f, file_type: str):
+    """Replica of the original byte-at-a-time backward search for the last
+    valid date in get_start_end_dates.
+
+    Args:
+        f: file object opened in binary mode.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The last valid date.
+
+    """
+
+    line_formatter = io.get_formatter(file_type=file_type, which='read_line')
+    date_formatter = io.get_formatter(file_type=file_type, which='read_date')
+    f.seek(2, os.SEEK_END)
+    while True:
+        try:
+            if f.read(1) == b'\n':
+                pos = f.tell()
+                try:
+                    return date_formatter(line_formatter(f.readline().decode()))
+                except ValueError:
+                    f.seek(pos - f.tell(), os.SEEK_CUR)
+            f.seek(-2, os.SEEK_CUR)
+        except OSError:
+            return None
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _block_get_end_date(f, file_type: str):
+    """Backward search for the last valid date using the block-based reverse
+    line iterator (as in get_start_end_dates).
+
+    Args:
+        f: file object opened in binary mode.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The last valid date.
+
+    """
+
+    line_formatter = io.get_formatter(file_type=file_type, which='read_line')
+    date_formatter = io.get_formatter(file_type=file_type, which='read_date')
+    for line in io.iter_lines_reversed(f):
+        try:
+            return date_formatter(line_formatter(line.decode()))
+        except (ValueError, IndexError):
+            continue
+    return None
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _legacy_gap_analysis(handler: fh.DataHandler) -> tuple:
+    """Replica of the original per-delta gap analysis of the DataHandler
+    (apply over every timestamp delta, a list comprehension over unique gap
+    sizes and an iloc slice per gap).
+
+    Args:
+        handler: the DataHandler to analyse.
+
+    Returns:
+        The missing records, the gap bounds and the gap distribution.
+
+    """
+
+    data = handler._get_non_duplicate_data()
+    data = data.drop('TIMESTAMP', axis=1, errors='ignore')
+    data = data.reset_index()['DATETIME']
+    gap_series = (
+        (data - data.shift())
+        .astype('timedelta64[s]')
+        .dropna()
+        .apply(lambda x: x.total_seconds() / (60 * handler.interval))
+        .astype(int)
+        .rename('n_records')
+        )
+    gap_series = gap_series[gap_series!=1]
+    complete_index = pd.date_range(
+        start=data.iloc[0], end=data.iloc[-1], freq=f'{handler.interval}min'
+        )
+    n_missing = len(complete_index) - len(data)
+    missing = {
+        'n_missing': n_missing,
+        '%_missing': round(n_missing / len(complete_index) * 100, 2),
+        }
+    bounds = pd.concat(
+        [
+            gap_series.reset_index().n_records,
+            pd.DataFrame(
+                data=[
+                    data.iloc[x-1: x+1].astype(str).tolist()
+                    for x in gap_series.index
+                    ],
+                columns=['last_preceding', 'first_succeeding']
+                )
+            ],
+        axis=1
+        )
+    unique_gaps = gap_series.unique()
+    counts = [len(gap_series[gap_series==x]) for x in unique_gaps]
+    distribution = (
+        pd.DataFrame(
+            data=zip(unique_gaps - 1, counts),
+            columns=['n_records', 'count']
+            )
+        .set_index(keys='n_records')
+        .sort_index()
+        )
+    return missing, bounds, distribution
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+class _CountingFile():
+    """Proxy for a binary file object that counts the calls that hit the file
+    (read, readline and seek)."""
+
+    def __init__(self, f):
+
+        self._f = f
+        self.n_calls = 0
+
+    def read(self, *args):
+
+        self.n_calls += 1
+        return self._f.read(*args)
+
+    def readline(self, *args):
+
+        self.n_calls += 1
+        return self._f.readline(*args)
+
+    def seek(self, *args):
+
+        self.n_calls += 1
+        return self._f.seek(*args)
+
+    def tell(self):
+
+        return self._f.tell()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+### BENCHMARKS ###
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_date_parsing(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare the fixed-format timestamp parser in get_data with the legacy
+    combined parse_dates path.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+
+    Returns:
+        Timings (s) by file type and path.
+
+    """
+
+    cases = {
+        'TOA5': ('TOA5', write_synthetic_TOA5, {}),
+        'TOA5 (malformed dates)': (
+            'TOA5', write_synthetic_TOA5, {'n_bad_dates': 10}
+            ),
+        'EddyPro': ('EddyPro', write_synthetic_EddyPro, {})
+        }
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case, (file_type, writer, kwargs) in cases.items():
+            file = pathlib.Path(tmp_dir) / f'{case}.dat'
+            writer(abs_file_path=file, n_rows=n_rows, **kwargs)
+            legacy_time, legacy_df = _time_it(
+                _legacy_get_data, file=file, file_type=file_type
+                )
+            fast_time, fast_df = _time_it(
+                io.get_data, file=file, file_type=file_type, use_cache=False
+                )
+            if not legacy_df.index.equals(fast_df.index):
+                raise RuntimeError(f'{case} date parsing paths disagree!')
+            rslt[case] = {
+                'legacy': legacy_time,
+                'fast': fast_time,
+                'speedup': legacy_time / fast_time
+                }
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_reverse_read(
+        n_rows: int=10**4, n_cols: int=150, n_garbage_lines: int=20
+        ) -> pd.DataFrame:
+    """Compare the number of file calls and time taken to find the last
+    valid record of a wide EddyPro file with trailing garbage, using the
+    legacy byte-at-a-time search and the block-based reverse iterator.
+
+    Args:
+        n_rows: number of records in the synthetic file.
+        n_cols: number of numeric variables (i.e. line length).
+        n_garbage_lines: number of undated lines appended to the file.
+
+    Returns:
+        File calls and timings (s) by path.
+
+    """
+
+    funcs = {'legacy': _legacy_get_end_date, 'block': _block_get_end_date}
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'EddyPro.txt'
+        write_synthetic_EddyPro(abs_file_path=file, n_rows=n_rows, n_cols=n_cols)
+        with open(file, 'a') as f:
+            for i in range(n_garbage_lines):
+                f.write('\t'.join(['garbage'] * n_cols) + '\n')
+        for name, func in funcs.items():
+            with open(file, 'rb') as f:
+                counting_file = _CountingFile(f)
+                run_time, end_date = _time_it(
+                    func, n_repeats=1, f=counting_file, file_type='EddyPro'
+                    )
+            rslt[name] = {
+                'file_calls': counting_file.n_calls,
+                'time': run_time,
+                'end_date': end_date
+                }
+    if not rslt['legacy']['end_date'] == rslt['block']['end_date']:
+        raise RuntimeError('Reverse read paths disagree!')
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_dtype_policy(n_rows: int=10**5, n_cols: int=100) -> pd.DataFrame:
+    """Compare the resident memory of data parsed with the default and compact
+    dtype policies, and check that the formatted output is unchanged.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+        n_cols: number of numeric variables.
+
+    Returns:
+        Memory (MB) by file type and policy.
+
+    """
+
+    cases = {
+        'TOA5': write_synthetic_TOA5,
+        'EddyPro': write_synthetic_EddyPro
+        }
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_type, writer in cases.items():
+            file = pathlib.Path(tmp_dir) / f'{file_type}.dat'
+            writer(abs_file_path=file, n_rows=n_rows, n_cols=n_cols)
+            dfs = {
+                policy: io.get_data(
+                    file=file, file_type=file_type, use_cache=False,
+                    dtype_policy=policy
+                    )
+                for policy in ['default', 'compact']
+                }
+            outputs = [
+                io.reformat_data(data=df, output_format=file_type).to_csv()
+                for df in dfs.values()
+                ]
+            if not outputs[0] == outputs[1]:
+                raise RuntimeError(f'{file_type} dtype policies disagree!')
+            memory = {
+                policy: df.memory_usage(deep=True).sum() / 10**6
+                for policy, df in dfs.items()
+                }
+            rslt[file_type] = memory | {
+                'reduction': memory['default'] / memory['compact']
+                }
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_reader_engines(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare the throughput of the pandas C and pyarrow reader engines, and
+    check that they return identical data (values compared exactly) with and
+    without a column subset.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+
+    Returns:
+        Throughput (records / s) by file type and engine.
+
+    """
+
+    io._check_engine(engine='pyarrow')
+    cases = {
+        'TOA5': ('TOA5', write_synthetic_TOA5, {}),
+        'TOA5 (malformed dates)': (
+            'TOA5', write_synthetic_TOA5, {'n_bad_dates': 10}
+            ),
+        'TOA5 (half-written final line)': (
+            'TOA5', write_synthetic_TOA5, {'truncate_last_line': True}
+            ),
+        'EddyPro': ('EddyPro', write_synthetic_EddyPro, {})
+        }
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case, (file_type, writer, kwargs) in cases.items():
+            file = pathlib.Path(tmp_dir) / f'{case}.dat'
+            writer(abs_file_path=file, n_rows=n_rows, **kwargs)
+            for usecols in [None, ['var_1', 'var_3']]:
+                dfs = [
+                    io.get_data(
+                        file=file, file_type=file_type, usecols=usecols,
+                        use_cache=False, engine=engine
+                        )
+                    for engine in io.READER_ENGINES
+                    ]
+                try:
+                    pd.testing.assert_frame_equal(*dfs, check_exact=True)
+                except AssertionError as e:
+                    raise RuntimeError(f'{case} reader engines disagree!') from e
+            rslt[case] = {}
+            for engine in io.READER_ENGINES:
+                run_time, _ = _time_it(
+                    io.get_data, file=file, file_type=file_type,
+                    use_cache=False, engine=engine
+                    )
+                rslt[case][engine] = n_rows / run_time
+            rslt[case]['speedup'] = rslt[case]['pyarrow'] / rslt[case]['c']
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_numeric_coercion(
+        n_rows: int=10**5, n_cols: int=150
+        ) -> pd.DataFrame:
+    """Compare the single-pass numeric coercion in _integrity_checks with the
+    legacy column-by-column coercion, on a wide EddyPro file in which every
+    numeric column holds a stray string.
+
+    Args:
+        n_rows: number of records in the synthetic file.
+        n_cols: number of numeric variables.
+
+    Returns:
+        Timings (s) by path, and the number of coerced cells reported.
+
+    """
+
+    non_numeric = io.FILE_CONFIGS['EddyPro']['non_numeric_cols']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'EddyPro.txt'
+        write_synthetic_EddyPro(abs_file_path=file, n_rows=n_rows, n_cols=n_cols)
+        with open(file, 'a') as f:
+            f.write('\t'.join(
+                ['DATA', 'none', '2030-01-01', '00:00'] + ['INF?'] * n_cols
+                ) + '\n')
+        raw = pd.read_csv(
+            file, skiprows=[1], sep='\t', low_memory=False,
+            na_values=io.FILE_CONFIGS['EddyPro']['na_values']
+            )
+    legacy_time, legacy_df = _time_it(
+        lambda: _legacy_coerce_numeric(df=raw.copy(), non_numeric=non_numeric)
+        )
+    fast_time, (fast_df, report) = _time_it(
+        lambda: io._coerce_numeric(df=raw.copy(), non_numeric=non_numeric)
+        )
+    try:
+        pd.testing.assert_frame_equal(legacy_df, fast_df, check_exact=True)
+    except AssertionError as e:
+        raise RuntimeError('Numeric coercion paths disagree!') from e
+    return pd.DataFrame({
+        'legacy': {'time': legacy_time, 'coerced_cells': None},
+        'fast': {'time': fast_time, 'coerced_cells': len(report)}
+        }).T
+#------------------------------------------------------------------------------
+def benchmark_writer(
+        n_rows: int=5 * 17520, n_cols: int=100, float_precision: int=6
+        ) -> pd.DataFrame:
+    """Compare the throughput of the legacy (DataFrame.to_csv) and bulk
+    (fixed decimal places) writers for a wide TOA5 frame (default 5 years of
+    30-min data), and of appending the final day to an existing file. Checks
+    that the bulk output parses back to the same values, that the appended
+    file is identical to the one written in full and that appending is
+    refused if the last existing record has been revised (only the last
+    APPEND_CHECK_RECORDS records of the file are compared on append).
+
+    Args:
+        n_rows: number of records to write.
+        n_cols: number of numeric variables.
+        float_precision: number of decimal places for the bulk writer.
+
+    Returns:
+        Throughput (records / s) by path.
+
+    """
+
+    rng = np.random.default_rng(0)
+    variables = [f'var_{i}' for i in range(n_cols)]
+    data = pd.DataFrame(
+        data=rng.normal(scale=100, size=(n_rows, n_cols)),
+        index=pd.date_range(
+            start='2020-01-01 00:30', periods=n_rows, freq='30min'
+            ),
+        columns=variables
+        )
+    data.iloc[::97, 0] = np.nan
+    data = io.reformat_data(data=data, output_format='TOA5')
+    headers = io.reformat_headers(
+        headers=pd.DataFrame(
+            data={'units': 'arb', 'sampling': 'Avg'},
+            index=pd.Index(variables, name='variable')
+            ),
+        output_format='TOA5'
+        )
+    n_append = 48
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = {
+            path: pathlib.Path(tmp_dir) / f'{path}.dat'
+            for path in ['legacy', 'bulk', 'append']
+            }
+        for path, precision in {
+                'legacy': None, 'bulk': float_precision
+                }.items():
+            run_time, _ = _time_it(
+                io.write_data_to_file, headers=headers, data=data,
+                abs_file_path=files[path], float_precision=precision
+                )
+            rslt[path] = n_rows / run_time
+        io.write_data_to_file(
+            headers=headers, data=data.iloc[:-n_append],
+            abs_file_path=files['append']
+            )
+        run_time, _ = _time_it(
+            io.write_data_to_file, n_repeats=1, headers=headers, data=data,
+            abs_file_path=files['append'], append=True
+            )
+        rslt['append'] = n_append / run_time
+        dfs = [
+            io.get_data(file=files[path], file_type='TOA5', use_cache=False)
+            for path in ['legacy', 'bulk']
+            ]
+        try:
+            pd.testing.assert_frame_equal(
+                *dfs, check_exact=False, rtol=0,
+                atol=10**-float_precision
+                )
+        except AssertionError as e:
+            raise RuntimeError('Legacy and bulk writers disagree!') from e
+        if not files['append'].read_bytes() == files['legacy'].read_bytes():
+            raise RuntimeError('Appended file differs from full write!')
+        revised = data.copy()
+        revised.iloc[-n_append - 1, 1] += 1
+        try:
+            io.write_data_to_file(
+                headers=headers, data=revised, abs_file_path=files['append'],
+                append=True
+                )
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError('Revised record was not detected on append!')
+    return pd.DataFrame({'records_per_s': rslt})
+#------------------------------------------------------------------------------
+def benchmark_date_formatting(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare the bulk (and cached) timestamp formatting in reformat_data
+    with the legacy row-by-row formatting, and check that the formatted
+    strings are identical.
+
+    Args:
+        n_rows: number of records to format.
+
+    Returns:
+        Timings (s) by file type and path.
+
+    """
+
+    index = pd.date_range(
+        start='2020-01-01 00:30', periods=n_rows, freq='30min'
+        )
+    data = pd.DataFrame(data={'var_0': np.zeros(n_rows)}, index=index)
+    rslt = {}
+    for file_type in io.FILE_CONFIGS.keys():
+        legacy_time, legacy = _time_it(
+            _legacy_format_dates, n_repeats=1, index=index, file_type=file_type
+            )
+        io.DATE_STRING_CACHE['entries'].clear()
+        bulk_time, bulk = _time_it(
+            io.reformat_data, n_repeats=1, data=data, output_format=file_type
+            )
+        cached_time, _ = _time_it(
+            io.reformat_data, data=data.iloc[1:], output_format=file_type
+            )
+        for var, series in legacy.items():
+            if not series.tolist() == bulk[var].tolist():
+                raise RuntimeError(f'{file_type} {var} formatting disagrees!')
+        rslt[file_type] = {
+            'legacy': legacy_time, 'bulk': bulk_time, 'cached': cached_time
+            }
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+def benchmark_line_counting(
+        n_rows: int=10**6, max_estimate_error: float=0.01
+        ) -> pd.DataFrame:
+    """Compare the legacy line-by-line count with the block newline count in
+    get_file_n_lines and with estimate_n_records. Checks that the counts
+    agree and that the estimate is within max_estimate_error (relative) of
+    the count.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+        max_estimate_error: the tolerated relative error of the estimate.
+
+    Returns:
+        Timings (s) and record counts by file type and path.
+
+    """
+
+    cases = {
+        'TOA5': write_synthetic_TOA5,
+        'EddyPro': write_synthetic_EddyPro
+        }
+    paths = {
+        'legacy': _legacy_count_lines,
+        'block': lambda file: io.get_file_n_lines(file=file),
+        'estimate': lambda file: io.estimate_n_records(file=file)
+        }
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_type, writer in cases.items():
+            file = pathlib.Path(tmp_dir) / f'{file_type}.dat'
+            writer(abs_file_path=file, n_rows=n_rows)
+            n_header_lines = max(
+                io.FILE_CONFIGS[file_type]['header_lines'].values()
+                ) + 1
+            for path, func in paths.items():
+                run_time, n = _time_it(func, file=file)
+                if not path == 'estimate':
+                    n -= n_header_lines
+                rslt[(file_type, path)] = {'time': run_time, 'n_records': n}
+            for path in ['legacy', 'block']:
+                if not rslt[(file_type, path)]['n_records'] == n_rows:
+                    raise RuntimeError(f'{file_type} line counts disagree!')
+            error = abs(
+                rslt[(file_type, 'estimate')]['n_records'] /
+                rslt[(file_type, 'block')]['n_records'] - 1
+                )
+            if error > max_estimate_error:
+                raise RuntimeError(
+                    f'{file_type} record estimate is out by {error:.1%}!'
+                    )
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+def benchmark_file_interval(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare sampled interval inference in get_file_interval with the full
+    date scan, and with a cached repeat call, and check that they agree.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+
+    Returns:
+        Timings (s) by file type and path.
+
+    """
+
+    cases = {
+        'TOA5': write_synthetic_TOA5,
+        'EddyPro': write_synthetic_EddyPro
+        }
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_type, writer in cases.items():
+            file = pathlib.Path(tmp_dir) / f'{file_type}.dat'
+            writer(abs_file_path=file, n_rows=n_rows)
+            timings, intervals = {}, []
+            for path, sample in {'full': False, 'sampled': True}.items():
+                io.FILE_INTERVAL_CACHE['entries'].clear()
+                timings[path], interval = _time_it(
+                    io.get_file_interval, n_repeats=1, file=file,
+                    file_type=file_type, sample=sample
+                    )
+                intervals.append(interval)
+            timings['cached'], interval = _time_it(
+                io.get_file_interval, file=file, file_type=file_type
+                )
+            intervals.append(interval)
+            if not len(set(intervals)) == 1:
+                raise RuntimeError(f'{file_type} intervals disagree!')
+            rslt[file_type] = timings
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+def benchmark_compression(
+        n_rows: int=10**6, disk_mb_per_s: float=50
+        ) -> pd.DataFrame:
+    """Compare reading plain and compressed (archived) TOA5 files with
+    get_data, and check that the data are identical. Files are read from the
+    page cache here, so the time to read each from an I/O-bound disk is
+    modelled as the measured parse time plus the file size over the disk
+    bandwidth.
+
+    Args:
+        n_rows: number of records in the synthetic files.
+        disk_mb_per_s: the modelled disk read bandwidth (MB/s).
+
+    Returns:
+        File size (MB), compression ratio, measured and modelled I/O-bound
+            read times (s) by codec.
+
+    """
+
+    codecs = [
+        codec for codec in io.COMPRESSION_SUFFIXES
+        if not (codec == '.zst' and io.zstandard is None)
+        ]
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain_file = pathlib.Path(tmp_dir) / 'TOA5.dat'
+        write_synthetic_TOA5(abs_file_path=plain_file, n_rows=n_rows)
+        files = {'plain': plain_file}
+        for codec in codecs:
+            file = pathlib.Path(tmp_dir) / f'TOA5_{codec[1:]}.dat'
+            file.write_bytes(plain_file.read_bytes())
+            files[codec] = io.archive_file(file=file, codec=codec)
+        plain_df = None
+        for codec, file in files.items():
+            run_time, df = _time_it(
+                io.get_data, file=file, file_type='TOA5', use_cache=False
+                )
+            if plain_df is None:
+                plain_df = df
+            try:
+                pd.testing.assert_frame_equal(plain_df, df, check_exact=True)
+            except AssertionError as e:
+                raise RuntimeError(f'{codec} data disagree!') from e
+            size = os.path.getsize(file) / 10**6
+            rslt[codec] = {
+                'size': size,
+                'ratio': os.path.getsize(plain_file) / 10**6 / size,
+                'read_time': run_time,
+                'io_bound_time': run_time + size / disk_mb_per_s
+                }
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_tob3_decoding(n_rows: int=864000) -> pd.DataFrame:
+    """Time decoding a synthetic TOB3 file (default one day of 10Hz data,
+    with invalid, minor and out-of-order frames) and converting it to
+    half-hourly TOA5 files. Checks the decoded data against the data encoded,
+    and that the TOA5 output parses back to the same values.
+
+    Args:
+        n_rows: number of records in the synthetic file.
+
+    Returns:
+        Throughput (records / s) by step.
+
+    """
+
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOB3_TestSite_100ms_2024_01_01.dat'
+        expected = write_synthetic_TOB3(
+            abs_file_path=file, n_rows=n_rows + 3, n_invalid_frames=5,
+            shuffle_frames=True
+            )
+        run_time, df = _time_it(tob3.get_data, file=file)
+        rslt['decode'] = len(df) / run_time
+        try:
+            pd.testing.assert_frame_equal(
+                df, expected, check_exact=True, check_dtype=False
+                )
+        except AssertionError as e:
+            raise RuntimeError('Decoded data disagree!') from e
+        output_path = pathlib.Path(tmp_dir) / 'TOA5'
+        output_path.mkdir()
+        run_time, files = _time_it(
+            tob3.convert_file, n_repeats=1, file=file,
+            output_path=output_path, time_step=30
+            )
+        rslt['convert_TOA5'] = len(df) / run_time
+        toa5_df = pd.concat([
+            io.get_data(file=output_file, file_type='TOA5', use_cache=False)
+            for output_file in files
+            ])
+        try:
+            pd.testing.assert_frame_equal(
+                toa5_df.drop('TIMESTAMP', axis=1),
+                expected.drop('RECORD', axis=1),
+                check_exact=False, rtol=10**-6, check_dtype=False,
+                check_names=False, check_freq=False
+                )
+        except AssertionError as e:
+            raise RuntimeError('TOA5 output disagrees!') from e
+    return pd.DataFrame({'records_per_s': rslt})
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_columnar(n_rows: int=864000) -> pd.DataFrame:
+    """Compare the half-hourly TOA5 and daily columnar outputs of a synthetic
+    TOB3 file (default one day of 10Hz data): total size, and the time to
+    read all data and to read two columns for one half hour. Checks that the
+    columnar data are identical to the decoded data. Requires pyarrow.
+
+    Args:
+        n_rows: number of records in the synthetic file.
+
+    Returns:
+        Size (MB) and read times (s) by format.
+
+    """
+
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOB3_TestSite_100ms_2024_01_01.dat'
+        write_synthetic_TOB3(abs_file_path=file, n_rows=n_rows)
+        output_path = pathlib.Path(tmp_dir) / 'TOA5'
+        output_path.mkdir()
+        toa5_files = tob3.convert_file(
+            file=file, output_path=output_path, time_step=30
+            )
+        columnar_file = pathlib.Path(tmp_dir) / 'columnar.parquet'
+        tob3.write_columnar_file(file=file, abs_file_path=columnar_file)
+        df = tob3.get_data(file=file).drop('RECORD', axis=1)
+        try:
+            pd.testing.assert_frame_equal(
+                io.get_columnar_data(file=columnar_file), df,
+                check_exact=True, check_freq=False
+                )
+        except AssertionError as e:
+            raise RuntimeError('Columnar data disagree!') from e
+        usecols, start = ['Ux', 'CO2_density'], df.index[len(df) // 2]
+        end = start + pd.Timedelta('30min')
+        rslt['TOA5'] = {
+            'size': sum(os.path.getsize(f) for f in toa5_files) / 10**6,
+            'read_all': _time_it(
+                lambda: [
+                    io.get_data(file=f, file_type='TOA5', use_cache=False)
+                    for f in toa5_files
+                    ]
+                )[0],
+            'read_window': _time_it(
+                io.get_data, file=toa5_files[len(toa5_files) // 2],
+                file_type='TOA5', usecols=usecols, use_cache=False
+                )[0]
+            }
+        rslt['columnar'] = {
+            'size': os.path.getsize(columnar_file) / 10**6,
+            'read_all': _time_it(
+                io.get_columnar_data, file=columnar_file
+                )[0],
+            'read_window': _time_it(
+                io.get_columnar_data, file=columnar_file, usecols=usecols,
+                start=start, end=end
+                )[0]
+            }
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_lazy_handler(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare the time for a DataHandler (on a synthetic TOA5 file and a
+    backup) to yield headers and date span without loading data, and with
+    the data loaded (as the eager handler did). Checks that the probed date
+    span agrees with that of the data.
+
+    Args:
+        n_rows: number of records in the synthetic master file (the backup
+            has a tenth of this).
+
+    Returns:
+        Time (s) by path.
+
+    """
+
+    def get_metadata(load_data):
+        handler = fh.DataHandler(file=file, concat_files=True)
+        if load_data:
+            handler.data
+        return handler.headers, handler.get_date_span(), handler
+
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOA5_test.dat'
+        write_synthetic_TOA5(abs_file_path=file, n_rows=n_rows)
+        write_synthetic_TOA5(
+            abs_file_path=pathlib.Path(tmp_dir) / 'TOA5_test.dat.1.backup',
+            n_rows=n_rows // 10
+            )
+        for path, load_data in {'lazy': False, 'eager': True}.items():
+            rslt[path], (_, span, handler) = _time_it(
+                get_metadata, n_repeats=1, load_data=load_data
+                )
+        data_span = {
+            'start_date': handler.data.index[0].to_pydatetime(),
+            'end_date': handler.data.index[-1].to_pydatetime()
+            }
+        lazy_handler = get_metadata(load_data=False)[2]
+        if not lazy_handler.get_date_span() == data_span:
+            raise RuntimeError('Probed and data date span disagree!')
+    return pd.DataFrame({'time': rslt})
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_gap_analysis(n_rows: int=10**6) -> pd.DataFrame:
+    """Compare the vectorised gap engine of the DataHandler with the legacy
+    per-delta gap analysis on a synthetic TOA5 file with many short gaps.
+    Checks that missing records, gap bounds and gap distribution agree.
+
+    Args:
+        n_rows: number of records in the synthetic file (a tenth of which
+            are dropped).
+
+    Returns:
+        Time (s) by path.
+
+    """
+
+    def get_gaps(handler):
+        handler._gaps = None
+        return (
+            handler.get_missing_records(), handler.get_gap_bounds(),
+            handler.get_gap_distribution()
+            )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOA5_test.dat'
+        write_synthetic_TOA5(
+            abs_file_path=file, n_rows=n_rows, n_dropped=n_rows // 10
+            )
+        handler = fh.DataHandler(file=file)
+        handler.data
+        rslt = {}
+        rslt['legacy'], legacy = _time_it(
+            _legacy_gap_analysis, n_repeats=1, handler=handler
+            )
+        rslt['vectorised'], current = _time_it(get_gaps, handler=handler)
+    if not legacy[0] == current[0]:
+        raise RuntimeError('Missing records disagree!')
+    pd.testing.assert_frame_equal(legacy[1], current[1])
+    pd.testing.assert_frame_equal(
+        legacy[2], current[2], check_dtype=False, check_index_type=False
+        )
+    return pd.DataFrame({'time': rslt})
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_chunked_analysis(
+        n_rows: int=10**6, chunksize: int=10**5
+        ) -> pd.DataFrame:
+    """Compare the time and peak traced memory of the whole-frame duplicate
+    and gap analyses of the DataHandler with the chunked analyses over
+    file_io.iter_data, on a synthetic TOA5 file with gaps, duplicate records
+    and duplicate indices (some of them straddling chunk boundaries). Checks
+    that the chunked results agree with the whole-frame results.
+
+    Args:
+        n_rows: number of records in the synthetic file (a tenth of which
+            are dropped).
+        chunksize: the number of records per chunk.
+
+    Returns:
+        Time (s) and peak traced memory (MB) by path.
+
+    """
+
+    def analyse_whole(file):
+        handler = fh.DataHandler(file=file)
+        return (
+            {
+                'duplicate_records':
+                    handler.get_duplicate_records(as_dates=True),
+                'duplicate_indices':
+                    handler.get_duplicate_indices(as_dates=True)
+                },
+            handler._get_gaps(),
+            handler.get_gap_distribution(),
+            handler.interval
+            )
+
+    def analyse_chunked(file, interval):
+        rslt = fh.get_chunked_analysis(
+            chunks=io.iter_data(file=file, chunksize=chunksize),
+            interval=interval
+            )
+        return rslt, rslt['gaps'], rslt['gap_distribution']
+
+    def trace(func, **kwargs):
+        tracemalloc.start()
+        try:
+            run_time, rslt = _time_it(func, n_repeats=1, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+        return {'time': run_time, 'peak_MB': peak}, rslt
+
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOA5_test.dat'
+        write_synthetic_TOA5(
+            abs_file_path=file, n_rows=n_rows, n_dropped=n_rows // 10
+            )
+
+        # Repeat records and timestamps (with a revised value) after the
+        # original line, including around chunk boundaries
+        with open(file, 'rb') as f:
+            lines = f.readlines()
+        n_header_lines = max(
+            io.FILE_CONFIGS['TOA5']['header_lines'].values()
+            ) + 1
+        locs = set(
+            np.linspace(n_header_lines, len(lines) - 1, 50).astype(int).tolist()
+            + [n_header_lines + i * chunksize - 1 for i in range(
+                1, (len(lines) - n_header_lines) // chunksize + 1
+                )]
+            )
+        with open(file, 'wb') as f:
+            for i, line in enumerate(lines):
+                f.write(line)
+                if i in locs:
+                    f.write(line)
+                    if i % 2:
+                        f.write(line.rsplit(b',', 1)[0] + b',999\n')
+
+        rslt['whole'], whole = trace(analyse_whole, file=file)
+        rslt['chunked'], chunked = trace(
+            analyse_chunked, file=file, interval=whole[3]
+            )
+    for key in ['duplicate_records', 'duplicate_indices']:
+        if not whole[0][key]:
+            raise RuntimeError(f'Synthetic file has no {key}!')
+        if not sorted(whole[0][key]) == sorted(chunked[0][key]):
+            raise RuntimeError(f'Chunked {key} disagree!')
+    for key in ['n_records', 'start', 'end']:
+        if not whole[1][key] == chunked[1][key]:
+            raise RuntimeError(f'Chunked gap {key} disagree!')
+    pd.testing.assert_frame_equal(whole[1]['table'], chunked[1]['table'])
+    pd.testing.assert_frame_equal(whole[2], chunked[2])
+    return pd.DataFrame(rslt).T
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def benchmark_projection(n_rows: int=10**5, n_cols: int=100) -> pd.DataFrame:
+    """Compare the time for a DataHandler (on a synthetic TOA5 file and a
+    backup) to yield conditioned data for a few variables with and without
+    pushing the column projection down to the reader. The projected path is
+    that of the production callers (the handler cache and merge_data).
+    Checks that the conditioned data agree, and that no columns outside the
+    projection are parsed on the projected paths.
+
+    Args:
+        n_rows: number of records in the synthetic master file (the backup
+            has a tenth of this).
+        n_cols: number of numeric variables.
+
+    Returns:
+        Time (s) by path.
+
+    """
+
+    usecols = {'var_1': 'a', 'var_5': 'b', 'var_9': 'c'}
+
+    def get_conditioned_data(projection):
+        if projection is None:
+            handler = fh.DataHandler(file=file, concat_files=True)
+        else:
+            fh.clear_handler_cache()
+            handler = fh.get_handler(
+                file=file, concat_files=True, usecols=projection
+                )
+        return handler.get_conditioned_data(
+            usecols=usecols, drop_non_numeric=True
+            )
+
+    rslt = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = pathlib.Path(tmp_dir) / 'TOA5_test.dat'
+        write_synthetic_TOA5(abs_file_path=file, n_rows=n_rows, n_cols=n_cols)
+        write_synthetic_TOA5(
+            abs_file_path=pathlib.Path(tmp_dir) / 'TOA5_test.dat.1.backup',
+            n_rows=n_rows // 10, n_cols=n_cols
+            )
+        rslt['full'], full = _time_it(
+            get_conditioned_data, n_repeats=1, projection=None
+            )
+        with mock.patch.object(
+                io, '_parse_data', wraps=io._parse_data
+                ) as spy:
+            rslt['projected'], projected = _time_it(
+                get_conditioned_data, n_repeats=1, projection=list(usecols)
+                )
+            fh.clear_handler_cache()
+            merged = fh.merge_data(files={file: usecols}, concat_files=True)
+        fh.clear_handler_cache()
+    pd.testing.assert_frame_equal(full, projected)
+    pd.testing.assert_frame_equal(
+        full, merged.rename_axis(full.index.name), check_freq=False
+        )
+    allowed = set(io.FILE_CONFIGS['TOA5']['non_numeric_cols']) | set(usecols)
+    assert spy.call_count > 0
+    for call in spy.call_args_list:
+        parsed = call.kwargs['usecols']
+        assert parsed is not None and set(parsed) <= allowed, parsed
+    return pd.DataFrame({'time': rslt})
+#------------------------------------------------------------------------------
+
+BENCHMARKS = {
+    'date_parsing': benchmark_date_parsing,
+    'reverse_read': benchmark_reverse_read,
+    'dtype_policy': benchmark_dtype_policy,
+    'reader_engines': benchmark_reader_engines,
+    'numeric_coercion': benchmark_numeric_coercion,
+    'writer': benchmark_writer,
+    'date_formatting': benchmark_date_formatting,
+    'line_counting': benchmark_line_counting,
+    'file_interval': benchmark_file_interval,
+    'compression': benchmark_compression,
+    'tob3_decoding': benchmark_tob3_decoding,
+    'columnar': benchmark_columnar,
+    'lazy_handler': benchmark_lazy_handler,
+    'gap_analysis': benchmark_gap_analysis,
+    'chunked_analysis': benchmark_chunked_analysis,
+    'projection': benchmark_projection,
+    }
+
+# Args passed from term must be preceded with '--' (see below)
+if __name__=='__main__':
+
+    parser = ap.ArgumentParser()
+    parser.add_argument('benchmark', choices=list(BENCHMARKS.keys()))
+    parser.add_argument('--n_rows', type=int)
+    args = parser.parse_args()
+    kwargs = {'n_rows': args.n_rows} if args.n_rows else {}
+    print(BENCHMARKS[args.benchmark](**kwargs).round(3))
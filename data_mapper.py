@@ -91,7 +91,7 @@ class FileManager():
         self.file_list = df.loc[df.site==site].index.tolist()
         self.flux_file = get_flux_file(site=site)
         self.variable_lookup_table = pd.concat([
-            io.get_header_df(file=self.path / file)
+            io.FileProbe(file=self.path / file).get_header_df()
             .assign(file=file)
             for file in self.file_list
             ])
@@ -780,28 +780,38 @@ def get_latest_10Hz_file(site):
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def _get_extended_file_attrs(path_to_file):
+def _get_extended_file_attrs(path_to_file, probe=None):
 
+    if probe is None:
+        probe = io.FileProbe(file=path_to_file)
     return (
-        io.get_start_end_dates(file=path_to_file) |
+        probe.get_start_end_dates() |
         {'backups': ','.join(
-            f.name for f in io.get_eligible_concat_files(file=path_to_file)
+            f.name for f in io.get_eligible_concat_files(
+                file=path_to_file, file_type=probe.file_type
+                )
             )
             } |
-        {'interval': io.get_file_interval(file=path_to_file)}
+        {'interval': io.get_file_interval(
+            file=path_to_file, file_type=probe.file_type
+            )} |
+        {'n_records_estimate': probe.estimate_n_records()}
         )
 #------------------------------------------------------------------------------
-def _get_basic_file_attrs(path_to_file):
+def _get_basic_file_attrs(path_to_file, probe=None):
 
-    return io.get_file_info(file=path_to_file)
+    if probe is None:
+        probe = io.FileProbe(file=path_to_file)
+    return probe.get_file_info()
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 def _get_all_file_attrs(path_to_file):
 
+    probe = io.FileProbe(file=path_to_file)
     return (
-        _get_basic_file_attrs(path_to_file=path_to_file) |
-        _get_extended_file_attrs(path_to_file=path_to_file)
+        _get_basic_file_attrs(path_to_file=path_to_file, probe=probe) |
+        _get_extended_file_attrs(path_to_file=path_to_file, probe=probe)
         )
 #------------------------------------------------------------------------------
 
@@ -338,9 +338,10 @@ class SiteDataParser():
                 .translation_name
                 .to_dict()
                 )
-            handler = fh.DataHandler(
+            handler = fh.get_handler(
                 file=self.Files.path / item[0],
                 concat_files=self.concat_files,
+                usecols=list(translation_dict.keys())
                 )
             if which == 'data' or 'all':
                 data_list.append(
@@ -579,7 +580,7 @@ def get_file_record_stats(file, site_time, concat_files=True):
 
     """
 
-    handler = fh.DataHandler(file=file)
+    handler = fh.get_handler(file=file)
     rslt_dict = handler.get_missing_records()
     days_since_last_rec = (
         site_time - handler.data.index[-1].to_pydatetime()
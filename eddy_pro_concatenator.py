@@ -76,9 +76,11 @@ class EddyProConcatConfigurator():
                 f'Search path {str(self.slave_path)} not found!'
                 )
 
-        # Get the slave files
-        self.summary_files = list(
-            self.slave_path.glob(f'*{EP_SUMMARY_SEARCH_STR}*.txt')
+        # Get the slave files (including compressed archives of old summary
+        # files, which are read transparently; an uncompressed file takes
+        # priority over its archive)
+        self.summary_files = io._glob_with_archives(
+            path=self.slave_path, pattern=f'*{EP_SUMMARY_SEARCH_STR}*.txt'
             )
         if len(self.summary_files) == 0:
             raise FileNotFoundError('No eligible summary files found!')
@@ -105,7 +107,9 @@ class EddyProConcatConfigurator():
 
         """
 
-        return io.get_start_end_dates(file=self.master, file_type='EddyPro')
+        return io.FileProbe(
+            file=self.master, file_type='EddyPro'
+            ).get_start_end_dates()
 
     def get_summary_file_dates(self):
         """
@@ -119,7 +123,7 @@ class EddyProConcatConfigurator():
         """
 
         return [
-            io.get_start_end_dates(file=f, file_type='EddyPro')
+            io.FileProbe(file=f, file_type='EddyPro').get_start_end_dates()
             for f in self.summary_files
             ]
 
@@ -206,7 +210,7 @@ def main(master_file=None, slave_path=None):
     file_configs = epcc.get_file_configuration()
     if len(file_configs['concat_files']) == 0:
         raise FileNotFoundError('No files to parse')
-    ep_handler = fh.DataHandler(
+    ep_handler = fh.get_handler(
         file=file_configs['master_file'],
         concat_files=file_configs['concat_files'],
         )
@@ -32,7 +32,10 @@ UNIT_ALIASES = {
 class FileConcatenator():
     """Class to allow multiple file merges to a master file"""
 
-    def __init__(self, master_file, concat_list, file_type):
+    def __init__(
+            self, master_file, concat_list, file_type, master_probe=None,
+            start=None, end=None, usecols=None
+            ):
         """
         Get merge reports as hidden attributes.
 
@@ -45,6 +48,19 @@ class FileConcatenator():
             file.
         file_type : str
             The type of file (must be either "TOA5" or "EddyPro")
+        master_probe : file_io.FileProbe, optional
+            Existing probe of the master file. If None, the file is probed.
+            The default is None.
+        start : datetime.datetime, optional
+            If set, only records from this date onwards are concatenated. The
+            default is None.
+        end : datetime.datetime, optional
+            If set, only records up to and including this date are
+            concatenated. The default is None.
+        usecols : list, optional
+            If set, only these variables are read from each file (and
+            included in the concatenated header). Variables missing from a
+            file are NaN for the records of that file. The default is None.
 
         Returns
         -------
@@ -55,16 +71,26 @@ class FileConcatenator():
         self.master_file = master_file
         self.concat_list = concat_list
         self.file_type = file_type
+        self.start = start
+        self.end = end
+        self.usecols = usecols
         self.file_info = io.get_file_type_configs(file_type=file_type)
-        reports = [
+        if master_probe is None:
+            master_probe = io.FileProbe(file=master_file, file_type=file_type)
+        analysers = [
             FileMergeAnalyser(
                 master_file=master_file,
                 merge_file=file,
-                file_type=file_type
+                file_type=file_type,
+                master_probe=master_probe
                 )
-            .get_merge_report()
             for file in self.concat_list
             ]
+        reports = [analyser.get_merge_report() for analyser in analysers]
+        self._probes = {str(master_file): master_probe} | {
+            str(analyser.merge_file): analyser.merge_probe
+            for analyser in analysers
+            }
         self.legal_list = [
             report['merge_file'] for report in reports if
             report['file_merge_legal']
@@ -88,18 +114,36 @@ class FileConcatenator():
 
         """
 
-        df_list = [io.get_data(file=self.master_file, file_type=self.file_type)]
+        window = {'start': self.start, 'end': self.end}
+        df_list = [
+            io.get_data(
+                file=self.master_file, file_type=self.file_type,
+                usecols=self._get_file_usecols(file=self.master_file),
+                **window
+                )
+            ]
         for file in self.legal_list:
             df_list.append(
-                io.get_data(file=file, file_type=self.file_type)
+                io.get_data(
+                    file=file, file_type=self.file_type,
+                    usecols=self._get_file_usecols(file=file),
+                    **window
+                    )
                 .rename(self.alias_maps[file], axis=1)
                 )
         ordered_vars = self.get_concatenated_header().index.tolist()
-        return (
+        df = (
             pd.concat(df_list)
             [ordered_vars]
             .sort_index()
             )
+        io.set_coerced_cells(
+            df=df,
+            report=pd.concat(
+                [io.get_coerced_cells(df=data) for data in df_list]
+                )
+            )
+        return df
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -114,16 +158,41 @@ class FileConcatenator():
 
         """
 
-        df_list = [
-            io.get_header_df(file=self.master_file, file_type=self.file_type)
-            ]
+        df_list = [self._probes[str(self.master_file)].get_header_df()]
         for file in self.legal_list:
             df_list.append(
-                io.get_header_df(file=file, file_type=self.file_type)
+                self._probes[file].get_header_df()
                 .rename(self.alias_maps[file])
                 )
         df = pd.concat(df_list)
-        return df[~df.index.duplicated()]
+        df = df[~df.index.duplicated()]
+        if self.usecols is not None:
+            return df[df.index.isin(self.usecols)]
+        return df
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _get_file_usecols(self, file):
+        """
+        Get the projected variables that are available in a given file (the
+        reader requires that all requested variables exist).
+
+        Parameters
+        ----------
+        file : str or pathlib.Path
+            Absolute path to the file.
+
+        Returns
+        -------
+        list or None
+            The variables to read.
+
+        """
+
+        if self.usecols is None:
+            return None
+        available = self._probes[str(file)].get_header_df().index
+        return [var for var in self.usecols if var in available]
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -187,7 +256,7 @@ class FileConcatenator():
 class FileMergeAnalyser():
     """Analyse compatibility of merge between master and merge file."""
 
-    def __init__(self, master_file, merge_file, file_type):
+    def __init__(self, master_file, merge_file, file_type, master_probe=None):
         """
         Initialise master, merge and file type parameters.
 
@@ -199,6 +268,9 @@ class FileMergeAnalyser():
             Absolute path to merge file.
         file_type : str
             The type of file (must be either "TOA5" or "EddyPro")
+        master_probe : file_io.FileProbe, optional
+            Existing probe of the master file. If None, the file is probed.
+            The default is None.
 
         Returns
         -------
@@ -211,6 +283,10 @@ class FileMergeAnalyser():
         self.master_file = master_file
         self.merge_file = merge_file
         self.file_type = file_type
+        if master_probe is None:
+            master_probe = io.FileProbe(file=master_file, file_type=file_type)
+        self.master_probe = master_probe
+        self.merge_probe = io.FileProbe(file=merge_file, file_type=file_type)
 
     #--------------------------------------------------------------------------
     def compare_variables(self):
@@ -225,12 +301,8 @@ class FileMergeAnalyser():
 
         """
 
-        master_df = io.get_header_df(
-            file=self.master_file, file_type=self.file_type
-            )
-        merge_df = io.get_header_df(
-            file=self.merge_file, file_type=self.file_type
-            )
+        master_df = self.master_probe.get_header_df()
+        merge_df = self.merge_probe.get_header_df()
         common = list(set(master_df.index).intersection(merge_df.index))
         return {
             'common_variables': common,
@@ -264,11 +336,11 @@ class FileMergeAnalyser():
             self.compare_variables()['common_variables']
             )
         compare_df = pd.concat(
-            [(io.get_header_df(file=self.master_file, file_type=self.file_type)
+            [(self.master_probe.get_header_df()
               .rename({'units': 'master'}, axis=1)
               .loc[common_vars, 'master']
               ),
-              (io.get_header_df(file=self.merge_file, file_type=self.file_type)
+              (self.merge_probe.get_header_df()
               .rename({'units': 'merge'}, axis=1)
               .loc[common_vars, 'merge']
               )], axis=1
@@ -326,7 +398,11 @@ class FileMergeAnalyser():
     def compare_dates(self):
         """
         Check that the merge file contains unique dates (merge is deemed
-        illegal if there are none).
+        illegal if there are none). The start and end dates of the probed
+        head and tail are compared first (records are logged in chronological
+        order): if the master file spans dates outside the span of the merge
+        file, the sets of dates must differ. The full sets of dates are
+        compared only if the master span lies within the merge span.
 
         Returns
         -------
@@ -336,6 +412,14 @@ class FileMergeAnalyser():
 
         """
 
+        master_dates = self.master_probe.get_start_end_dates()
+        merge_dates = self.merge_probe.get_start_end_dates()
+        if not None in list(master_dates.values()) + list(merge_dates.values()):
+            if (
+                    master_dates['start_date'] < merge_dates['start_date'] or
+                    master_dates['end_date'] > merge_dates['end_date']
+                    ):
+                return {'date_merge_legal': True}
         return {
             'date_merge_legal':
                 len(
@@ -88,8 +88,9 @@ def construct_l1(site, concat_backups=True, na_values=''):
             sheet_name = full_path.stem
 
             # Get the data handler (concatenate backups by default)
-            handler = fh.DataHandler(
-                file=full_path, concat_files=concat_backups
+            handler = fh.get_handler(
+                file=full_path, concat_files=concat_backups,
+                dtype_policy='compact'
                 )
 
             # Write info
@@ -200,14 +201,26 @@ def merge_site_data(site, concat_files=False, truncate_to_flux=False):
         f'{site}_merged_std.dat'
         )
 
-    # Now output the data
-    io.write_data_to_file(
-        headers=headers,
-        data=data,
-        abs_file_path=output_path,
-        info=info,
-        output_format='TOA5'
-        )
+    # Now output the data (append only the new records unless the variables
+    # or existing records have changed, in which case rewrite the file)
+    try:
+        io.write_data_to_file(
+            headers=headers,
+            data=data,
+            abs_file_path=output_path,
+            info=info,
+            output_format='TOA5',
+            append=True
+            )
+    except RuntimeError as e:
+        logging.warning(f'{e} Rewriting file...')
+        io.write_data_to_file(
+            headers=headers,
+            data=data,
+            abs_file_path=output_path,
+            info=info,
+            output_format='TOA5'
+            )
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -231,7 +244,7 @@ def make_site_info_TOA5(site):
         )
 
     # Get the pct missing data
-    handler = handler=fh.DataHandler(file=file_mngr.path / file_mngr.flux_file)
+    handler = fh.get_handler(file=file_mngr.path / file_mngr.flux_file)
     missing = pd.Series(
         {'pct_missing': handler.get_missing_records()['%_missing']}
         )
@@ -5,6 +5,9 @@ Created on Thu Nov  9 11:52:46 2023
 @author: jcutern-imchugh
 """
 
+import collections
+import functools
+import pathlib
 
 import numpy as np
 import pandas as pd
@@ -12,15 +15,34 @@ import pandas as pd
 import file_io as io
 import file_concatenators as fc
 
+# Limits for the process-wide cache of DataHandlers (see get_handler); least
+# recently used handlers are evicted once either limit is exceeded
+HANDLER_CACHE = {'max_handlers': 16, 'max_bytes': 2 * 1024**3}
+
+_handler_cache = collections.OrderedDict()
+
+_handler_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
 ###############################################################################
 ### CLASSES ###
 ###############################################################################
 
 #------------------------------------------------------------------------------
 class DataHandler():
+    """
+    Handler for the data and headers of a file (and its concatenated files).
+    Data are loaded lazily: headers, file info and date span come from
+    probes of the file(s), and the data (and the concatenation) are
+    parsed only when first accessed. Each element is memoised once loaded.
+    If a column projection (usecols) is set, only the projected columns are
+    read from the file(s).
+    """
 
     #--------------------------------------------------------------------------
-    def __init__(self, file, concat_files=False):
+    def __init__(
+            self, file, concat_files=False, start=None, end=None,
+            dtype_policy=None, usecols=None
+            ):
         """
         Set attributes of handler.
 
@@ -35,6 +57,21 @@ class DataHandler():
             If list, the files contained therein will be concatenated with the
             main file.
             The default is False.
+        start : datetime.datetime, optional
+            If set, only records from this date onwards are read (the date
+            index is used to seek to the window). The default is None.
+        end : datetime.datetime, optional
+            If set, only records up to and including this date are read. The
+            default is None.
+        dtype_policy : str or dict, optional
+            The dtype policy to apply to the data (see
+            file_io.apply_dtype_policy). The default is None.
+        usecols : list, optional
+            If set, only these columns (and the critical non-numeric / time
+            columns of the file type) are read, and the headers are projected
+            likewise. Columns missing from a concatenated file are NaN for the
+            records of that file; columns missing from all files are absent.
+            The default is None.
 
         Returns
         -------
@@ -42,9 +79,112 @@ class DataHandler():
 
         """
 
-        rslt = _get_handler_elements(file=file, concat_files=concat_files)
+        rslt = _get_handler_elements(
+            file=file, concat_files=concat_files, start=start, end=end,
+            dtype_policy=dtype_policy, usecols=usecols
+            )
         for key, value in rslt.items():
             setattr(self, key, value)
+        self._data = None
+        self._on_data_loaded = None
+        self._duplicates = None
+        self._gaps = None
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @property
+    def data(self):
+        """
+        The data (parsed and, if applicable, concatenated on first access).
+        """
+
+        if self._data is None:
+            self._data = self._load_data()
+            if self._on_data_loaded is not None:
+                self._on_data_loaded()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+
+        self._data = data
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _load_data(self):
+        """
+        Parse (and, if applicable, concatenate) the data.
+
+        Returns
+        -------
+        pd.core.frame.DataFrame
+            The data.
+
+        """
+
+        if self._concatenator is None:
+            return _get_single_file_data(
+                file=self.file, file_type=self.file_type, **self._load_kwargs
+                )
+        return _get_concatenated_file_data(
+            concatenator=self._concatenator, file_type=self.file_type,
+            dtype_policy=self._load_kwargs['dtype_policy']
+            )
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @functools.cached_property
+    def headers(self):
+        """
+        The headers (concatenated if applicable).
+        """
+
+        if self._concatenator is None:
+            headers = self._probe.get_header_df()
+            if self._load_kwargs['usecols'] is None:
+                return headers
+            return headers[headers.index.isin(self._load_kwargs['usecols'])]
+        return self._concatenator.get_concatenated_header()
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @functools.cached_property
+    def concat_report(self):
+        """
+        The concatenation report (as list of lines).
+        """
+
+        if self._concatenator is None:
+            return [] if not self._fallback else ['No eligible files found!']
+        return self._concatenator.get_concatenation_report(as_text=True)
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @functools.cached_property
+    def interval(self):
+        """
+        The interval (in minutes) of the data, inferred from the (concatenated)
+        data (loaded if not already).
+        """
+
+        return io.get_datearray_interval(datearray=self.data.index)
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @functools.cached_property
+    def _concatenator(self):
+
+        if not self.concat_list:
+            return None
+        return fc.FileConcatenator(
+            master_file=self.file,
+            file_type=self.file_type,
+            concat_list=self.concat_list,
+            master_probe=self._probe,
+            start=self._load_kwargs['start'],
+            end=self._load_kwargs['end'],
+            usecols=self._load_kwargs['usecols']
+            )
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -96,15 +236,14 @@ class DataHandler():
         subset_list, rename_dict = self._subset_or_translate(usecols=usecols)
         output_data = self.data[subset_list].rename(rename_dict, axis=1)
 
-        # Apply duplicate mask
-        dupe_records = self.get_duplicate_records()
-        dupe_indices = self.get_duplicate_indices()
-        if any(dupe_indices) and raise_if_dupe_index:
+        # Apply duplicate mask (duplicate records and duplicate indices
+        # together are all but the first record for each timestamp, so only
+        # classify them if required)
+        if raise_if_dupe_index and self.get_duplicate_indices().any():
             raise RuntimeError(
                 'Duplicate indices with non-duplicate data!'
                 )
-        dupes_mask = dupe_indices | dupe_records
-        output_data = output_data.loc[~dupes_mask]
+        output_data = output_data.loc[~self.data.index.duplicated()]
 
         # Do the resampling
         if monotonic_index and not resample_intvl:
@@ -200,7 +339,7 @@ class DataHandler():
 
         """
 
-        records = self.data.reset_index().duplicated().set_axis(self.data.index)
+        records = self._get_duplicate_masks()['records']
         if as_dates:
             return self.data[records].index.to_pydatetime().tolist()
         return records
@@ -224,13 +363,45 @@ class DataHandler():
 
         """
 
-        records = self.get_duplicate_records()
-        indices = ~records & self.data.index.duplicated()
+        indices = self._get_duplicate_masks()['indices']
         if as_dates:
             return self.data[indices].index.to_pydatetime().tolist()
         return indices
     #--------------------------------------------------------------------------
 
+    #--------------------------------------------------------------------------
+    def _get_duplicate_masks(self):
+        """
+        Get the duplicate record and duplicate index masks in a single pass
+        over the data, from a 64-bit fingerprint of each record (including
+        the index). If the data are projected, only the projected columns are
+        fingerprinted (records differing only in columns outside the
+        projection are duplicates in the projected data). The masks are
+        cached until the data are replaced.
+
+        Returns
+        -------
+        dict
+            Boolean series indicating duplicate records (key 'records') and
+            duplicate indices with non-duplicate data (key 'indices').
+
+        """
+
+        cache = self._duplicates
+        if cache is None or cache['data'] is not self.data:
+            fingerprints = pd.util.hash_pandas_object(
+                self.data, index=True, categorize=False
+                ).to_numpy()
+            records = pd.Index(fingerprints).duplicated()
+            indices = ~records & self.data.index.duplicated()
+            self._duplicates = {
+                'data': self.data,
+                'records': pd.Series(records, index=self.data.index),
+                'indices': pd.Series(indices, index=self.data.index)
+                }
+        return self._duplicates
+    #--------------------------------------------------------------------------
+
     #--------------------------------------------------------------------------
     def get_missing_records(self, raise_if_single_record=False):
         """
@@ -244,80 +415,100 @@ class DataHandler():
 
         """
 
-        data = self._get_non_duplicate_data()
-        complete_index = pd.date_range(
-            start=data.index[0],
-            end=data.index[-1],
-            freq=f'{self.interval}T'
+        gaps = self._get_gaps()
+        n_expected = max(
+            (gaps['end'] - gaps['start']) // (self.interval * 60 * 10**9) + 1,
+            0
             )
-        n_missing = len(complete_index) - len(data)
+        n_missing = int(n_expected - gaps['n_records'])
         return {
             'n_missing': n_missing,
-            '%_missing': round(n_missing / len(complete_index) * 100, 2),
+            '%_missing': round(n_missing / n_expected * 100, 2),
             }
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
     def get_gap_bounds(self):
+        """
+        Get the number of intervals spanned by each gap, and the bounding
+        dates.
 
-        data, gap_series = self._init_gap_analysis()
-        return pd.concat(
-            [
-                gap_series.reset_index().n_records,
-                pd.DataFrame(
-                    data=[
-                        data.iloc[x-1: x+1].astype(str).tolist()
-                        for x in gap_series.index
-                        ],
-                    columns=['last_preceding', 'first_succeeding']
-                    )
-                ],
-            axis=1
-            )
+        Returns
+        -------
+        pd.core.frame.DataFrame
+            One row per gap, with the gap size in intervals (n_records), the
+            last date preceding and the first date succeeding the gap.
+
+        """
+
+        table = self._get_gaps()['table']
+        return pd.DataFrame({
+            'n_records': table.n_records,
+            'last_preceding': table.last_preceding.astype(str),
+            'first_succeeding': table.first_succeeding.astype(str)
+            })
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
     def get_gap_distribution(self):
+        """
+        Get the distribution of gap sizes.
 
-        gap_series = self._init_gap_analysis()[1]
-        unique_gaps = gap_series.unique()
-        counts = [len(gap_series[gap_series==x]) for x in unique_gaps]
-        return (
-            pd.DataFrame(
-                data=zip(unique_gaps - 1, counts),
-                columns=['n_records', 'count']
-                )
-            .set_index(keys='n_records')
-            .sort_index()
-            )
+        Returns
+        -------
+        pd.core.frame.DataFrame
+            Number of gaps (column 'count') by the number of missing records
+            (index 'n_records').
+
+        """
+
+        return _get_gap_distribution(table=self._get_gaps()['table'])
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
-    def _init_gap_analysis(self):
+    def _get_gaps(self):
+        """
+        Get the run-length table of gaps in the (non-duplicate) data in a
+        single pass over the int64 (ns) timestamps. Timestamp deltas not equal
+        to the interval are gaps. The result is cached until the data are
+        replaced.
 
-        # If file is TOA5, it will have a column AND an index named TIMESTAMP,
-        # so dump the variable if so
-        data = self._get_non_duplicate_data()
-        try:
-            data = data.drop('TIMESTAMP', axis=1)
-        except KeyError:
-            pass
-
-        # Get instances of duplicate indices OR records, and remove
-        data = data.reset_index()['DATETIME']
-
-        # Get gaps as n_records (exclude gaps equal to measurement interval!)
-        gap_series = (
-            (data - data.shift())
-            .astype('timedelta64[s]')
-            .replace(self.interval, np.nan)
-            .dropna()
-            .apply(lambda x: x.total_seconds() / (60 * self.interval))
-            .astype(int)
-            .rename('n_records')
-            )
-        gap_series = gap_series[gap_series!=1]
-        return data, gap_series
+        Returns
+        -------
+        dict
+            The gap table (key 'table'; with the last date preceding and first
+            date succeeding each gap, the gap size in intervals as n_records
+            and the number of missing records as n_missing), and the number
+            of records and first and last timestamps (int64 ns) of the
+            non-duplicate data.
+
+        """
+
+        cache = self._gaps
+        if cache is None or cache['data'] is not self.data:
+            times = (
+                self._get_non_duplicate_data()
+                .index
+                .to_numpy(dtype='datetime64[ns]')
+                )
+            ns = times.view('i8')
+            steps = (
+                (np.diff(ns) // 10**9) / (60 * self.interval)
+                ).astype(int)
+            locs = np.flatnonzero(steps != 1)
+            self._gaps = {
+                'data': self.data,
+                'table': pd.DataFrame({
+                    'last_preceding': times[locs],
+                    'first_succeeding': times[locs + 1],
+                    'n_records': steps[locs],
+                    'n_missing': steps[locs] - 1
+                    }),
+                'n_records': len(ns),
+                'start': ns[0],
+                'end': ns[-1]
+                }
+        return self._gaps
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -325,22 +516,61 @@ class DataHandler():
 
         if self.interval is None:
             raise TypeError('Analysis not applicable to single record!')
-        dupes = self.get_duplicate_indices() | self.get_duplicate_records()
-        return self.data[~dupes]
+        return self.data[~self.data.index.duplicated()]
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_coerced_cells(self):
+        """
+        Get the cells that held non-numeric values in numeric columns (and
+        were therefore coerced to NaN) when the data were parsed.
+
+        Returns
+        -------
+        pd.core.frame.DataFrame
+            The DATETIME, variable and raw value of each coerced cell.
+
+        """
+
+        return io.get_coerced_cells(df=self.data)
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
     def get_date_span(self):
         """
-        Get start and end dates
+        Get start and end dates. If the data are not loaded, the dates are
+        those of the first and last valid records of the file(s), read from
+        the file probes without parsing the data. This approximates the span
+        of the conditioned data, which may differ if conditioning drops or
+        reorders records at the start or end of a file (e.g. illegal or
+        unsorted timestamps). If any file has no valid dates, the data are
+        loaded.
 
         Returns
         -------
         dict
-            Dictionary containing start and end dates (keys "start" and "end").
+            Dictionary containing start and end dates (keys "start_date" and
+            "end_date").
 
         """
 
+        # Get the dates from the file probes unless the data are already
+        # loaded (or windowed)
+        window = [self._load_kwargs['start'], self._load_kwargs['end']]
+        if self._data is None and all(date is None for date in window):
+            if self._concatenator is None:
+                probes = [self._probe]
+            else:
+                probes = [
+                    self._concatenator._probes[str(file)]
+                    for file in [self.file] + self._concatenator.legal_list
+                    ]
+            spans = [probe.get_start_end_dates() for probe in probes]
+            if not any(None in span.values() for span in spans):
+                return {
+                    'start_date': min(span['start_date'] for span in spans),
+                    'end_date': max(span['end_date'] for span in spans)
+                    }
         return {
             'start_date': self.data.index[0].to_pydatetime(),
             'end_date': self.data.index[-1].to_pydatetime()
@@ -524,10 +754,14 @@ class DataHandler():
 
 
 #------------------------------------------------------------------------------
-def _get_handler_elements(file, concat_files=False):
+def _get_handler_elements(
+        file, concat_files=False, start=None, end=None, dtype_policy=None,
+        usecols=None
+        ):
     """
-    Get elements required to populate file handler for either single file or
-    multi-file concatenated data.
+    Get the (cheap) elements required to populate file handler for either
+    single file or multi-file concatenated data. The data-dependent elements
+    are loaded lazily by the handler.
 
     Parameters
     ----------
@@ -535,12 +769,21 @@ def _get_handler_elements(file, concat_files=False):
         Absolute path to master file.
     concat_files : boolean or list
         See concat_files description in __init__ docstring for DataHandler.
+    start : datetime.datetime, optional
+        See start description in __init__ docstring for DataHandler.
+    end : datetime.datetime, optional
+        See end description in __init__ docstring for DataHandler.
+    dtype_policy : str or dict, optional
+        See dtype_policy description in __init__ docstring for DataHandler.
+    usecols : list, optional
+        See usecols description in __init__ docstring for DataHandler.
 
     Returns
     -------
     dict
-        Contains data (key 'data'), headers (key 'headers') and concatenation
-        report (key 'concat_report').
+        Contains file (key 'file'), file type (key 'file_type'), file info
+        (key 'file_info'), concatenation list (key 'concat_list'), and the
+        probe, configs and data loading kwargs.
 
     """
 
@@ -555,67 +798,91 @@ def _get_handler_elements(file, concat_files=False):
     if isinstance(concat_files, list):
         concat_list = concat_files
 
-    # If concat_list has no elements, get single file data
-    if len(concat_list) == 0:
-        fallback = False if not concat_files else True
-        data_dict = _get_single_file_data(file=file, fallback=fallback)
+    # Probe the master file
+    probe = io.FileProbe(file=file)
+    file_type = probe.file_type
+    configs = io.get_file_type_configs(file_type=file_type)
 
-    # If concat_list has elements, use the concatenator
-    if len(concat_list) > 0:
-        data_dict = _get_concatenated_file_data(
-            file=file,
-            concat_list=concat_list
+    # Add the critical (non-numeric / time) columns to the projection; for a
+    # single file, drop columns missing from the file (the reader requires
+    # that all requested columns exist)
+    if usecols is not None:
+        usecols = _get_projection(
+            usecols=usecols,
+            configs=configs,
+            available=None if concat_list else probe.get_header_df().index
             )
 
-    # Get file interval regardless of provenance (single or concatenated)
-    data_dict.update(
-        {'interval': io.get_datearray_interval(
-            datearray=np.array(data_dict['data'].index.to_pydatetime())
-            )
+    return {
+        'file': file,
+        'file_type': file_type,
+        'file_info': probe.get_file_info(dummy_override=len(concat_list) > 0),
+        'concat_list': concat_list,
+        '_probe': probe,
+        '_configs': configs,
+        '_fallback': len(concat_list) == 0 and bool(concat_files),
+        '_load_kwargs': {
+            'start': start, 'end': end, 'dtype_policy': dtype_policy,
+            'usecols': usecols
             }
-        )
+        }
+#------------------------------------------------------------------------------
 
-    # Return the dictionary
-    return data_dict
 #------------------------------------------------------------------------------
+def _get_projection(usecols, configs, available=None):
+    """
+    Get the column projection: the critical (non-numeric / time) columns of
+    the file type followed by the requested columns.
+
+    Parameters
+    ----------
+    usecols : list
+        The requested columns.
+    configs : dict
+        The file type configs.
+    available : list or pd.Index, optional
+        If set, columns not in available are dropped (the reader requires
+        that all requested columns exist). The default is None.
+
+    Returns
+    -------
+    list
+        The projection.
 
+    """
+
+    usecols = configs['non_numeric_cols'] + [
+        col for col in usecols if not col in configs['non_numeric_cols']
+        ]
+    if available is None:
+        return usecols
+    return [col for col in usecols if col in available]
 #------------------------------------------------------------------------------
-def _get_concatenated_file_data(file, concat_list):
 
-    file_type = io.get_file_type(file=file)
-    configs = io.get_file_type_configs(file_type=file_type)
-    concatenator = fc.FileConcatenator(
-        master_file=file,
+#------------------------------------------------------------------------------
+def _get_concatenated_file_data(concatenator, file_type, dtype_policy=None):
+
+    return io.apply_dtype_policy(
+        df=concatenator.get_concatenated_data(),
         file_type=file_type,
-        concat_list=concat_list
+        dtype_policy=dtype_policy
         )
-    return {
-        'file_type': file_type,
-        'file_info': io.get_file_info(
-            file=file, file_type=file_type, dummy_override=True
-            ),
-        'data': concatenator.get_concatenated_data(),
-        'headers': concatenator.get_concatenated_header(),
-        'concat_list': concat_list,
-        'concat_report': concatenator.get_concatenation_report(as_text=True),
-        '_configs': configs
-        }
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def _get_single_file_data(file, fallback=False):
-
-    file_type = io.get_file_type(file=file)
-    configs = io.get_file_type_configs(file_type=file_type)
-    return {
-        'file_type': file_type,
-        'file_info': io.get_file_info(file=file, file_type=file_type),
-        'data': io.get_data(file=file, file_type=file_type),
-        'headers': io.get_header_df(file=file, file_type=file_type),
-        'concat_list': [],
-        'concat_report': [] if not fallback else ['No eligible files found!'],
-        '_configs': configs
-        }
+def _get_single_file_data(
+        file, file_type, start=None, end=None, dtype_policy=None, usecols=None
+        ):
+
+    # The reader does not subset if only the critical columns are requested,
+    # so enforce the projection here
+    df = io.get_data(
+        file=file, file_type=file_type, usecols=usecols, start=start, end=end,
+        dtype_policy=dtype_policy
+        )
+    if usecols is None:
+        return df
+    return df.loc[:, df.columns.isin(usecols)]
 #------------------------------------------------------------------------------
 
 ###############################################################################
@@ -653,7 +920,10 @@ def merge_data(
             usecols = files[file]
         except TypeError:
             usecols = None
-        data_handler = DataHandler(file=file, concat_files=concat_files)
+        data_handler = get_handler(
+            file=file, concat_files=concat_files,
+            usecols=None if usecols is None else list(usecols)
+            )
         df_list.append(
             data_handler.get_conditioned_data(
                 usecols=usecols, drop_non_numeric=True,
@@ -669,3 +939,483 @@ def merge_data(
 ###############################################################################
 ### END PUBLIC FUNCTIONS ###
 ###############################################################################
+
+
+
+###############################################################################
+### BEGIN HANDLER CACHE FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def get_handler(
+        file, concat_files=False, dtype_policy=None, usecols=None
+        ) -> DataHandler:
+    """
+    Get a DataHandler from the process-wide cache (or create and cache it).
+    Handlers are keyed on the identity (path, size and modification time) of
+    the file and of its concatenation files, the file type, the dtype policy
+    and the column projection, so a handler is rebuilt if any of the files
+    change, and the policy and projection are applied when the file(s) are
+    read. Cached handlers are shared between consumers and must be treated
+    as read-only.
+
+    Args:
+        file: absolute path to file for which to get the handler.
+        concat_files: see DataHandler.
+        dtype_policy: see DataHandler.
+        usecols: see DataHandler.
+
+    Returns:
+        The handler.
+
+    """
+
+    key = _get_handler_cache_key(
+        file=file, concat_files=concat_files, dtype_policy=dtype_policy,
+        usecols=usecols
+        )
+    try:
+        entry = _handler_cache[key]
+        _handler_cache.move_to_end(key)
+        _handler_cache_stats['hits'] += 1
+    except KeyError:
+        handler = DataHandler(
+            file=file, concat_files=concat_files, dtype_policy=dtype_policy,
+            usecols=usecols
+            )
+        handler._on_data_loaded = functools.partial(
+            _on_entry_data_loaded, key=key
+            )
+        entry = {'handler': handler, 'data': None, 'n_bytes': 0}
+        _handler_cache[key] = entry
+        _handler_cache_stats['misses'] += 1
+    _evict_handler_cache()
+    return entry['handler']
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def set_handler_cache(max_handlers: int=None, max_bytes: int=None):
+    """
+    Configure the limits of the handler cache (existing handlers are evicted
+    if they exceed the new limits).
+
+    Args:
+        max_handlers: the maximum number of cached handlers. If None, the
+            existing limit is retained.
+        max_bytes: the memory budget for the data of the cached handlers. If
+            None, the existing limit is retained.
+
+    Returns:
+        None.
+
+    """
+
+    if max_handlers is not None:
+        HANDLER_CACHE['max_handlers'] = max_handlers
+    if max_bytes is not None:
+        HANDLER_CACHE['max_bytes'] = max_bytes
+    _evict_handler_cache()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_handler_cache_stats() -> dict:
+    """
+    Get the hit / miss / eviction counters and current size of the handler
+    cache.
+
+    Returns:
+        The counters, the number of cached handlers (key 'n_handlers') and the
+        memory used by their loaded data (key 'n_bytes').
+
+    """
+
+    return _handler_cache_stats | {
+        'n_handlers': len(_handler_cache),
+        'n_bytes': sum(_update_entry_size(entry) for entry in
+                       _handler_cache.values())
+        }
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def clear_handler_cache():
+    """
+    Drop all cached handlers and reset the counters.
+
+    Returns:
+        None.
+
+    """
+
+    _handler_cache.clear()
+    _handler_cache_stats.update({'hits': 0, 'misses': 0, 'evictions': 0})
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_handler_cache_key(
+        file, concat_files=False, dtype_policy=None, usecols=None
+        ) -> tuple:
+    """
+    Get the cache key for a handler.
+
+    Args:
+        See get_handler.
+
+    Returns:
+        The key.
+
+    """
+
+    file_type = io.get_file_type(file=file)
+    if concat_files is True:
+        concat_list = io.get_eligible_concat_files(
+            file=file, file_type=file_type
+            )
+    elif isinstance(concat_files, list):
+        concat_list = concat_files
+    else:
+        concat_list = []
+    return (
+        _get_file_identity(file=file),
+        tuple(_get_file_identity(file=this_file) for this_file in concat_list),
+        bool(concat_files),
+        file_type,
+        repr(dtype_policy),
+        None if usecols is None else tuple(usecols)
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_file_identity(file) -> tuple:
+
+    stat = pathlib.Path(file).stat()
+    return str(pathlib.Path(file).resolve()), stat.st_size, stat.st_mtime_ns
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _update_entry_size(entry: dict) -> int:
+    """
+    Get the memory used by the data of a cached handler (0 if the data are
+    not yet loaded). The size is stored with the entry until the data are
+    replaced.
+
+    Args:
+        entry: the cache entry.
+
+    Returns:
+        The size in bytes.
+
+    """
+
+    data = entry['handler']._data
+    if data is not None and entry['data'] is not data:
+        entry['data'] = data
+        entry['n_bytes'] = int(data.memory_usage(deep=True).sum())
+    return entry['n_bytes']
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _on_entry_data_loaded(key: tuple):
+    """
+    Mark a cache entry as most recently used when the data of its handler
+    are loaded, and enforce the cache limits.
+
+    Args:
+        key: the cache key of the entry.
+
+    Returns:
+        None.
+
+    """
+
+    if key in _handler_cache:
+        _handler_cache.move_to_end(key)
+        _evict_handler_cache()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _evict_handler_cache():
+    """
+    Evict least recently used handlers until the cache is within its limits.
+    The most recently used handler is always retained. Data are loaded
+    lazily by the handlers, so the limits are also enforced each time the
+    data of a cached handler are loaded.
+
+    Returns:
+        None.
+
+    """
+
+    n_bytes = sum(
+        _update_entry_size(entry) for entry in _handler_cache.values()
+        )
+    while len(_handler_cache) > 1 and (
+            len(_handler_cache) > HANDLER_CACHE['max_handlers'] or
+            n_bytes > HANDLER_CACHE['max_bytes']
+            ):
+        _, entry = _handler_cache.popitem(last=False)
+        n_bytes -= entry['n_bytes']
+        _handler_cache_stats['evictions'] += 1
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END HANDLER CACHE FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN CHUNKED DATA FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def get_chunked_analysis(
+        chunks, interval: int=None, duplicates: bool=True
+        ) -> dict:
+    """
+    Get the duplicate and gap analyses of chunked data (e.g. from
+    file_io.iter_data) in a single pass over the chunks, as for the
+    DataHandler duplicate and gap methods. Since the chunks are in time
+    order, duplicates of a record or timestamp can only lie in the same chunk
+    or at the end of the preceding chunk, and gaps can only span the
+    boundary with the preceding chunk, so only the last timestamp and the
+    fingerprints of the records at that timestamp are carried from one chunk
+    to the next.
+
+    Args:
+        chunks: iterable of dataframes with datetime index, in time order.
+        interval (optional): the measurement interval (in minutes). If None,
+            only the duplicate analysis is done.
+        duplicates (optional): if False, the duplicate analysis is skipped
+            (duplicate timestamps are still dropped for the gap analysis).
+
+    Raises:
+        TypeError: raised if an interval is passed and the chunks contain
+            fewer than two (non-duplicate) records.
+        ValueError: raised if the timestamps are not in time order.
+
+    Returns:
+        Dates of duplicate records (key 'duplicate_records') and duplicate
+        indices (key 'duplicate_indices') if duplicates is True and, if an
+        interval is passed, the gaps (key 'gaps'; as for get_chunked_gaps) and the distribution of
+        gap sizes (key 'gap_distribution').
+
+    """
+
+    state, start, n_records = _get_empty_boundary(), None, 0
+    rslt = (
+        {'duplicate_records': [], 'duplicate_indices': []} if duplicates
+        else {}
+        )
+    tables = []
+    for chunk in chunks:
+
+        # Fingerprint numerics as float so that a column inferred as int in
+        # one chunk and float in another yields the same fingerprints
+        fingerprints = None
+        if duplicates:
+            fingerprints = pd.util.hash_pandas_object(
+                chunk.astype(
+                    {col: 'float64' for col in chunk.select_dtypes('number')}
+                    ),
+                index=True,
+                categorize=False
+                ).to_numpy()
+        ns = chunk.index.to_numpy(dtype='datetime64[ns]').view('i8')
+        last = state['time']
+        repeats, records, state = _get_boundary_repeats(
+            state=state, times=ns, fingerprints=fingerprints
+            )
+        if duplicates:
+            rslt['duplicate_records'] += (
+                chunk.index[records].to_pydatetime().tolist()
+                )
+            rslt['duplicate_indices'] += (
+                chunk.index[repeats & ~records].to_pydatetime().tolist()
+                )
+        if interval is None:
+            continue
+
+        # Gaps in the non-duplicate timestamps, bounded by the last timestamp
+        # of the preceding chunk
+        ns = ns[~repeats]
+        if not len(ns):
+            continue
+        if start is None:
+            start = ns[0]
+        n_records += len(ns)
+        bounded = ns if last is None else np.insert(ns, 0, last)
+        steps = ((np.diff(bounded) // 10**9) / (60 * interval)).astype(int)
+        locs = np.flatnonzero(steps != 1)
+        times = bounded.view('datetime64[ns]')
+        tables.append(pd.DataFrame({
+            'last_preceding': times[locs],
+            'first_succeeding': times[locs + 1],
+            'n_records': steps[locs],
+            'n_missing': steps[locs] - 1
+            }))
+    if interval is None:
+        return rslt
+    if n_records < 2:
+        raise TypeError('Analysis not applicable to single record!')
+    rslt['gaps'] = {
+        'table': pd.concat(tables, ignore_index=True),
+        'n_records': n_records,
+        'start': start,
+        'end': state['time']
+        }
+    rslt['gap_distribution'] = _get_gap_distribution(
+        table=rslt['gaps']['table']
+        )
+    return rslt
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_chunked_duplicates(chunks) -> dict:
+    """
+    Get duplicate records and duplicate indices (duplicate timestamps with
+    non-duplicate data) from chunked data (e.g. from file_io.iter_data), as
+    for DataHandler.get_duplicate_records / get_duplicate_indices (see
+    get_chunked_analysis).
+
+    Args:
+        chunks: iterable of dataframes with datetime index, in time order.
+
+    Returns:
+        Dates of duplicate records (key 'duplicate_records') and duplicate
+        indices (key 'duplicate_indices').
+
+    """
+
+    return get_chunked_analysis(chunks=chunks)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_chunked_gaps(chunks, interval: int) -> dict:
+    """
+    Get the run-length table of gaps in chunked data (e.g. from
+    file_io.iter_data), as for DataHandler._get_gaps (see
+    get_chunked_analysis).
+
+    Args:
+        chunks: iterable of dataframes with datetime index, in time order.
+        interval: the measurement interval (in minutes).
+
+    Returns:
+        The gap table (key 'table'; with the last date preceding and first
+        date succeeding each gap, the gap size in intervals as n_records and
+        the number of missing records as n_missing), and the number of
+        records and first and last timestamps (int64 ns) of the
+        non-duplicate data.
+
+    """
+
+    return get_chunked_analysis(
+        chunks=chunks, interval=interval, duplicates=False
+        )['gaps']
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_chunked_gap_distribution(chunks, interval: int) -> pd.DataFrame:
+    """
+    Get the distribution of gap sizes from chunked data (e.g. from
+    file_io.iter_data), as for DataHandler.get_gap_distribution (see
+    get_chunked_analysis).
+
+    Args:
+        chunks: iterable of dataframes with datetime index, in time order.
+        interval: the measurement interval (in minutes).
+
+    Returns:
+        Number of gaps (column 'count') by the number of missing records
+        (index 'n_records').
+
+    """
+
+    return _get_gap_distribution(
+        table=get_chunked_gaps(chunks=chunks, interval=interval)['table']
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_gap_distribution(table: pd.DataFrame) -> pd.DataFrame:
+
+    unique_gaps, counts = np.unique(table.n_missing, return_counts=True)
+    return (
+        pd.DataFrame(
+            data=zip(unique_gaps, counts),
+            columns=['n_records', 'count']
+            )
+        .set_index(keys='n_records')
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_empty_boundary() -> dict:
+
+    return {'time': None, 'fingerprints': np.array([], dtype='i8')}
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_boundary_repeats(
+        state: dict, times: np.ndarray, fingerprints: np.ndarray=None
+        ) -> tuple:
+    """
+    Mark the timestamps (and optionally the record fingerprints) of a chunk
+    that repeat a preceding one, in this chunk or at the end of the
+    preceding chunk, and get the state to carry over to the next chunk.
+
+    Args:
+        state: the last timestamp (int64 ns) of the preceding chunks (key
+            'time') and the fingerprints of the records at that timestamp
+            (key 'fingerprints').
+        times: the timestamps (int64 ns) of the chunk.
+        fingerprints (optional): the record fingerprints of the chunk.
+
+    Raises:
+        ValueError: raised if the timestamps are not in time order.
+
+    Returns:
+        Boolean arrays indicating repeated timestamps and repeated records
+        (None if no fingerprints are passed), and the updated state.
+
+    """
+
+    last = state['time']
+    if not len(times):
+        return (
+            np.zeros(0, dtype=bool),
+            None if fingerprints is None else np.zeros(0, dtype=bool),
+            state
+            )
+    steps = np.diff(times)
+    if (steps < 0).any() or (last is not None and times[0] < last):
+        raise ValueError('Chunked analysis requires data in time order!')
+    time_repeats = np.concatenate([[times[0] == last], steps == 0])
+    new_last = times[-1]
+    if fingerprints is None:
+        return time_repeats, None, {'time': new_last, 'fingerprints': None}
+
+    # Duplicate records share their timestamp (the index is fingerprinted),
+    # so only the records at the last timestamp can repeat in the next chunk
+    fingerprints = fingerprints.view('i8')
+    carried = (
+        state['fingerprints'] if last is not None and times[0] == last
+        else np.array([], dtype='i8')
+        )
+    record_repeats = (
+        pd.Index(np.concatenate([carried, fingerprints]))
+        .duplicated()[len(carried):]
+        )
+    tail = fingerprints[times == new_last]
+    if new_last == last:
+        tail = np.concatenate([carried, tail])
+    return (
+        time_repeats,
+        record_repeats,
+        {'time': new_last, 'fingerprints': tail}
+        )
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END CHUNKED DATA FUNCTIONS ###
+###############################################################################
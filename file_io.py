@@ -19,15 +19,38 @@ between disk and memory, checking only structural integrity of the files.
 It does NOT evaluate data integrity!
 """
 
+import base64
+import collections
+import contextlib
 import csv
 import datetime as dt
+import gzip
+import hashlib
+from io import BufferedReader, BytesIO, StringIO, UnsupportedOperation
+import itertools
+import json
+import lzma
 import os
+import shutil
+import tempfile
 from typing import Callable
 
 import numpy as np
 from numpy.typing import ArrayLike
 import pandas as pd
 import pathlib
+import warnings
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import parquet as pq
+except ImportError:
+    pa = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 ###############################################################################
 ### CONSTANTS ###
@@ -73,8 +96,487 @@ INFO_FIELDS = [
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
+# Strict formats accepted when reading dates from single lines (DATE_FORMAT,
+# then with fractional seconds for 10Hz data, then the HH:MM time strings of
+# EddyPro files)
+DATE_READ_FORMATS = [DATE_FORMAT, f'{DATE_FORMAT}.%f', '%Y-%m-%d %H:%M']
+
+# Fixed format for parsing time variables: pandas' ISO parser covers
+# DATE_FORMAT as well as fractional seconds (10Hz data) and the HH:MM time
+# strings of EddyPro files, without per-element format inference
+DATE_PARSE_FORMAT = 'ISO8601'
+
+# Dtype policies for parsed data: `float32` downcasts float columns where no
+# precision is lost, `categorical` stores repetitive non-numeric columns as
+# categoricals and `lazy_dates` drops the date string columns (reformat_data
+# rebuilds them from the index)
+DTYPE_POLICIES = {
+    'default': {'float32': False, 'categorical': False, 'lazy_dates': False},
+    'compact': {'float32': True, 'categorical': True, 'lazy_dates': True}
+    }
+
+FLOAT32_SIG_DIGITS = 7
+
 EDDYPRO_SEARCH_STR = 'EP-Summary'
 
+PROBE_BYTES = 2**13
+
+CHUNK_RECORDS = 10**5
+
+# Number of records formatted per block by the fixed-precision writer
+WRITE_BLOCK_RECORDS = 10**4
+
+# Number of records at the end of an existing file that must match the data
+# before new records are appended
+APPEND_CHECK_RECORDS = 100
+
+REVERSE_BLOCK_BYTES = 2**16
+
+COUNT_BLOCK_BYTES = 2**20
+
+CACHE_DIR_NAME = '.file_io_cache'
+
+# Local directory for the sidecar files (checkpoints, date indexes, archive
+# tails) of data files; sidecars are keyed on the resolved path of the data file and are
+# never written to the (synced) data directories
+SIDECAR_CACHE = {'cache_dir': pathlib.Path.home() / CACHE_DIR_NAME}
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+
+PARSE_CACHE_SUFFIX = '.parsed.npz'
+
+DATE_INDEX_SUFFIX = '.index.json'
+
+STREAM_TAIL_SUFFIX = '.tail.json'
+
+DATE_INDEX_STRIDE = 1000
+
+DATE_INDEX_BLOCK_LINES = 10**4
+
+PARSE_CACHE = {'cache_dir': None, 'max_bytes': 2 * 1024**3}
+
+# Compressed archive suffixes readable by all entry points (`.zst` requires
+# the optional zstandard package); archives are written with ARCHIVE_CODEC
+# for files not modified in the last ARCHIVE_MIN_AGE_DAYS
+COMPRESSION_SUFFIXES = ['.gz', '.zst', '.xz']
+
+ARCHIVE_CODEC = '.gz'
+
+ARCHIVE_MIN_AGE_DAYS = 7
+
+# Columnar (parquet) files, which require the optional pyarrow package:
+# compression codec, time interval of the row groups (chunks) and schema
+# metadata key of the TOA5 headers and file info
+COLUMNAR_SUFFIX = '.parquet'
+
+COLUMNAR_COMPRESSION = 'zstd'
+
+COLUMNAR_CHUNK_INTERVAL = '30min'
+
+COLUMNAR_METADATA_KEY = b'file_io'
+
+# Reader engines for raw data (`pyarrow` requires the optional pyarrow package)
+READER_ENGINES = ['c', 'pyarrow']
+
+READER = {'engine': 'c'}
+
+# Interval inference: number of file offsets sampled and lines read at each,
+# and inferred intervals cached (least recently used first evicted) by file
+# identity (path, size, mtime) and inference options
+INTERVAL_SAMPLE_OFFSETS = 5
+
+INTERVAL_SAMPLE_LINES = 200
+
+FILE_INTERVAL_CACHE = {
+    'max_entries': 1024, 'entries': collections.OrderedDict()
+    }
+
+# Timestamp strings formatted by reformat_data, reused for later indexes that
+# are identical to, or a regular sub-range of, a cached index
+DATE_STRING_CACHE = {'max_entries': 16, 'entries': []}
+
+
+
+###############################################################################
+### CLASSES ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+class FileProbe():
+    """Single-open probe of a TOA5 or EddyPro file. The head and tail bytes are
+    read once, and the file type, info, headers, data offset and start / end
+    dates are all derived from them without further file access. The tail of
+    a compressed file can only be reached by decompressing the whole stream,
+    so it is read only when needed (for dates and record estimates), and the
+    tail, decompressed size and dates are cached in a sidecar.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(
+            self, file: str | pathlib.Path, file_type: str=None,
+            probe_bytes: int=PROBE_BYTES
+            ):
+        """Read the head and tail of the file.
+
+        Args:
+            file: absolute path of file to parse.
+            file_type: if specified, must be either `TOA5` or
+                `EddyPro`. If None, file_type is detected from the first line.
+            probe_bytes: the number of bytes to read from each of the head and
+                tail of the file (the head is extended if the header lines are
+                longer).
+
+        """
+
+        # Read head (at least all header lines plus one data line) and tail
+        # (compressed streams are only read through to the tail when needed)
+        n_lines = max(
+            max(configs['header_lines'].values())
+            for configs in FILE_CONFIGS.values()
+            ) + 2
+        self._size, self._tail, self._stream_cache = None, None, None
+        with open_file(file=file) as f:
+            head = f.read(probe_bytes)
+            while head.count(b'\n') < n_lines:
+                more = f.read(probe_bytes)
+                if not more:
+                    break
+                head += more
+            if not is_compressed(file=file):
+                self._size = f.seek(0, os.SEEK_END)
+                tail_offset = (
+                    0 if self._size <= len(head)
+                    else max(self._size - probe_bytes, 0)
+                    )
+                f.seek(tail_offset)
+                self._tail = _trim_tail(
+                    tail=f.read(), tail_offset=tail_offset
+                    )
+
+        # Set attributes
+        lines = head.splitlines(keepends=True)
+        self.file = pathlib.Path(file)
+        self.probe_bytes = probe_bytes
+        self.file_type = (
+            file_type if file_type else
+            _get_file_type_from_line(line=lines[0].decode())
+            )
+        n_header_lines = (
+            max(FILE_CONFIGS[self.file_type]['header_lines'].values()) + 1
+            )
+        self.header_bytes = b''.join(lines[:n_header_lines])
+        self.data_offset = len(self.header_bytes)
+        self._header_lines = _get_header_lines(
+            header_bytes=self.header_bytes, file_type=self.file_type
+            )
+        self._head = head
+        self._header_df = None
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        """The (decompressed) size of the file in bytes."""
+
+        if self._size is None:
+            self._load_stream_tail()
+        return self._size
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    @property
+    def tail(self) -> bytes:
+        """The complete lines in the last probe_bytes of the file."""
+
+        if self._tail is None:
+            self._load_stream_tail()
+        return self._tail
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_file_info(self, dummy_override: bool=False) -> dict:
+        """Get the information from the first line of the TOA5 file. If EddyPro
+        file OR dummy_override, just grab the defaults from the configuration
+        dictionary.
+
+        Args:
+            dummy_override: Whether to just retrieve the default info. The
+                default is False.
+
+        Returns:
+            Dictionary of elements.
+
+        """
+
+        if dummy_override or self.file_type == 'EddyPro':
+            return dict(zip(
+                INFO_FIELDS, FILE_CONFIGS[self.file_type]['dummy_info']
+                ))
+        return dict(zip(
+            INFO_FIELDS,
+            self._header_lines[FILE_CONFIGS['TOA5']['info_line']]
+            ))
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_header_df(self) -> pd.core.frame.DataFrame:
+        """Get a dataframe with variables as index and units and statistical
+        sampling type (if file type = TOA5) as columns.
+
+        Returns:
+            The file header content.
+
+        """
+
+        if self._header_df is None:
+            self._header_df = _get_header_df_from_lines(
+                header_lines=self._header_lines, file_type=self.file_type
+                )
+        return self._header_df.copy()
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_start_end_dates(self) -> dict:
+        """Get start and end dates from the first and last valid records in
+        the probed bytes (falls back to scanning the file if the probed bytes
+        contain no valid record).
+
+        Returns:
+            dictionary containing start and end dates.
+
+        """
+
+        if self._size is None:
+            self._load_stream_tail()
+            if self._stream_cache['dates'] is not None:
+                return {
+                    key: dt.datetime.fromisoformat(value)
+                    for key, value in self._stream_cache['dates'].items()
+                    }
+        head_lines = (
+            self._head[self.data_offset: self._head.rfind(b'\n') + 1]
+            .splitlines()
+            )
+        rslt = {
+            'start_date': self._get_first_date(lines=head_lines),
+            'end_date': self._get_first_date(
+                lines=reversed(self.tail.splitlines())
+                )
+            }
+        if None in rslt.values():
+            rslt = get_start_end_dates(file=self.file, file_type=self.file_type)
+        if self._stream_cache is not None and None not in rslt.values():
+            self._stream_cache['dates'] = {
+                key: value.isoformat() for key, value in rslt.items()
+                }
+            _write_checkpoint(
+                checkpoint_file=self._get_stream_cache_file(),
+                checkpoint=self._stream_cache
+                )
+        return rslt
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def estimate_n_records(self) -> int:
+        """Estimate the number of data records from the file size and the
+        average line length of the probed data lines. If the probed bytes
+        cover most of the file, the records are counted instead.
+
+        Returns:
+            The (estimated) number of records.
+
+        """
+
+        n_header_lines = (
+            max(FILE_CONFIGS[self.file_type]['header_lines'].values()) + 1
+            )
+        if self.size <= 2 * len(self._head):
+            return max(get_file_n_lines(file=self.file) - n_header_lines, 0)
+        sample = (
+            self._head[self.data_offset: self._head.rfind(b'\n') + 1] +
+            self.tail
+            )
+        n_lines = len(sample.splitlines())
+        if not n_lines:
+            return 0
+        return round((self.size - self.data_offset) * n_lines / len(sample))
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _load_stream_tail(self):
+        """Get the tail and decompressed size of a compressed file from the
+        sidecar cache if it is still valid for the file (same size and
+        modification time), else decompress the stream and cache them.
+
+        Returns:
+            None.
+
+        """
+
+        stat = os.stat(self.file)
+        identity = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        cache = _read_checkpoint(checkpoint_file=self._get_stream_cache_file())
+        if cache is None or not cache['identity'] == identity:
+            with open_file(file=self.file) as f:
+                size, tail = _read_stream_tail(f=f, n_bytes=self.probe_bytes)
+            if size <= len(self._head):
+                tail, tail_offset = self._head, 0
+            else:
+                tail_offset = max(size - self.probe_bytes, 0)
+            cache = {
+                'identity': identity,
+                'size': size,
+                'tail': base64.b64encode(
+                    _trim_tail(tail=tail, tail_offset=tail_offset)
+                    ).decode(),
+                'dates': None
+                }
+            _write_checkpoint(
+                checkpoint_file=self._get_stream_cache_file(),
+                checkpoint=cache
+                )
+        self._stream_cache = cache
+        self._size = cache['size']
+        self._tail = base64.b64decode(cache['tail'])
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _get_stream_cache_file(self) -> pathlib.Path:
+
+        return _get_cache_path(
+            file=self.file, suffix=STREAM_TAIL_SUFFIX,
+            key=[self.file_type, self.probe_bytes]
+            )
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _get_first_date(self, lines: list) -> dt.datetime:
+        """Get the date of the first valid line.
+
+        Args:
+            lines: iterable of line bytes.
+
+        Returns:
+            The date, or None if no line contains a valid date.
+
+        """
+
+        line_formatter = get_formatter(
+            file_type=self.file_type, which='read_line'
+            )
+        date_formatter = get_formatter(
+            file_type=self.file_type, which='read_date'
+            )
+        for line in lines:
+            try:
+                return date_formatter(line_formatter(line.decode()))
+            except (ValueError, IndexError):
+                continue
+        return None
+    #--------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+class _CoercedCells():
+    """Immutable handle on the report of coerced cells, held in the attrs of
+    parsed data. Pandas deep-copies attrs to every derived object, so the
+    handle copies as itself rather than copying the report.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, report: pd.core.frame.DataFrame):
+        """Hold a sorted copy of the report.
+
+        Args:
+            report: the DATETIME, variable and raw value of each coerced cell.
+
+        """
+
+        self._report = (
+            report
+            [['DATETIME', 'variable', 'value']]
+            .astype({
+                'DATETIME': 'datetime64[ns]', 'variable': object,
+                'value': object
+                })
+            .sort_values(by='DATETIME', kind='stable')
+            .reset_index(drop=True)
+            )
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def __copy__(self):
+
+        return self
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def __deepcopy__(self, memo: dict):
+
+        return self
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_report(self) -> pd.core.frame.DataFrame:
+        """Get a copy of the report.
+
+        Returns:
+            The DATETIME, variable and raw value of each coerced cell.
+
+        """
+
+        return self._report.copy()
+    #--------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+class _ForwardSeekReader(BufferedReader):
+    """Buffered reader for decompression streams that can seek forward only
+    (by decompressing and discarding), such as zstandard readers.
+    """
+
+    #--------------------------------------------------------------------------
+    def seekable(self) -> bool:
+
+        return True
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def seek(self, offset: int, whence: int=os.SEEK_SET) -> int:
+        """Seek forward to a position in the decompressed stream.
+
+        Args:
+            offset: the offset.
+            whence: the reference position for offset (offset must be zero
+                for os.SEEK_END).
+
+        Raises:
+            UnsupportedOperation: raised if the position is behind the current
+                position.
+
+        Returns:
+            The new position.
+
+        """
+
+        if whence == os.SEEK_END and not offset:
+            while self.read(COUNT_BLOCK_BYTES):
+                pass
+            return self.tell()
+        if whence == os.SEEK_CUR:
+            offset += self.tell()
+        if whence == os.SEEK_END or offset < self.tell():
+            raise UnsupportedOperation('Stream can only seek forward!')
+        while self.tell() < offset:
+            if not self.read(min(offset - self.tell(), COUNT_BLOCK_BYTES)):
+                break
+        return self.tell()
+    #--------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+
 
 
 ###############################################################################
@@ -89,9 +591,17 @@ EDDYPRO_SEARCH_STR = 'EP-Summary'
 
 #------------------------------------------------------------------------------
 def get_data(
-        file: str | pathlib.Path, file_type: str=None, usecols: list=None
+        file: str | pathlib.Path, file_type: str=None, usecols: list=None,
+        use_cache: bool=True, start: dt.datetime=None, end: dt.datetime=None,
+        dtype_policy: str | dict=None, engine: str=None
         ) -> pd.core.frame.DataFrame:
-    """Read data from file.
+    """Read data from file. If the parse cache is enabled (see
+    set_parse_cache), unchanged files are retrieved from the cache, and for
+    files that have only been appended to since they were cached, only the
+    appended records are parsed (see get_appended_data). If start
+    and / or end are passed, the date index (see update_date_index) is used to
+    read only the byte range containing the window (the parse cache is not
+    used).
 
     Args:
         file: absolute path of file to parse.
@@ -100,6 +610,13 @@ def get_data(
         usecols (list, optional): The subset of columns to keep. If None, keep
             all.
         Defaults to None.
+        use_cache: whether to use the parse cache (if enabled).
+        start: if specified, the first date of the window to read.
+        end: if specified, the last date of the window to read.
+        dtype_policy: the dtype policy to apply (see apply_dtype_policy). If
+            None, the default policy is applied.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
 
     Returns:
         File data content.
@@ -110,152 +627,205 @@ def get_data(
     if not file_type:
         file_type = get_file_type(file)
 
+    # If a window is requested, seek straight to it
+    if start is not None or end is not None:
+        return apply_dtype_policy(
+            df=_get_data_window(
+                file=file, file_type=file_type, usecols=usecols, start=start,
+                end=end, engine=engine
+                ),
+            file_type=file_type,
+            dtype_policy=dtype_policy
+            )
+
+    # Use the cache if enabled, else import data
+    if use_cache and PARSE_CACHE['cache_dir'] is not None:
+        df = _get_cached_data(
+            file=file, file_type=file_type, usecols=usecols, engine=engine
+            )
+    else:
+        df = _read_file(
+            file=file, file_type=file_type, usecols=usecols, engine=engine
+            )
+    return apply_dtype_policy(
+        df=df, file_type=file_type, dtype_policy=dtype_policy
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_file(
+        file: str | pathlib.Path, file_type: str, usecols: list=None,
+        engine: str=None
+        ) -> pd.core.frame.DataFrame:
+    """Parse the whole file.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
+
+    Returns:
+        Data content.
+
+    """
+
     # Get dictionary containing file configurations
     MASTER_DICT = FILE_CONFIGS[file_type]
 
     # Set rows to skip
-    REQ_TIME_VARS = list(MASTER_DICT['time_variables'].keys())
-    CRITICAL_FILE_VARS = MASTER_DICT['non_numeric_cols']
     rows_to_skip = list(set([0] + list(MASTER_DICT['header_lines'].values())))
     rows_to_skip.remove(MASTER_DICT['header_lines']['variable'])
 
-    # Usecols MUST include critical non-numeric variables (including date vars)
-    # and at least ONE additional column; if this condition is not satisifed,
-    # do not subset the columns on import.
-    thecols = None
-    if usecols and not usecols == CRITICAL_FILE_VARS:
-        thecols = (
-            CRITICAL_FILE_VARS +
-            [col for col in usecols if not col in CRITICAL_FILE_VARS]
-            )
-
     # Now import data
-    return (
-        pd.read_csv(
-            file,
-            skiprows=rows_to_skip,
-            usecols=thecols,
-            parse_dates={'DATETIME': REQ_TIME_VARS},
-            keep_date_col=True,
-            na_values=MASTER_DICT['na_values'],
-            sep=MASTER_DICT['separator'],
-            engine='c',
-            on_bad_lines='warn',
-            low_memory=False
-            )
-        .set_index(keys='DATETIME')
-        .astype({x: object for x in REQ_TIME_VARS})
-        .pipe(_integrity_checks, non_numeric=CRITICAL_FILE_VARS)
+    return _parse_data(
+        source=file, file_type=file_type, usecols=usecols,
+        skiprows=rows_to_skip, engine=engine
         )
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def _integrity_checks(df: pd.core.frame.DataFrame, non_numeric: list):
-    """Check the integrity of data and indices.
+def apply_dtype_policy(
+        df: pd.core.frame.DataFrame, file_type: str,
+        dtype_policy: str | dict=None
+        ) -> pd.core.frame.DataFrame:
+    """Apply a dtype policy to parsed data to reduce its memory footprint.
 
     Args:
-      df: dataframe containing the data.
-      non_numeric: column names to ignore when coercing to numeric type.
+        df: the data.
+        file_type: must be either `TOA5` or `EddyPro`.
+        dtype_policy: name of a policy in DTYPE_POLICIES, or dict overriding
+            any of the options of the default policy. If None, the default
+            policy (no change) is applied.
 
-    """
+    Returns:
+        The data.
 
-    # Coerce non-numeric data in numeric columns
-    non_nums = df.select_dtypes(include='object')
-    for col in non_nums.columns:
-        if col in non_numeric: continue
-        df[col] = pd.to_numeric(non_nums[col], errors='coerce')
+    Raises:
+        KeyError: raised if the policy or any of its options is unknown.
 
-    # Check the index type, and if bad time data exists, dump the record
-    if not df.index.dtype == '<M8[ns]':
-        df.index = pd.to_datetime(df.index, errors='coerce')
-        df = df[~pd.isnull(df.index)]
+    """
 
-    # Sort the index
-    return df.sort_index()
+    if isinstance(dtype_policy, str):
+        policy = DTYPE_POLICIES[dtype_policy]
+    else:
+        policy = DTYPE_POLICIES['default'] | (dtype_policy or {})
+    unknown = set(policy) - set(DTYPE_POLICIES['default'])
+    if unknown:
+        raise KeyError(f'Unknown dtype policy options: {unknown}')
+
+    # Drop the date strings (can be rebuilt from the index)
+    if policy['lazy_dates']:
+        time_vars = FILE_CONFIGS[file_type]['time_variables'].keys()
+        df = df.drop([var for var in time_vars if var in df.columns], axis=1)
+
+    # Downcast floats where float32 preserves the values
+    if policy['float32']:
+        df = df.astype({
+            col: 'float32' for col in df.select_dtypes('float64')
+            if _check_float32_precision(values=df[col].to_numpy())
+            })
+
+    # Store repetitive non-numerics as categoricals
+    if policy['categorical']:
+        df = df.astype({
+            col: 'category' for col in df.select_dtypes('object')
+            if df[col].nunique() < len(df) / 2
+            })
+    return df
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_file_headers(
-        file: str | pathlib.Path, begin: int, end: int, sep: str=','
-        ) -> list:
-    """Get a list of the header strings.
+def _check_float32_precision(values: np.ndarray) -> bool:
+    """Check whether float32 preserves values to FLOAT32_SIG_DIGITS
+    significant digits (i.e. the precision of the logger output).
 
     Args:
-        file: absolute path of file to parse.
-        begin: line number of first header line.
-        end: line number of last header line.
-        sep: text separation character.
+        values: the float64 values.
 
     Returns:
-        List of sublists, each sublist containing the text elements of a header
-            line.
+        True if the values are preserved, else False.
 
     """
 
-    line_list = []
-    with open(file, 'r') as f:
-        for i in range(end + 1):
-            line = f.readline()
-            if not i < begin:
-                line_list.append(line)
-    return [line for line in csv.reader(line_list, delimiter=sep)]
+    values = values[np.isfinite(values) & (values != 0)]
+    if len(values) == 0:
+        return True
+    with np.errstate(over='ignore'):
+        as_float32 = values.astype(np.float32).astype(np.float64)
+    scale = 10.0 ** (
+        FLOAT32_SIG_DIGITS - 1 - np.floor(np.log10(np.abs(values)))
+        )
+    return np.allclose(
+        np.round(as_float32 * scale) / scale, values, rtol=1e-12, atol=0
+        )
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_header_df(
-        file: str | pathlib.Path, file_type: str=None
+def _parse_data(
+        source: str | pathlib.Path | BytesIO, file_type: str,
+        usecols: list=None, skiprows: list=None, names: list=None,
+        engine: str=None
         ) -> pd.core.frame.DataFrame:
-    """Get a dataframe with variables as index and units and statistical
-    sampling type (if file type = TOA5) as columns.
+    """Parse data from a file or buffer into a conditioned dataframe.
 
     Args:
-        file: absolute path of file to parse.
-        file_type: if specified, must be either `TOA5` or
-            `EddyPro`. If None, file_type is fetched.
+        source: absolute path of file to parse, or buffer containing raw data.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        skiprows: the line numbers to skip (pandas engine only; the pyarrow
+            engine skips the header lines from FILE_CONFIGS).
+        names: column names to use if the source does not contain the
+            header lines. If None, the names are read from the source.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
 
     Returns:
-        The file header content.
+        Data content.
 
     """
 
-    # If file type not supplied, detect it.
-    if not file_type:
-        file_type = get_file_type(file)
-
-    configs_dict = FILE_CONFIGS[file_type]
-    return (
-        pd.DataFrame(
-            dict(zip(
-                configs_dict['header_lines'].keys(),
-                get_file_headers(
-                     file=file,
-                     begin=min(configs_dict['header_lines'].values()),
-                     end=max(configs_dict['header_lines'].values()),
-                     sep=configs_dict['separator']
-                     )
-                ))
+    if engine is None:
+        engine = READER['engine']
+    _check_engine(engine=engine)
+    df = None
+    if engine == 'pyarrow':
+        df = _read_csv_pyarrow(
+            source=source, file_type=file_type, usecols=usecols, names=names
             )
-        .set_index(keys='variable')
-        )
+        if df is None and isinstance(source, BytesIO):
+            source.seek(0)
+    if df is None:
+        df = pd.read_csv(
+            source,
+            **_get_read_kwargs(
+                file_type=file_type, usecols=usecols, skiprows=skiprows,
+                names=names
+                )
+            )
+    return _condition_data(df=df, file_type=file_type)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_file_info(
-        file: str | pathlib.Path, file_type: str=None,
-        dummy_override: bool=False
-        ) -> list:
-    """Get the information from the first line of the TOA5 file. If EddyPro file
-    OR dummy_override, just grab the defaults from the configuration dictionary.
+def iter_data(
+        file: str | pathlib.Path, file_type: str=None, usecols: list=None,
+        chunksize: int=CHUNK_RECORDS
+        ):
+    """Read data from file in chunks of bounded size, so that large files can
+    be processed with flat memory. Each chunk is conditioned as for get_data,
+    but chunks are sorted only internally, and duplicates across chunks are
+    retained.
 
     Args:
         file: absolute path of file to parse.
         file_type: if specified, must be either `TOA5` or
             `EddyPro`. If None, file_type is fetched.
-        dummy_override: Whether to just retrieve the default info. The default
-            is False.
+        usecols: the subset of columns to keep. If None, keep all.
+        chunksize: the maximum number of records per chunk.
 
-    Returns:
-        Dictionary of elements.
+    Yields:
+        Chunks of file data content.
 
     """
 
@@ -263,217 +833,2106 @@ def get_file_info(
     if not file_type:
         file_type = get_file_type(file)
 
-    # If dummy override (or EddyPro, which has no file info) requested,
-    # return dummy info
-    if dummy_override or file_type == 'EddyPro':
-        return dict(zip(INFO_FIELDS, FILE_CONFIGS[file_type]['dummy_info']))
+    # Set rows to skip
+    MASTER_DICT = FILE_CONFIGS[file_type]
+    rows_to_skip = list(set([0] + list(MASTER_DICT['header_lines'].values())))
+    rows_to_skip.remove(MASTER_DICT['header_lines']['variable'])
 
-    # Otherwise get the TOA5 file info from the file
-    return dict(zip(
-        INFO_FIELDS,
-        get_file_headers(
-            file=file,
-            begin=FILE_CONFIGS['TOA5']['info_line'],
-            end=FILE_CONFIGS['TOA5']['info_line'],
-            sep=FILE_CONFIGS['TOA5']['separator']
-            )[0]
-        ))
+    # Read and condition the chunks
+    with pd.read_csv(
+            file,
+            chunksize=chunksize,
+            **_get_read_kwargs(
+                file_type=file_type, usecols=usecols, skiprows=rows_to_skip
+                )
+            ) as reader:
+        for chunk in reader:
+            yield _condition_data(df=chunk, file_type=file_type)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_file_type(file: str | pathlib.Path) -> str:
-    """Get the file type.
+def _get_read_kwargs(
+        file_type: str, usecols: list=None, skiprows: list=None,
+        names: list=None
+        ) -> dict:
+    """Get the keyword arguments for reading raw data with pandas read_csv.
 
     Args:
-        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        skiprows: the line numbers to skip.
+        names: column names to use if the source does not contain the
+            variable header line. If None, the names are read from the source.
 
     Returns:
-        name of file type (`TOA5` or `EddyPro`).
-
-    Raises:
-      TypeError: Raised if file type not recognised.
+        The keyword arguments.
 
     """
 
-    for file_type in FILE_CONFIGS.keys():
-        id_field = (
-            get_file_headers(
-                file=file,
-                begin=0,
-                end=0,
-                sep=FILE_CONFIGS[file_type]['separator']
-                )
-            [0][0]
-            ).strip('\"')
-        if id_field == FILE_CONFIGS[file_type]['unique_file_id']:
-            return file_type
-    raise TypeError('Unknown file type!')
+    MASTER_DICT = FILE_CONFIGS[file_type]
+    REQ_TIME_VARS = list(MASTER_DICT['time_variables'].keys())
+
+    # Time variables are kept as strings and parsed separately (see
+    # _parse_timestamps)
+    return {
+        'skiprows': skiprows,
+        'header': None if names else 'infer',
+        'names': names,
+        'usecols': _get_usecols(file_type=file_type, usecols=usecols),
+        'dtype': {x: str for x in REQ_TIME_VARS},
+        'na_values': MASTER_DICT['na_values'],
+        'sep': MASTER_DICT['separator'],
+        'engine': 'c',
+        'on_bad_lines': 'warn',
+        'low_memory': False
+        }
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_file_type_configs(
-        file_type: str=None, return_field: dict | str=None) -> dict:
-    """Get the configuration dictionary for the file type.
+def _get_usecols(file_type: str, usecols: list=None) -> list:
+    """Get the columns to read given the requested subset.
 
     Args:
-      file_type: if specified, must be either `TOA5` or
-          `EddyPro`. If None, file_type is fetched. Default is None.
-      return_field:  the specific field to return (as str). If None, return all
-          (as dict) with fields as keys. Default is None.
-
-    Raises:
-        RuntimeError: raised if file_type is NOT specified and return_field IS
-            specified.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
 
     Returns:
-        file type configuration field or fields.
+        The columns to read, or None if all.
 
     """
 
-    if not file_type:
-        return FILE_CONFIGS
-        if not return_field is None:
-            raise RuntimeError(
-                'Cannot return individual field if file type not set!'
-                )
+    CRITICAL_FILE_VARS = FILE_CONFIGS[file_type]['non_numeric_cols']
+
+    # Usecols MUST include critical non-numeric variables (including date vars)
+    # and at least ONE additional column; if this condition is not satisifed,
+    # do not subset the columns on import.
+    if usecols and not usecols == CRITICAL_FILE_VARS:
+        return (
+            CRITICAL_FILE_VARS +
+            [col for col in usecols if not col in CRITICAL_FILE_VARS]
+            )
+    return None
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_csv_pyarrow(
+        source: str | pathlib.Path | BytesIO, file_type: str,
+        usecols: list=None, names: list=None
+        ) -> pd.core.frame.DataFrame:
+    """Read raw data with the multithreaded pyarrow CSV reader. Separator,
+    quoting, null markers and header lines are taken from FILE_CONFIGS, and
+    non-numeric columns are read as strings, so the result matches the pandas
+    C reader. The C reader pads rows with too few fields (e.g. a half-written
+    final line) with nulls, but pyarrow can only skip them (and their
+    positions are unknown when reading multithreaded), so if there are any
+    such rows None is returned and the source should be read with the C
+    reader.
+
+    Args:
+        source: absolute path of file to parse, or buffer containing raw data.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        names: column names to use if the source does not contain the
+            header lines. If None, the names are read from the source.
+
+    Returns:
+        Raw data content, or None if there are rows with too few fields.
+
+    """
+
+    MASTER_DICT = FILE_CONFIGS[file_type]
+    short_rows = []
+
+    def handle_invalid_row(row):
+        if row.actual_columns < row.expected_columns:
+            short_rows.append(row.text)
+            return 'skip'
+        return _skip_invalid_row(row=row)
+
+    # Get the names from the header (so the column order is preserved when
+    # subsetting), and skip all header lines
+    skip_rows = 0
+    if names is None:
+        names = _get_header_lines(
+            header_bytes=_get_header_bytes(file=source, file_type=file_type),
+            file_type=file_type
+            )[MASTER_DICT['header_lines']['variable']]
+        skip_rows = max(MASTER_DICT['header_lines'].values()) + 1
+    thecols = _get_usecols(file_type=file_type, usecols=usecols)
+
+    # Read the table (decompressing archives as a stream)
+    with contextlib.ExitStack() as stack:
+        if not isinstance(source, BytesIO) and is_compressed(file=source):
+            source = stack.enter_context(open_file(file=source))
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(
+                use_threads=True, skip_rows=skip_rows, column_names=names
+                ),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=MASTER_DICT['separator'],
+                quote_char=(
+                    False if MASTER_DICT['quoting'] == csv.QUOTE_NONE else '"'
+                    ),
+                invalid_row_handler=handle_invalid_row
+                ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=(
+                    None if thecols is None else
+                    [col for col in names if col in thecols]
+                    ),
+                column_types={
+                    col: pa.string() for col in MASTER_DICT['non_numeric_cols']
+                    },
+                null_values=(
+                    pa_csv.ConvertOptions().null_values +
+                    [MASTER_DICT['na_values']]
+                    ),
+                strings_can_be_null=True
+                )
+            )
+    if short_rows:
+        return None
+
+    # Pandas does not infer dates, so return them as strings (to be coerced
+    # with the other non-numerics)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(
+                i, field.name, table.column(i).cast(pa.string())
+                )
+    return table.to_pandas()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _skip_invalid_row(row) -> str:
+    """Warn about and skip a row with too many fields (pyarrow invalid row
+    handler; as for the C reader with on_bad_lines='warn').
+
+    Args:
+        row: the pyarrow invalid row.
+
+    Returns:
+        The instruction to skip the row.
+
+    """
+
+    warnings.warn(
+        f'Skipping line {row.number}: expected {row.expected_columns} fields, '
+        f'saw {row.actual_columns}'
+        )
+    return 'skip'
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def set_reader_engine(engine: str):
+    """Set the global reader engine used by get_data.
+
+    Args:
+        engine: must be one of READER_ENGINES.
+
+    Returns:
+        None.
+
+    """
+
+    _check_engine(engine=engine)
+    READER['engine'] = engine
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_engine(engine: str):
+    """Check the reader engine is valid and available.
+
+    Args:
+        engine: the reader engine.
+
+    Raises:
+        NotImplementedError: raised if engine not recognised.
+        ImportError: raised if the pyarrow engine is requested and pyarrow is
+            not installed.
+
+    Returns:
+        None
+
+    """
+
+    if not engine in READER_ENGINES:
+        raise NotImplementedError(f'Reader engine {engine} is not implemented!')
+    if engine == 'pyarrow' and pa is None:
+        raise ImportError('The pyarrow reader engine requires pyarrow!')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _condition_data(
+        df: pd.core.frame.DataFrame, file_type: str
+        ) -> pd.core.frame.DataFrame:
+    """Set the datetime index of raw data and check its integrity.
+
+    Args:
+        df: the raw data, with time variables as strings.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        Data content.
+
+    """
+
+    MASTER_DICT = FILE_CONFIGS[file_type]
+    df.index = _parse_timestamps(df=df, file_type=file_type)
+    return (
+        df
+        .astype({x: object for x in MASTER_DICT['time_variables'].keys()})
+        .pipe(_integrity_checks, non_numeric=MASTER_DICT['non_numeric_cols'])
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _parse_timestamps(
+        df: pd.core.frame.DataFrame, file_type: str
+        ) -> pd.core.indexes.datetimes.DatetimeIndex:
+    """Parse the time variable string columns into a datetime index using the
+    fixed ISO format parser (malformed timestamps are returned as NaT).
+
+    Args:
+        df: dataframe containing the time variables as strings.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The datetime index.
+
+    """
+
+    time_vars = list(FILE_CONFIGS[file_type]['time_variables'].keys())
+    strings = df[time_vars[0]]
+    for var in time_vars[1:]:
+        strings = strings + ' ' + df[var]
+    return pd.DatetimeIndex(
+        pd.to_datetime(strings, format=DATE_PARSE_FORMAT, errors='coerce'),
+        name='DATETIME'
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _integrity_checks(df: pd.core.frame.DataFrame, non_numeric: list):
+    """Check the integrity of data and indices. The cells of retained records
+    that were coerced to numeric type are attached to the data (see
+    get_coerced_cells).
+
+    Args:
+      df: dataframe containing the data.
+      non_numeric: column names to ignore when coercing to numeric type.
+
+    """
+
+    # Coerce non-numeric data in numeric columns
+    df, report = _coerce_numeric(df=df, non_numeric=non_numeric)
+
+    # Check the index type, and if bad time data exists, dump the record
+    if not df.index.dtype == '<M8[ns]':
+        df.index = pd.to_datetime(df.index, errors='coerce')
+        report['DATETIME'] = pd.to_datetime(report.DATETIME, errors='coerce')
+    df = df[~pd.isnull(df.index)]
+
+    # Sort the index
+    df = df.sort_index()
+    set_coerced_cells(df=df, report=report[report.DATETIME.notna()])
+    return df
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _coerce_numeric(df: pd.core.frame.DataFrame, non_numeric: list) -> tuple:
+    """Coerce all object columns (other than non-numeric columns) to numeric
+    type in a single pass over their stacked values, and report the cells that
+    could not be converted. Each distinct string is parsed only once (logger
+    output is highly repetitive).
+
+    Args:
+      df: dataframe containing the data.
+      non_numeric: column names to ignore when coercing to numeric type.
+
+    Returns:
+        The coerced data, and the report of coerced cells (the DATETIME index,
+            variable and raw value of each cell).
+
+    """
+
+    cols = [
+        col for col in df.select_dtypes(include='object').columns
+        if not col in non_numeric
+        ]
+    if not cols:
+        return df, pd.DataFrame(
+            {'DATETIME': df.index[:0], 'variable': [], 'value': []}
+            )
+
+    # Convert the distinct stacked (column-major) values, and map them back
+    # (null cells have code -1, so map to the NaN appended to the values)
+    raw = df[cols].to_numpy().ravel(order='F')
+    codes, uniques = pd.factorize(raw)
+    unique_values = pd.to_numeric(
+        pd.Series(uniques, dtype=object), errors='coerce'
+        ).to_numpy(dtype='float64')
+    coerced = np.append(unique_values, np.nan)[codes]
+
+    # Report cells that held a value but could not be converted
+    bad = (codes >= 0) & np.isnan(coerced)
+    col_locs, rows = np.divmod(np.flatnonzero(bad), len(df))
+    report = pd.DataFrame({
+        'DATETIME': df.index[rows],
+        'variable': np.array(cols, dtype=object)[col_locs],
+        'value': raw[bad]
+        })
+
+    # Replace the columns in one block
+    coerced_df = pd.DataFrame(
+        data=coerced.reshape(len(cols), -1).T, index=df.index, columns=cols
+        )
+    df = pd.concat([df.drop(cols, axis=1), coerced_df], axis=1)[df.columns]
+    return df, report
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_coerced_cells(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    """Get the report of cells coerced to numeric type when the data were
+    parsed (see _integrity_checks).
+
+    Args:
+        df: the parsed data.
+
+    Returns:
+        The DATETIME index, variable and raw value of each coerced cell.
+
+    """
+
+    handle = df.attrs.get('coerced_cells')
+    if handle is None:
+        handle = _CoercedCells(
+            report=pd.DataFrame(columns=['DATETIME', 'variable', 'value'])
+            )
+    return handle.get_report()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def set_coerced_cells(
+        df: pd.core.frame.DataFrame, report: pd.core.frame.DataFrame
+        ):
+    """Attach the report of coerced cells to the data (in the attrs, as an
+    immutable handle on the report sorted by date, so that it survives pandas
+    operations that propagate attrs without being copied by them).
+
+    Args:
+        df: the parsed data.
+        report: the DATETIME, variable and raw value of each coerced cell.
+
+    Returns:
+        None.
+
+    """
+
+    df.attrs['coerced_cells'] = _CoercedCells(report=report)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_file_headers(
+        file: str | pathlib.Path, begin: int, end: int, sep: str=','
+        ) -> list:
+    """Get a list of the header strings.
+
+    Args:
+        file: absolute path of file to parse.
+        begin: line number of first header line.
+        end: line number of last header line.
+        sep: text separation character.
+
+    Returns:
+        List of sublists, each sublist containing the text elements of a header
+            line.
+
+    """
+
+    line_list = []
+    with open_file(file=file, mode='r') as f:
+        for i in range(end + 1):
+            line = f.readline()
+            if not i < begin:
+                line_list.append(line)
+    return [line for line in csv.reader(line_list, delimiter=sep)]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_header_df(
+        file: str | pathlib.Path, file_type: str=None
+        ) -> pd.core.frame.DataFrame:
+    """Get a dataframe with variables as index and units and statistical
+    sampling type (if file type = TOA5) as columns.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched.
+
+    Returns:
+        The file header content.
+
+    """
+
+    return FileProbe(file=file, file_type=file_type).get_header_df()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_header_df_from_lines(
+        header_lines: list, file_type: str
+        ) -> pd.core.frame.DataFrame:
+    """Construct the header dataframe from the parsed header lines.
+
+    Args:
+        header_lines: list of sublists, each sublist containing the text
+            elements of a header line (starting from the first line of file).
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The file header content.
+
+    """
+
+    configs_dict = FILE_CONFIGS[file_type]
+    begin = min(configs_dict['header_lines'].values())
+    end = max(configs_dict['header_lines'].values())
+    return (
+        pd.DataFrame(
+            dict(zip(
+                configs_dict['header_lines'].keys(),
+                header_lines[begin: end + 1]
+                ))
+            )
+        .set_index(keys='variable')
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_file_info(
+        file: str | pathlib.Path, file_type: str=None,
+        dummy_override: bool=False
+        ) -> list:
+    """Get the information from the first line of the TOA5 file. If EddyPro file
+    OR dummy_override, just grab the defaults from the configuration dictionary.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched.
+        dummy_override: Whether to just retrieve the default info. The default
+            is False.
+
+    Returns:
+        Dictionary of elements.
+
+    """
+
+    # If file type not supplied, detect it.
+    if not file_type:
+        file_type = get_file_type(file)
+
+    # If dummy override (or EddyPro, which has no file info) requested,
+    # return dummy info
+    if dummy_override or file_type == 'EddyPro':
+        return dict(zip(INFO_FIELDS, FILE_CONFIGS[file_type]['dummy_info']))
+
+    # Otherwise get the TOA5 file info from the file
+    return FileProbe(file=file, file_type=file_type).get_file_info()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_file_type(file: str | pathlib.Path) -> str:
+    """Get the file type.
+
+    Args:
+        file: absolute path of file to parse.
+
+    Returns:
+        name of file type (`TOA5` or `EddyPro`).
+
+    Raises:
+      TypeError: Raised if file type not recognised.
+
+    """
+
+    with open_file(file=file, mode='r') as f:
+        return _get_file_type_from_line(line=f.readline())
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_file_type_from_line(line: str) -> str:
+    """Get the file type from the first line of the file.
+
+    Args:
+        line: the first line of the file.
+
+    Returns:
+        name of file type (`TOA5` or `EddyPro`).
+
+    Raises:
+      TypeError: Raised if file type not recognised.
+
+    """
+
+    for file_type in FILE_CONFIGS.keys():
+        id_field = (
+            [elems for elems in csv.reader(
+                [line], delimiter=FILE_CONFIGS[file_type]['separator']
+                )]
+            [0][0]
+            ).strip('\"')
+        if id_field == FILE_CONFIGS[file_type]['unique_file_id']:
+            return file_type
+    raise TypeError('Unknown file type!')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_file_type_configs(
+        file_type: str=None, return_field: dict | str=None) -> dict:
+    """Get the configuration dictionary for the file type.
+
+    Args:
+      file_type: if specified, must be either `TOA5` or
+          `EddyPro`. If None, file_type is fetched. Default is None.
+      return_field:  the specific field to return (as str). If None, return all
+          (as dict) with fields as keys. Default is None.
+
+    Raises:
+        RuntimeError: raised if file_type is NOT specified and return_field IS
+            specified.
+
+    Returns:
+        file type configuration field or fields.
+
+    """
+
+    if not file_type:
+        return FILE_CONFIGS
+        if not return_field is None:
+            raise RuntimeError(
+                'Cannot return individual field if file type not set!'
+                )
     if return_field is None:
         return FILE_CONFIGS[file_type]
     return FILE_CONFIGS[file_type][return_field]
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def write_data_to_file(
-        headers: pd.DataFrame, data: pd.DataFrame,
-        abs_file_path: str | pathlib.Path, output_format:str=None,
-        info: dict=None
+def write_data_to_file(
+        headers: pd.DataFrame, data: pd.DataFrame,
+        abs_file_path: str | pathlib.Path, output_format:str=None,
+        info: dict=None, float_precision: int=None, append: bool=False
+        ):
+    """Write headers and data to file. Checks only for consistency between
+    headers and data column names (no deeper analysis of consistency with
+                                   output format).
+
+    Args:
+      headers: the dataframe containing the headers as columns.
+      data: the dataframe containing the data, or an iterable of dataframes
+          (e.g. from iter_data) to be written chunk by chunk.
+      abs_file_path: absolute path (including file name) to write to.
+      output_format: if specified, must be either `TOA5` or `EddyPro`. The
+          default is None.
+      info: the file info to write as first header line. Only required if
+          outputting TOA5, and retrieves file type-specific dummy input if not
+          specified. The default is None.
+      float_precision: if specified, write float data with this fixed number
+          of decimal places (using the vectorised format_data_block, which is
+          opt-in because it changes the written values). If None, the
+          shortest round-trip representation is written by DataFrame.to_csv.
+          The default is None.
+      append: if True and the file exists, check that its header matches and
+          that the last records of data up to its last timestamp (at most
+          APPEND_CHECK_RECORDS) are identical to those at the end of the
+          file, then write only the newer records (data must have a
+          DatetimeIndex). The default is False.
+
+    Raises:
+        RuntimeError: raised if appending and the existing file cannot be
+            appended to (header mismatch, incomplete last line or records
+            that differ from the data), so the caller can rewrite the file.
+
+    Returns:
+        None.
+
+    """
+
+    # Cross-check header / data column consistency (for the first chunk if
+    # data is chunked; subsequent chunks are checked as they are written)
+    chunks = iter([data] if isinstance(data, pd.DataFrame) else data)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        first_chunk = pd.DataFrame(columns=headers.index)
+    _check_data_header_consistency(
+        headers=headers,
+        data=first_chunk
+        )
+
+    # Add the requisite info to the output if TOA5
+    row_list = []
+    if not output_format:
+        output_format = 'TOA5'
+    if output_format == 'TOA5':
+        if info is None:
+            info = dict(zip(
+                INFO_FIELDS,
+                FILE_CONFIGS[output_format]['dummy_info']
+                ))
+        row_list.append(list(info.values()))
+
+    # Construct the row list
+    output_headers = headers.reset_index()
+    [row_list.append(output_headers[col].tolist()) for col in output_headers]
+
+    # Write the header to a string
+    file_configs = get_file_type_configs(file_type=output_format)
+    header_buffer = StringIO()
+    writer = csv.writer(
+        header_buffer,
+        delimiter=file_configs['separator'],
+        quoting=file_configs['quoting']
+        )
+    for row in row_list:
+        writer.writerow(row)
+    header_text = header_buffer.getvalue()
+
+    # If appending to an existing file, check the header and get the last date
+    last_date = None
+    append = append and pathlib.Path(abs_file_path).exists()
+    if append:
+        last_date = _check_append_target(
+            file=abs_file_path,
+            header_text=header_text,
+            file_type=output_format
+            )
+
+    # Write the data to file
+    with open(abs_file_path, 'a' if append else 'w', newline='\n') as f:
+
+        if not append:
+            f.write(header_text)
+
+        # The last records up to the last date of an existing file must match
+        # the end of the file before any are appended (only a bounded tail is
+        # formatted and compared, so the cost does not scale with the file)
+        overlap = None
+        checked = last_date is None
+        for i, chunk in enumerate(itertools.chain([first_chunk], chunks)):
+            if i:
+                _check_data_header_consistency(headers=headers, data=chunk)
+            if not checked:
+                old, chunk = _split_records(data=chunk, date=last_date)
+                overlap = (
+                    pd.concat([overlap, old]).iloc[-APPEND_CHECK_RECORDS:]
+                    )
+                if not len(chunk):
+                    continue
+                _check_append_overlap(
+                    file=abs_file_path,
+                    data=overlap,
+                    file_configs=file_configs,
+                    float_precision=float_precision
+                    )
+                checked = True
+            _write_data_block(
+                f=f,
+                data=chunk,
+                file_configs=file_configs,
+                float_precision=float_precision
+                )
+        if not checked:
+            _check_append_overlap(
+                file=abs_file_path,
+                data=overlap,
+                file_configs=file_configs,
+                float_precision=float_precision
+                )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_append_target(
+        file: str | pathlib.Path, header_text: str, file_type: str
+        ) -> dt.datetime:
+    """Check that the header of an existing file matches the header to be
+    written, and that the file ends on a complete line.
+
+    Args:
+        file: absolute path of existing file.
+        header_text: the header that would be written to a new file.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Raises:
+        RuntimeError: raised if the headers do not match or the last line is
+            incomplete.
+
+    Returns:
+        The last date in the existing file (None if it contains no data).
+
+    """
+
+    # Compare the variable lines (the TOA5 info line may legitimately change)
+    first_line = int(FILE_CONFIGS[file_type]['info_line'] is not None)
+    existing = _get_header_lines(
+        header_bytes=_get_header_bytes(file=file, file_type=file_type),
+        file_type=file_type
+        )
+    new = _get_header_lines(
+        header_bytes=header_text.encode(), file_type=file_type
+        )
+    if existing[first_line:] != new[first_line:]:
+        raise RuntimeError(
+            f'Cannot append to {file}: existing file header does not match '
+            'the header of the data to be written!'
+            )
+
+    # Appended records would be joined to an incomplete last line
+    with open(file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                raise RuntimeError(
+                    f'Cannot append to {file}: last line is incomplete!'
+                    )
+
+    return get_start_end_dates(file=file, file_type=file_type)['end_date']
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _split_records(
+        data: pd.DataFrame, date: dt.datetime
+        ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split the records of the data at the passed date.
+
+    Args:
+        data: the data (must have a DatetimeIndex).
+        date: the date at which to split.
+
+    Raises:
+        TypeError: Raised if the data does not have a DatetimeIndex.
+
+    Returns:
+        The records up to and including date, and the records after it.
+
+    """
+
+    if not isinstance(data.index, pd.DatetimeIndex):
+        raise TypeError('Data must have a DatetimeIndex to append to file!')
+    is_old = data.index <= date
+    return data[is_old], data[~is_old]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_append_overlap(
+        file: str | pathlib.Path, data: pd.DataFrame, file_configs: dict,
+        float_precision: int=None
+        ):
+    """Check that the last records to be written up to the last date of an
+    existing file are identical to those at the end of the file (i.e. the
+    most recent records have not been backfilled or revised).
+
+    Args:
+        file: absolute path of existing file.
+        data: the overlapping records.
+        file_configs: the configs of the output file type.
+        float_precision: see write_data_to_file.
+
+    Raises:
+        RuntimeError: raised if the records differ.
+
+    """
+
+    buffer = StringIO()
+    _write_data_block(
+        f=buffer,
+        data=data,
+        file_configs=file_configs,
+        float_precision=float_precision
+        )
+    text = buffer.getvalue().encode()
+    with open(file, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        if len(text) <= size:
+            f.seek(size - len(text))
+            if f.read() == text:
+                return
+    raise RuntimeError(
+        f'Cannot append to {file}: existing records differ from the data!'
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _write_data_block(
+        f, data: pd.DataFrame, file_configs: dict, float_precision: int=None
+        ):
+    """Write data to an open file.
+
+    Args:
+        f: the open (text) file.
+        data: the data to write.
+        file_configs: the configs of the output file type.
+        float_precision: number of decimal places for float data. If None,
+            DataFrame.to_csv writes the shortest round-trip representation.
+            The default is None.
+
+    Returns:
+        None.
+
+    """
+
+    if float_precision is None:
+        data.to_csv(
+            f, header=False, index=False, na_rep=file_configs['na_values'],
+            sep=file_configs['separator'], quoting=file_configs['quoting']
+            )
+        return
+    for i in range(0, len(data), WRITE_BLOCK_RECORDS):
+        f.write(
+            format_data_block(
+                data=data.iloc[i: i + WRITE_BLOCK_RECORDS],
+                file_configs=file_configs,
+                float_precision=float_precision
+                )
+            )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def format_data_block(
+        data: pd.DataFrame, file_configs: dict,
+        float_precision: int
+        ) -> str:
+    """Format data as delimited text lines in bulk. Each column is rendered to
+    a fixed-width byte array (padded with null bytes), the columns are joined
+    with the separator and the padding is then dropped in one pass.
+
+    Args:
+        data: the data to format.
+        file_configs: the configs of the output file type.
+        float_precision: number of decimal places for float data.
+
+    Returns:
+        The formatted lines.
+
+    """
+
+    if not len(data):
+        return ''
+    n_rows = len(data)
+    sep = np.frombuffer(file_configs['separator'].encode(), dtype=np.uint8)
+    na_token = _quote_strings(
+        strings=pd.Series([file_configs['na_values']]),
+        file_configs=file_configs
+        ).iloc[0].encode()
+
+    # Render the float columns as a single block
+    kinds = [dtype.kind for dtype in data.dtypes]
+    float_locs = [i for i, kind in enumerate(kinds) if kind == 'f']
+    if float_locs:
+        float_block = _format_float_block(
+            values=data.iloc[:, float_locs].to_numpy(dtype='float64'),
+            float_precision=float_precision,
+            na_token=na_token
+            )
+        float_fields = dict(zip(float_locs, np.moveaxis(float_block, 1, 0)))
+
+    # Render the remaining columns and collect all in order
+    fields = []
+    for i, kind in enumerate(kinds):
+        if kind == 'f':
+            field = float_fields[i]
+        elif kind in 'iub':
+            field = _as_byte_array(data.iloc[:, i].to_numpy().astype('S'))
+        else:
+            field = _format_string_column(
+                values=data.iloc[:, i].to_numpy(),
+                file_configs=file_configs,
+                na_token=na_token
+                )
+        fields.append(field)
+        fields.append(np.broadcast_to(sep, (n_rows, len(sep))))
+    fields[-1] = np.full((n_rows, 1), ord('\n'), dtype=np.uint8)
+
+    # Join and drop the padding
+    block = np.concatenate(fields, axis=1)
+    return block[block != 0].tobytes().decode()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _format_float_block(
+        values: np.ndarray, float_precision: int, na_token: bytes
+        ) -> np.ndarray:
+    """Render floats to fixed-precision text (as for `%.{precision}f`) by
+    integer arithmetic on the scaled values.
+
+    Args:
+        values: the 2D (float64) values.
+        float_precision: number of decimal places.
+        na_token: the (quoted) token to write for missing values.
+
+    Returns:
+        Null-padded byte array of shape (n_rows, n_columns, width).
+
+    """
+
+    missing = np.isnan(values)
+    scaled = np.rint(np.abs(np.where(missing, 0, values)) * 10**float_precision)
+
+    # Values too large to scale exactly (and infinities) are formatted singly
+    if not np.all(scaled < 2**53):
+        strings = np.array(
+            [[f'{x:.{float_precision}f}' for x in row] for row in values],
+            dtype=object
+            ).reshape(values.shape)
+        strings[missing] = na_token.decode()
+        strings = strings.astype(str).astype('S')
+        return _as_byte_array(strings.ravel()).reshape(
+            values.shape + (strings.dtype.itemsize, )
+            )
+
+    # Fill the digits from the right (sign in the first slot, decimal point
+    # after the integer digits), blanking leading zeros but retaining one
+    # integer digit
+    ints = scaled.astype(np.int64)
+    n_digits = max(len(str(ints.max())), float_precision + 1)
+    width = 1 + n_digits + bool(float_precision)
+    width = max(width, len(na_token))
+    out = np.zeros(values.shape + (width, ), dtype=np.uint8)
+    out[..., 0] = np.where(np.signbit(values), ord('-'), 0)
+    remainder = ints
+    pos = 1 + n_digits + bool(float_precision)
+    for i in range(n_digits):
+        pos -= 1
+        if float_precision and i == float_precision:
+            out[..., pos] = ord('.')
+            pos -= 1
+        remainder, digit = np.divmod(remainder, 10)
+        digit = digit.astype(np.uint8) + ord('0')
+        if i > float_precision:
+            digit[ints < 10**i] = 0
+        out[..., pos] = digit
+
+    # Substitute the missing value token
+    if missing.any():
+        token = np.frombuffer(na_token, dtype=np.uint8)
+        out[missing] = 0
+        out[missing, :len(token)] = token
+    return out
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _format_string_column(
+        values: np.ndarray, file_configs: dict, na_token: bytes
+        ) -> np.ndarray:
+    """Render non-numeric values to (quoted) text.
+
+    Args:
+        values: the values.
+        file_configs: the configs of the output file type.
+        na_token: the (quoted) token to write for missing values.
+
+    Returns:
+        Null-padded byte array of shape (n_values, width).
+
+    """
+
+    series = pd.Series(values, dtype=object)
+    missing = series.isna().to_numpy()
+    strings = _quote_strings(
+        strings=series.astype(str), file_configs=file_configs
+        )
+    strings[missing] = na_token.decode()
+    return _as_byte_array(strings.str.encode('utf-8').to_numpy().astype('S'))
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _quote_strings(strings: pd.Series, file_configs: dict) -> pd.Series:
+    """Quote strings according to the quoting rules of the output file type.
+
+    Args:
+        strings: the strings.
+        file_configs: the configs of the output file type.
+
+    Returns:
+        The quoted strings.
+
+    """
+
+    quoting = file_configs['quoting']
+    if quoting == csv.QUOTE_NONE:
+        return strings.copy()
+    quoted = '"' + strings.str.replace('"', '""', regex=False) + '"'
+    if quoting in [csv.QUOTE_ALL, csv.QUOTE_NONNUMERIC]:
+        return quoted
+    needs_quotes = strings.str.contains(
+        f'["\r\n{file_configs["separator"]}]', regex=True
+        )
+    return quoted.where(needs_quotes, strings)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _as_byte_array(values: np.ndarray) -> np.ndarray:
+    """View a fixed-width bytes array as a 2D uint8 array.
+
+    Args:
+        values: the bytes (`S` dtype) array.
+
+    Returns:
+        Array of shape (n_values, width).
+
+    """
+
+    values = np.ascontiguousarray(values)
+    return values.view(np.uint8).reshape(len(values), values.dtype.itemsize)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_data_header_consistency(headers: pd.DataFrame, data: pd.DataFrame):
+    """Checks that the passed headers and data are consistent.
+
+    Args:
+        headers: the dataframe containing the headers as columns.
+        data: the dataframe containing the data.
+
+    Raises:
+        RuntimeError: raised if inconsistent.
+
+    Returns:
+        None
+
+    """
+
+    headers_list = headers.index.tolist()
+    data_list = data.columns.tolist()
+    if not headers_list == data_list:
+        headers_not_in_data = list(set(headers_list) - set(data_list))
+        data_not_in_headers = list(set(data_list) - set(headers_list))
+        raise RuntimeError(
+            'Header and data variables dont match: '
+            f'Header variables not in data: {headers_not_in_data}, '
+            f'Data variables not in header: {data_not_in_headers}, '
+            )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def read_excel(
+        file: str | pathlib.Path, sheet_name: str, usecols: list=None,
+        converters: Callable=None,
+        ) -> pd.DataFrame:
+    """
+
+
+    Args:
+        file (str | pathlib.Path): DESCRIPTION.
+        sheet_name (str): DESCRIPTION.
+        usecols (list, optional): DESCRIPTION. Defaults to None.
+        converters (Callable, optional): DESCRIPTION. Defaults to None.
+         (TYPE): DESCRIPTION.
+
+    Returns:
+        TYPE: DESCRIPTION.
+
+    """
+
+    return pd.read_excel(
+        io=file,
+        sheet_name=sheet_name,
+        usecols=usecols,
+        converters=converters
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_file_n_lines(file: str | pathlib.Path) -> int:
+    """Count the lines in a file (a final line without a line terminator
+    is counted) by counting newlines in large binary blocks.
+
+    Args:
+        file: absolute path of file to parse.
+
+    Returns:
+        The number of lines.
+
+    """
+
+    n_lines = 0
+    last = b'\n'
+    with open_file(file=file) as f:
+        while block := f.read(COUNT_BLOCK_BYTES):
+            n_lines += block.count(b'\n')
+            last = block[-1:]
+    return n_lines + int(last != b'\n')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def estimate_n_records(file: str | pathlib.Path, file_type: str=None) -> int:
+    """Estimate the number of data records in a file from its size and the
+    average line length in the head and tail (exact for small files).
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is detected. Defaults to None.
+
+    Returns:
+        The (estimated) number of records.
+
+    """
+
+    return FileProbe(file=file, file_type=file_type).estimate_n_records()
+#------------------------------------------------------------------------------
+
+
+###############################################################################
+### END FILE READ / WRITE FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN INCREMENTAL READ FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def get_appended_data(
+        file: str | pathlib.Path, consumer: str, file_type: str=None,
+        usecols: list=None, checkpoint_dir: str | pathlib.Path=None
+        ) -> pd.core.frame.DataFrame:
+    """Read only the records appended to file since the last call by the
+    consumer. A checkpoint (byte offset and timestamp of the last complete
+    record, header hash and column dtypes) is persisted for each file,
+    consumer and column subset, so independent consumers of the same file
+    each get the records appended since their own last call. If there is no
+    checkpoint, or it is stale (header bytes changed, file truncated or last
+    record moved), the whole file is read. An incomplete final line (e.g.
+    LoggerNet writing mid-read) is held back until the next call.
+
+    Args:
+        file: absolute path of file to parse.
+        consumer: the name of the consumer of the appended records.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched.
+        usecols: the subset of columns to keep. If None, keep all.
+        checkpoint_dir: directory in which to persist the checkpoint. If None,
+            the sidecar cache directory is used (see set_sidecar_cache).
+
+    Returns:
+        Data content appended since the last call (may be empty).
+
+    """
+
+    # If file type not supplied, detect it.
+    if not file_type:
+        file_type = get_file_type(file)
+
+    checkpoint_file = _get_cache_path(
+        file=file, suffix=CHECKPOINT_SUFFIX, cache_dir=checkpoint_dir,
+        key=[consumer, file_type, usecols]
+        )
+    df, checkpoint = _read_appended_data(
+        file=file, file_type=file_type, usecols=usecols,
+        checkpoint=_read_checkpoint(checkpoint_file=checkpoint_file)
+        )
+    _write_checkpoint(checkpoint_file=checkpoint_file, checkpoint=checkpoint)
+    return df
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_appended_data(
+        file: str | pathlib.Path, file_type: str, usecols: list=None,
+        checkpoint: dict=None, engine: str=None
+        ) -> tuple:
+    """Read the records appended to file since the checkpoint (or all records
+    if the checkpoint is missing or stale), holding back any incomplete final
+    line.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        checkpoint: the checkpoint content.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
+
+    Returns:
+        The data, and the updated checkpoint.
+
+    """
+
+    # Get the header
+    header_bytes = _get_header_bytes(file=file, file_type=file_type)
+    header_hash = hashlib.sha256(header_bytes).hexdigest()
+
+    # Start from checkpoint if valid, else from beginning of data
+    offset, last_timestamp, dtypes = len(header_bytes), None, {}
+    if _check_checkpoint(
+            file=file, file_type=file_type, checkpoint=checkpoint,
+            header_hash=header_hash
+            ):
+        offset = checkpoint['offset']
+        last_timestamp = checkpoint['last_timestamp']
+        dtypes = checkpoint['dtypes']
+
+    # Read the new bytes, and hold back any incomplete final line
+    with open_file(file=file) as f:
+        f.seek(offset)
+        new_bytes = f.read()
+    new_bytes = new_bytes[: new_bytes.rfind(b'\n') + 1]
+
+    # Parse the new records
+    names = _get_header_lines(header_bytes=header_bytes, file_type=file_type)[
+        FILE_CONFIGS[file_type]['header_lines']['variable']
+        ]
+    if new_bytes.strip():
+        df = _parse_data(
+            source=BytesIO(new_bytes), file_type=file_type, usecols=usecols,
+            names=names, engine=engine
+            )
+        last_timestamp = _get_last_line_date(
+            line_bytes=new_bytes, file_type=file_type
+            )
+    else:
+        df = _get_empty_data(names=names, file_type=file_type, usecols=usecols)
+
+    # Restore dtypes from previous reads (a short chunk may be inferred
+    # differently to the whole file), then update the checkpoint
+    df = _apply_dtypes(df=df, dtypes=dtypes)
+    dtypes.update({col: str(df[col].dtype) for col in df.columns})
+    return df, {
+        'offset': offset + len(new_bytes),
+        'last_timestamp': last_timestamp,
+        'header_hash': header_hash,
+        'dtypes': dtypes
+        }
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_header_bytes(file: str | pathlib.Path, file_type: str) -> bytes:
+    """Get the raw bytes of the header lines (i.e. everything preceding the
+    first data line).
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The header bytes.
+
+    """
+
+    n_lines = max(FILE_CONFIGS[file_type]['header_lines'].values()) + 1
+    with open_file(file=file) as f:
+        return b''.join(f.readline() for i in range(n_lines))
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_header_lines(header_bytes: bytes, file_type: str) -> list:
+    """Split the raw header bytes into lists of text elements.
+
+    Args:
+        header_bytes: the raw header bytes.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        List of sublists, each sublist containing the text elements of a header
+            line.
+
+    """
+
+    return [
+        line for line in csv.reader(
+            header_bytes.decode().splitlines(),
+            delimiter=FILE_CONFIGS[file_type]['separator']
+            )
+        ]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_last_line_date(line_bytes: bytes, file_type: str) -> str:
+    """Get the raw timestamp string of the last line in a block of complete
+    lines.
+
+    Args:
+        line_bytes: the block of lines.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The timestamp (as str) or None if the last line has no time fields.
+
+    """
+
+    line_formatter = get_formatter(file_type=file_type, which='read_line')
+    locs = FILE_CONFIGS[file_type]['time_variables'].values()
+    line = line_bytes.rstrip(b'\r\n').rsplit(b'\n', 1)[-1].decode()
+    try:
+        return ' '.join(line_formatter(line)[loc] for loc in locs)
+    except IndexError:
+        return None
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_empty_data(
+        names: list, file_type: str, usecols: list=None
+        ) -> pd.core.frame.DataFrame:
+    """Get an empty dataframe with the same structure as parsed data.
+
+    Args:
+        names: the variable names in the file header.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+
+    Returns:
+        Empty dataframe with DATETIME index.
+
+    """
+
+    non_numeric = FILE_CONFIGS[file_type]['non_numeric_cols']
+    cols = names
+    if usecols and not usecols == non_numeric:
+        cols = non_numeric + [col for col in usecols if not col in non_numeric]
+    return pd.DataFrame(
+        columns=[col for col in names if col in cols],
+        index=pd.DatetimeIndex([], name='DATETIME')
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _apply_dtypes(
+        df: pd.core.frame.DataFrame, dtypes: dict
+        ) -> pd.core.frame.DataFrame:
+    """Cast columns to the passed dtypes where possible.
+
+    Args:
+        df: the data.
+        dtypes: mapping of column name to dtype (as str).
+
+    Returns:
+        The recast data.
+
+    """
+
+    for col, dtype in dtypes.items():
+        if not col in df.columns or str(df[col].dtype) == dtype:
+            continue
+        try:
+            df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError):
+            continue
+    return df
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_checkpoint(
+        file: str | pathlib.Path, file_type: str, checkpoint: dict,
+        header_hash: str
+        ) -> bool:
+    """Check that a checkpoint is still valid for the file.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        checkpoint: the checkpoint content.
+        header_hash: hash of the current header bytes.
+
+    Returns:
+        True if the checkpoint can be used to resume reading, else False.
+
+    """
+
+    if checkpoint is None or checkpoint['last_timestamp'] is None:
+        return False
+    if not checkpoint['header_hash'] == header_hash:
+        return False
+    offset = checkpoint['offset']
+    if not is_compressed(file=file) and os.path.getsize(file) < offset:
+        return False
+
+    # Check the last complete record is still where we left it
+    with open_file(file=file) as f:
+        f.seek(max(offset - 2**16, 0))
+        line_bytes = f.read(offset - f.tell())
+    if not line_bytes.endswith(b'\n'):
+        return False
+    return (
+        _get_last_line_date(line_bytes=line_bytes, file_type=file_type) ==
+        checkpoint['last_timestamp']
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_checkpoint(checkpoint_file: pathlib.Path) -> dict:
+    """Read the checkpoint.
+
+    Args:
+        checkpoint_file: absolute path of the checkpoint file.
+
+    Returns:
+        The checkpoint content, or None if it does not exist or is unreadable.
+
+    """
+
+    try:
+        with open(checkpoint_file, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _write_checkpoint(checkpoint_file: pathlib.Path, checkpoint: dict):
+    """Write the checkpoint (atomically, so an interrupted write never leaves
+    a corrupt checkpoint).
+
+    Args:
+        checkpoint_file: absolute path of the checkpoint file.
+        checkpoint: the checkpoint content.
+
+    Returns:
+        None.
+
+    """
+
+    tmp_file = checkpoint_file.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_file, checkpoint_file)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_cache_path(
+        file: str | pathlib.Path, suffix: str,
+        cache_dir: str | pathlib.Path=None, key: list=None
+        ) -> pathlib.Path:
+    """Get the path of a cache file belonging to file (the cache directory is
+    created if it does not exist). The cache file name is keyed on the
+    resolved path of file (and any additional key elements), so same-named
+    files in different directories do not collide.
+
+    Args:
+        file: absolute path of file to which the cache file belongs.
+        suffix: the suffix to append to the file name.
+        cache_dir: the cache directory. If None, the sidecar cache directory
+            is used (see set_sidecar_cache).
+        key: additional (JSON-serialisable) elements of the key.
+
+    Returns:
+        Absolute path of the cache file.
+
+    """
+
+    file = pathlib.Path(file).resolve()
+    if cache_dir is None:
+        cache_dir = SIDECAR_CACHE['cache_dir']
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(
+        json.dumps([str(file)] + (key or [])).encode()
+        ).hexdigest()
+    return cache_dir / f'{file.name}.{digest[:16]}{suffix}'
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def set_sidecar_cache(cache_dir: str | pathlib.Path):
+    """Configure the local directory for the sidecar files (checkpoints, date
+    indexes and archive tails) of data files.
+
+    Args:
+        cache_dir: the directory.
+
+    Returns:
+        None.
+
+    """
+
+    SIDECAR_CACHE['cache_dir'] = pathlib.Path(cache_dir)
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END INCREMENTAL READ FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN PARSE CACHE FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def set_parse_cache(
+        cache_dir: str | pathlib.Path=None, max_bytes: int=None
         ):
-    """Write headers and data to file. Checks only for consistency between
-    headers and data column names (no deeper analysis of consistency with
-                                   output format).
+    """Configure the on-disk parse cache used by get_data.
 
     Args:
-      headers: the dataframe containing the headers as columns.
-      data: the dataframe containing the data.
-      abs_file_path: absolute path (including file name) to write to.
-      output_format: if specified, must be either `TOA5` or `EddyPro`. The
-          default is None.
-      info: the file info to write as first header line. Only required if
-          outputting TOA5, and retrieves file type-specific dummy input if not
-          specified. The default is None.
+        cache_dir: directory in which to store the parsed data. If None, the
+            cache is disabled.
+        max_bytes: the size limit of the cache directory; least recently used
+            entries are evicted once it is exceeded. If None, the existing
+            limit is retained.
 
     Returns:
         None.
 
     """
 
-    # Cross-check header / data column consistency
-    _check_data_header_consistency(
-        headers=headers,
-        data=data
+    PARSE_CACHE['cache_dir'] = (
+        None if cache_dir is None else pathlib.Path(cache_dir)
         )
+    if max_bytes is not None:
+        PARSE_CACHE['max_bytes'] = max_bytes
+#------------------------------------------------------------------------------
 
-    # Add the requisite info to the output if TOA5
-    row_list = []
-    if not output_format:
-        output_format = 'TOA5'
-    if output_format == 'TOA5':
-        if info is None:
-            info = dict(zip(
-                INFO_FIELDS,
-                FILE_CONFIGS[output_format]['dummy_info']
-                ))
-        row_list.append(list(info.values()))
+#------------------------------------------------------------------------------
+def _get_parse_cache_file(
+        file: str | pathlib.Path, file_type: str, usecols: list=None
+        ) -> pathlib.Path:
+    """Get the cache file for the current state of file. The key includes the
+    file identity (path, size, mtime) and the parse configuration, so any
+    change to either yields a new key (stale entries are evicted eventually).
 
-    # Construct the row list
-    output_headers = headers.reset_index()
-    [row_list.append(output_headers[col].tolist()) for col in output_headers]
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
 
-    # Write the data to file
-    file_configs = get_file_type_configs(file_type=output_format)
-    with open(abs_file_path, 'w', newline='\n') as f:
+    Returns:
+        Absolute path of the cache file.
+
+    """
+
+    file = pathlib.Path(file).resolve()
+    stat = file.stat()
+    key = json.dumps(
+        [str(file), stat.st_size, stat.st_mtime_ns, file_type,
+         FILE_CONFIGS[file_type], usecols]
+        )
+    return (
+        PARSE_CACHE['cache_dir'] /
+        f'{hashlib.sha256(key.encode()).hexdigest()}{PARSE_CACHE_SUFFIX}'
+        )
+#------------------------------------------------------------------------------
 
-        # Write the header
-        writer = csv.writer(
-            f,
-            delimiter=file_configs['separator'],
-            quoting=file_configs['quoting']
+#------------------------------------------------------------------------------
+def _get_cached_data(
+        file: str | pathlib.Path, file_type: str, usecols: list=None,
+        engine: str=None
+        ) -> pd.core.frame.DataFrame:
+    """Get data via the parse cache. If the file is unchanged, the cached data
+    are returned. If the file has only been appended to since it was last
+    cached (checked against a checkpoint, as for get_appended_data), only the
+    appended records are parsed and added to the cached data. Otherwise the
+    whole file is parsed. The result is cached, and the checkpoint updated.
+    Compressed files, and files with an incomplete final line, are always
+    parsed whole (and not checkpointed).
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
+
+    Returns:
+        Data content.
+
+    """
+
+    cache_file = _get_parse_cache_file(
+        file=file, file_type=file_type, usecols=usecols
+        )
+    df = _read_parse_cache(cache_file=cache_file)
+    if df is not None:
+        return df
+
+    # Get the checkpoint of the previous cache entry for the file
+    checkpoint_file = _get_cache_path(
+        file=file, suffix=CHECKPOINT_SUFFIX,
+        cache_dir=PARSE_CACHE['cache_dir'],
+        key=['parse_cache', file_type, usecols]
+        )
+    checkpoint = _read_checkpoint(checkpoint_file=checkpoint_file)
+    previous, appendable = None, not is_compressed(file=file)
+    if appendable and _check_checkpoint(
+            file=file, file_type=file_type, checkpoint=checkpoint,
+            header_hash=hashlib.sha256(
+                _get_header_bytes(file=file, file_type=file_type)
+                ).hexdigest()
+            ):
+        previous = _read_parse_cache(
+            cache_file=PARSE_CACHE['cache_dir'] / checkpoint['cache_file']
+            )
+    size = os.path.getsize(file)
+
+    # Add the appended records to the previous data if the checkpoint is
+    # valid and there is no incomplete final line...
+    df = None
+    if previous is not None:
+        new_data, new_checkpoint = _read_appended_data(
+            file=file, file_type=file_type, usecols=usecols,
+            checkpoint=checkpoint, engine=engine
             )
-        for row in row_list:
-            writer.writerow(row)
+        if new_checkpoint['offset'] == size:
+            df = pd.concat([previous, new_data])
+            set_coerced_cells(
+                df=df,
+                report=pd.concat([
+                    get_coerced_cells(df=previous),
+                    get_coerced_cells(df=new_data)
+                    ])
+                )
 
-        # Write the data
-        data.to_csv(
-            f, header=False, index=False, na_rep=file_configs['na_values'],
-            sep=file_configs['separator'], quoting=file_configs['quoting']
+    # ... otherwise parse the whole file, and checkpoint it if complete and
+    # unchanged while parsing
+    if df is None:
+        df = _read_file(
+            file=file, file_type=file_type, usecols=usecols, engine=engine
+            )
+        new_checkpoint = None
+        if appendable and os.path.getsize(file) == size:
+            new_checkpoint = _get_file_checkpoint(
+                file=file, file_type=file_type, size=size, df=df
+                )
+
+    # Cache the data, and supersede the previous entry
+    _write_parse_cache(cache_file=cache_file, df=df)
+    if checkpoint is not None and checkpoint['cache_file'] != cache_file.name:
+        (PARSE_CACHE['cache_dir'] / checkpoint['cache_file']).unlink(
+            missing_ok=True
+            )
+    if new_checkpoint is None:
+        checkpoint_file.unlink(missing_ok=True)
+    else:
+        new_checkpoint['cache_file'] = cache_file.name
+        _write_checkpoint(
+            checkpoint_file=checkpoint_file, checkpoint=new_checkpoint
             )
+    return df
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def _check_data_header_consistency(headers: pd.DataFrame, data: pd.DataFrame):
-    """Checks that the passed headers and data are consistent.
+def _get_file_checkpoint(
+        file: str | pathlib.Path, file_type: str, size: int,
+        df: pd.core.frame.DataFrame
+        ) -> dict:
+    """Get the checkpoint for a file that has been parsed whole.
 
     Args:
-        headers: the dataframe containing the headers as columns.
-        data: the dataframe containing the data.
+        file: absolute path of the (uncompressed) file.
+        file_type: must be either `TOA5` or `EddyPro`.
+        size: the size of the file when parsed.
+        df: the parsed data.
 
-    Raises:
-        RuntimeError: raised if inconsistent.
+    Returns:
+        The checkpoint content, or None if the file has an incomplete final
+        line.
+
+    """
+
+    with open(file, 'rb') as f:
+        f.seek(max(size - 2**16, 0))
+        line_bytes = f.read(size - f.tell())
+    if not line_bytes.endswith(b'\n'):
+        return None
+    return {
+        'offset': size,
+        'last_timestamp': _get_last_line_date(
+            line_bytes=line_bytes, file_type=file_type
+            ),
+        'header_hash': hashlib.sha256(
+            _get_header_bytes(file=file, file_type=file_type)
+            ).hexdigest(),
+        'dtypes': {col: str(df[col].dtype) for col in df.columns}
+        }
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_parse_cache(cache_file: pathlib.Path) -> pd.core.frame.DataFrame:
+    """Read parsed data from the cache.
+
+    Args:
+        cache_file: absolute path of the cache file.
 
     Returns:
-        None
+        The data, or None if there is no (readable) cache entry.
 
     """
 
-    headers_list = headers.index.tolist()
-    data_list = data.columns.tolist()
-    if not headers_list == data_list:
-        headers_not_in_data = list(set(headers_list) - set(data_list))
-        data_not_in_headers = list(set(data_list) - set(headers_list))
-        raise RuntimeError(
-            'Header and data variables dont match: '
-            f'Header variables not in data: {headers_not_in_data}, '
-            f'Data variables not in header: {data_not_in_headers}, '
-            )
+    try:
+        with np.load(cache_file, allow_pickle=False) as bundle:
+            meta = json.loads(bundle['__meta__'].item())
+            data = {}
+            for i, col in enumerate(meta['columns']):
+                arr = bundle[f'col_{i}']
+                if f'mask_{i}' in bundle:
+                    arr = arr.astype(object)
+                    arr[bundle[f'mask_{i}']] = np.nan
+                if f'codes_{i}' in bundle:
+                    arr = pd.Categorical.from_codes(
+                        codes=bundle[f'codes_{i}'], categories=arr
+                        )
+                data[col] = arr
+            index = pd.DatetimeIndex(bundle['__index__'], name=meta['index'])
+            report = pd.DataFrame({
+                'DATETIME': bundle['__coerced_dates__'],
+                'variable': bundle['__coerced_variables__'].astype(object),
+                'value': bundle['__coerced_values__'].astype(object)
+                })
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        return None
+
+    # Mark as recently used
+    os.utime(cache_file)
+    df = pd.DataFrame(data=data, index=index, columns=meta['columns'])
+    set_coerced_cells(df=df, report=report)
+    return df
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def read_excel(
-        file: str | pathlib.Path, sheet_name: str, usecols: list=None,
-        converters: Callable=None,
-        ) -> pd.DataFrame:
+def _write_parse_cache(cache_file: pathlib.Path, df: pd.core.frame.DataFrame):
+    """Write parsed data to the cache as a bundle of numpy column arrays
+    (object columns are stored as fixed-width strings plus a null mask, and
+    categorical columns as codes plus their categories as strings, so no
+    pickling is required), then evict least recently used entries.
+
+    Args:
+        cache_file: absolute path of the cache file.
+        df: the data.
+
+    Returns:
+        None.
+
+    """
+
+    report = get_coerced_cells(df=df)
+    arrays = {
+        '__index__': df.index.values.astype('datetime64[ns]'),
+        '__meta__': np.array(json.dumps(
+            {'columns': df.columns.tolist(), 'index': df.index.name}
+            )),
+        '__coerced_dates__': report.DATETIME.to_numpy(dtype='datetime64[ns]'),
+        '__coerced_variables__': report.variable.to_numpy().astype(str),
+        '__coerced_values__': report.value.to_numpy().astype(str)
+        }
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[f'codes_{i}'] = series.cat.codes.to_numpy()
+            arrays[f'col_{i}'] = series.cat.categories.to_numpy().astype(str)
+        elif series.dtype == object:
+            mask = series.isna().to_numpy()
+            arrays[f'mask_{i}'] = mask
+            arrays[f'col_{i}'] = series.where(~mask, '').to_numpy().astype(str)
+        else:
+            arrays[f'col_{i}'] = series.to_numpy()
+
+    # Write atomically so concurrent readers never see a partial bundle
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_file, cache_file)
+    _evict_parse_cache()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _evict_parse_cache():
+    """Delete least recently used cache entries until the cache is within its
+    size limit.
+
+    Returns:
+        None.
+
     """
 
+    entries = []
+    for cache_file in PARSE_CACHE['cache_dir'].glob(f'*{PARSE_CACHE_SUFFIX}'):
+        try:
+            stat = cache_file.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, cache_file))
+    entries.sort()
+    total = sum(entry[1] for entry in entries)
+    for _, size, cache_file in entries:
+        if total <= PARSE_CACHE['max_bytes']:
+            break
+        cache_file.unlink(missing_ok=True)
+        total -= size
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END PARSE CACHE FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN DATE INDEX FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def update_date_index(
+        file: str | pathlib.Path, file_type: str=None,
+        stride: int=DATE_INDEX_STRIDE, index_dir: str | pathlib.Path=None
+        ) -> dict:
+    """Build or extend the sparse date index of file. The index maps the
+    timestamp of every stride-th record (or the next record with a valid
+    timestamp) to its byte offset, record number and the number of records
+    with valid timestamps that precede it (the total number of records with
+    valid timestamps is also kept). It is persisted as a sidecar, and if still
+    valid (see _check_checkpoint) only the records appended since the last
+    update are scanned. Incomplete final lines are not indexed.
 
     Args:
-        file (str | pathlib.Path): DESCRIPTION.
-        sheet_name (str): DESCRIPTION.
-        usecols (list, optional): DESCRIPTION. Defaults to None.
-        converters (Callable, optional): DESCRIPTION. Defaults to None.
-         (TYPE): DESCRIPTION.
+        file: absolute path of file to parse.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched.
+        stride: the number of records between index entries.
+        index_dir: directory in which to persist the index. If None, the
+            sidecar cache directory is used (see set_sidecar_cache).
 
     Returns:
-        TYPE: DESCRIPTION.
+        The index content.
 
     """
 
-    return pd.read_excel(
-        io=file,
-        sheet_name=sheet_name,
-        usecols=usecols,
-        converters=converters
+    # If file type not supplied, detect it.
+    if not file_type:
+        file_type = get_file_type(file)
+
+    # Get the header and the existing index
+    header_bytes = _get_header_bytes(file=file, file_type=file_type)
+    header_hash = hashlib.sha256(header_bytes).hexdigest()
+    index_file = _get_cache_path(
+        file=file, suffix=DATE_INDEX_SUFFIX, cache_dir=index_dir
+        )
+    index = _read_checkpoint(checkpoint_file=index_file)
+
+    # Start from scratch if the index is invalid
+    if not (
+            _check_checkpoint(
+                file=file, file_type=file_type, checkpoint=index,
+                header_hash=header_hash
+                )
+            and index['stride'] == stride
+            and 'n_valid' in index
+            ):
+        index = {
+            'offset': len(header_bytes),
+            'last_timestamp': None,
+            'header_hash': header_hash,
+            'data_offset': len(header_bytes),
+            'n_records': 0,
+            'n_valid': 0,
+            'stride': stride,
+            'entries': []
+            }
+
+    # Scan the new records in blocks of lines (only the final line can be
+    # incomplete)
+    entries = index['entries']
+    next_entry = entries[-1][2] + stride if entries else 0
+    offset, n_records, last_line = index['offset'], index['n_records'], None
+    n_valid = index['n_valid']
+    with open_file(file=file) as f:
+        f.seek(offset)
+        while lines := list(itertools.islice(f, DATE_INDEX_BLOCK_LINES)):
+            complete = lines if lines[-1].endswith(b'\n') else lines[:-1]
+            if not complete:
+                break
+            valid = ~np.isnat(
+                dates := _get_line_dates(lines=complete, file_type=file_type)
+                )
+            ends = offset + np.cumsum([len(line) for line in complete])
+            n_valid_before = n_valid + np.cumsum(valid) - valid
+            records = n_records + np.flatnonzero(valid)
+            while (j := np.searchsorted(records, next_entry)) < len(records):
+                i = records[j] - n_records
+                entries.append([
+                    pd.Timestamp(dates[i]).to_pydatetime().isoformat(),
+                    int(ends[i]) - len(complete[i]),
+                    int(records[j]),
+                    int(n_valid_before[i])
+                    ])
+                next_entry = int(records[j]) + stride
+            offset, n_records = int(ends[-1]), n_records + len(complete)
+            n_valid += int(valid.sum())
+            last_line = complete[-1]
+            if len(complete) < len(lines):
+                break
+
+    # Update and write the index if there were new records
+    if last_line is None:
+        return index
+    index.update({
+        'offset': offset,
+        'last_timestamp': _get_last_line_date(
+            line_bytes=last_line, file_type=file_type
+            ),
+        'n_records': n_records,
+        'n_valid': n_valid
+        })
+    _write_checkpoint(checkpoint_file=index_file, checkpoint=index)
+    return index
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_line_dates(lines: list, file_type: str) -> np.ndarray:
+    """Get the dates of data lines in bulk. Only the time variables are split
+    from the lines, and the date strings are parsed together with each of the
+    strict DATE_READ_FORMATS in turn (as for _generic_date_constructor).
+
+    Args:
+        lines: data lines (as bytes, including line endings).
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The date (datetime64) of each line (NaT if the line has no valid
+            date).
+
+    """
+
+    configs = FILE_CONFIGS[file_type]
+    locs = list(configs['time_variables'].values())
+    if not lines:
+        return np.array([], dtype='datetime64[ns]')
+    elems = (
+        pd.Series(
+            b''.join(lines).decode().removesuffix('\n').split('\n'),
+            dtype=object
+            )
+        .str.strip()
+        .str.split(configs['separator'], n=max(locs) + 1, expand=True)
+        .reindex(columns=locs)
         )
+    strings = elems[locs[0]]
+    for loc in locs[1:]:
+        strings = strings + ' ' + elems[loc]
+    if file_type == 'TOA5':
+        strings = strings.str.replace('"', '', regex=False)
+    dates = np.full(len(strings), np.datetime64('NaT'), dtype='datetime64[ns]')
+    for date_format in DATE_READ_FORMATS:
+        locs = np.flatnonzero(np.isnat(dates) & strings.notna().to_numpy())
+        if not len(locs):
+            break
+        dates[locs] = pd.to_datetime(
+            strings.iloc[locs], format=date_format, errors='coerce'
+            ).to_numpy(dtype='datetime64[ns]')
+    return dates
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-def get_file_n_lines(file):
+def _get_index_arrays(index: dict) -> tuple:
+    """Get the dates, byte offsets, record numbers and preceding valid record
+    counts of the index entries as arrays.
+
+    Args:
+        index: the index content.
+
+    Returns:
+        The dates (datetime64), byte offsets, record numbers and preceding
+            valid record counts.
+
+    """
+
+    entries = index['entries']
+    return (
+        np.array([entry[0] for entry in entries], dtype='datetime64[ns]'),
+        np.array([entry[1] for entry in entries], dtype='int64'),
+        np.array([entry[2] for entry in entries], dtype='int64'),
+        np.array([entry[3] for entry in entries], dtype='int64')
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_window_offsets(
+        index: dict, start: dt.datetime=None, end: dt.datetime=None
+        ) -> tuple:
+    """Get the byte range of the file that contains all records between start
+    and end. If the indexed dates are not in chronological order, the range is
+    the whole of the data.
+
+    Args:
+        index: the index content.
+        start: the first date of the window. If None, start of data.
+        end: the last date of the window. If None, end of file.
+
+    Returns:
+        The start and end byte offsets (end is None if end of file).
+
+    """
+
+    dates, offsets, _, _ = _get_index_arrays(index=index)
+    start_offset, end_offset = index['data_offset'], None
+    if np.any(np.diff(dates) < np.timedelta64(0)):
+        return start_offset, end_offset
+
+    # Start at the last indexed record earlier than start...
+    if start is not None:
+        i = np.searchsorted(dates, np.datetime64(start), side='left') - 1
+        if i >= 0:
+            start_offset = int(offsets[i])
+
+    # ... and stop at the first indexed record later than end
+    if end is not None:
+        i = np.searchsorted(dates, np.datetime64(end), side='right')
+        if i < len(offsets):
+            end_offset = int(offsets[i])
+    return start_offset, end_offset
+#------------------------------------------------------------------------------
 
-    with open(file, 'rb') as f:
-        return sum(1 for _ in f)
 #------------------------------------------------------------------------------
+def _get_data_window(
+        file: str | pathlib.Path, file_type: str, usecols: list=None,
+        start: dt.datetime=None, end: dt.datetime=None, engine: str=None
+        ) -> pd.core.frame.DataFrame:
+    """Read the records between start and end, parsing only the byte range
+    that the date index shows contains them.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+        usecols: the subset of columns to keep. If None, keep all.
+        start: the first date of the window. If None, start of data.
+        end: the last date of the window. If None, end of data.
+        engine: the reader engine (see set_reader_engine). If None, the
+            global engine is used.
 
+    Returns:
+        Data content within the window (may be empty).
+
+    """
+
+    index = update_date_index(file=file, file_type=file_type)
+    start_offset, end_offset = _get_window_offsets(
+        index=index, start=start, end=end
+        )
+    with open_file(file=file) as f:
+        f.seek(start_offset)
+        window_bytes = f.read(
+            -1 if end_offset is None else end_offset - start_offset
+            )
+    names = _get_header_lines(
+        header_bytes=_get_header_bytes(file=file, file_type=file_type),
+        file_type=file_type
+        )[FILE_CONFIGS[file_type]['header_lines']['variable']]
+    if not window_bytes.strip():
+        return _get_empty_data(names=names, file_type=file_type, usecols=usecols)
+    df = _parse_data(
+        source=BytesIO(window_bytes), file_type=file_type, usecols=usecols,
+        names=names, engine=engine
+        )
+    report = get_coerced_cells(df=df).set_index(keys='DATETIME')
+    df = df.loc[start: end]
+    set_coerced_cells(df=df, report=report.loc[start: end].reset_index())
+    return df
+#------------------------------------------------------------------------------
 
 ###############################################################################
-### END FILE READ / WRITE FUNCTIONS ###
+### END DATE INDEX FUNCTIONS ###
 ###############################################################################
 
 
@@ -654,17 +3113,26 @@ def _TOA5_date_write_formatter(py_date, which='TIMESTAMP'):
 #------------------------------------------------------------------------------
 def _generic_date_constructor(date_elems: list) -> dt.datetime:
     """Construct a date from a list of date elements using the prescribed date
-    format.
+    format (or, failing that, the other strict DATE_READ_FORMATS).
 
     Args:
         date_elems: the date elements to be combined.
 
+    Raises:
+        ValueError: raised if the date matches none of the formats.
+
     Returns:
         Python datetime.
 
     """
 
-    return dt.datetime.strptime(' '.join(date_elems), DATE_FORMAT)
+    date_str = ' '.join(date_elems)
+    for date_format in DATE_READ_FORMATS:
+        try:
+            return dt.datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f'Date "{date_str}" does not match any read format')
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -691,6 +3159,19 @@ def reformat_data(data: pd.DataFrame, output_format: str) -> pd.DataFrame:
     funcs_dict = {'TOA5': _TOA5ify_data, 'EddyPro': _EPify_data}
     df = data.copy()
 
+    # Restore float32 columns (see DTYPE_POLICIES) to float64 via their
+    # shortest string representation, so float32 rounding noise is not output
+    float32_cols = df.select_dtypes('float32').columns
+    if len(float32_cols):
+        restored = pd.DataFrame(
+            data=df[float32_cols].to_numpy().astype(str).astype('float64'),
+            index=df.index,
+            columns=float32_cols
+            )
+        df = pd.concat([df.drop(float32_cols, axis=1), restored], axis=1)[
+            data.columns
+            ]
+
     # Remove all format-specific data columns to make data format-agnostic.
     for fmt in FILE_CONFIGS.keys():
         for var in FILE_CONFIGS[fmt]['time_variables']:
@@ -714,9 +3195,8 @@ def _TOA5ify_data(data: pd.DataFrame) -> pd.DataFrame:
     """
 
     # Create the date outputs
-    formatter = get_formatter(file_type='TOA5', which='write_date')
-    date_series = pd.Series(data.index.to_pydatetime(), index=data.index)
-    data.insert(0, 'TIMESTAMP', date_series.apply(formatter))
+    date_strings = _get_date_strings(index=data.index)
+    data.insert(0, 'TIMESTAMP', date_strings.astype(str))
     return data
 #------------------------------------------------------------------------------
 
@@ -739,18 +3219,79 @@ def _EPify_data(data: pd.DataFrame) -> pd.DataFrame:
         if not var in data.columns:
             data.insert(i, var, non_num_strings[var])
 
-    # Create the date outputs and put them in slots 2 and 3
-    formatter = get_formatter(file_type='EddyPro', which='write_date')
-    date_series = pd.Series(data.index.to_pydatetime(), index=data.index)
+    # Create the date outputs (split from the TOA5 timestamp strings) and put
+    # them in slots 2 and 3
+    date_strings = _get_date_strings(index=data.index)
+    date_chars = date_strings.view(np.uint8).reshape(
+        -1, date_strings.dtype.itemsize
+        )
+    slices = {'date': slice(0, 10), 'time': slice(11, 19)}
     i = 2
     for var in FILE_CONFIGS['EddyPro']['time_variables'].keys():
-        series = date_series.apply(formatter, which=var)
-        data.insert(i, var, series)
+        strings = np.ascontiguousarray(date_chars[:, slices[var]])
+        data.insert(
+            i, var, strings.view(f'S{strings.shape[1]}').ravel().astype(str)
+            )
         i += 1
 
     return data
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def _get_date_strings(index: pd.DatetimeIndex) -> np.ndarray:
+    """Get the TOA5 timestamp strings (`%Y-%m-%d %H:%M:%S`, fractional
+    seconds truncated) for a DatetimeIndex, formatted in bulk from the
+    datetime64 values. Results are cached (see DATE_STRING_CACHE); an index
+    that is identical to, or a regular sub-range of, a cached index is sliced
+    from the cached strings.
+
+    Args:
+        index: the index.
+
+    Returns:
+        Array of timestamp strings (as bytes).
+
+    """
+
+    # Get the wall time values (as for to_pydatetime)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    values = index.values.astype('datetime64[s]').astype(np.int64)
+    step = None
+    if len(values) > 1:
+        diffs = np.diff(values)
+        if diffs[0] > 0 and np.all(diffs == diffs[0]):
+            step = int(diffs[0])
+    digest = hashlib.sha1(values.tobytes()).hexdigest()
+
+    # Check the cache
+    for entry in DATE_STRING_CACHE['entries']:
+        if entry['digest'] == digest:
+            return entry['strings']
+        if step is None or entry['step'] != step:
+            continue
+        offset, remainder = divmod(int(values[0]) - entry['start'], step)
+        if (
+                not remainder and offset >= 0 and
+                offset + len(values) <= len(entry['strings'])
+                ):
+            return entry['strings'][offset: offset + len(values)]
+
+    # Format the strings and cache them
+    strings = np.datetime_as_string(
+        values.astype('datetime64[s]'), unit='s'
+        ).astype('S19')
+    strings.view(np.uint8).reshape(-1, strings.dtype.itemsize)[:, 10] = ord(' ')
+    DATE_STRING_CACHE['entries'].insert(0, {
+        'digest': digest,
+        'step': step,
+        'start': int(values[0]) if len(values) else None,
+        'strings': strings
+        })
+    del DATE_STRING_CACHE['entries'][DATE_STRING_CACHE['max_entries']:]
+    return strings
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def reformat_headers(headers: pd.DataFrame, output_format: str) -> pd.DataFrame:
     """Create formatted header from dataframe header.
@@ -880,17 +3421,49 @@ def get_dates(
         file,
         usecols=time_vars,
         skiprows=rows_to_skip,
-        parse_dates={'DATETIME': time_vars},
+        dtype={x: str for x in time_vars},
         sep=separator,
         )
 
-    # Check the date parser worked - if not, fix it
-    if df.DATETIME.dtype == 'object':
-        df.DATETIME = pd.to_datetime(df.DATETIME, errors='coerce')
-        df.dropna(inplace=True)
+    # Parse the dates, drop malformed dates and return as pydatetimes
+    dates = _parse_timestamps(df=df, file_type=file_type)
+    return dates[~pd.isnull(dates)].to_pydatetime()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def iter_lines_reversed(f, block_size: int=REVERSE_BLOCK_BYTES):
+    """Iterate backwards over the lines of a file, reading fixed-size blocks
+    from the end of the file rather than seeking byte by byte.
+
+    Args:
+        f: file object opened in binary mode.
+        block_size: the number of bytes to read per block.
+
+    Yields:
+        Lines (as bytes, excluding the newline), last line first.
 
-    # Return the dates as pydatetimes
-    return pd.DatetimeIndex(df.DATETIME).to_pydatetime()
+    """
+
+    position = f.seek(0, os.SEEK_END)
+    remainder = None
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        lines = f.read(read_size).split(b'\n')
+        if remainder is None:
+
+            # Drop the empty element that follows a terminal newline
+            if len(lines) > 1 and lines[-1] == b'':
+                lines.pop()
+        else:
+            lines[-1] += remainder
+
+        # The first element may be incomplete - carry it into the next block
+        remainder = lines.pop(0)
+        yield from reversed(lines)
+    if remainder is not None:
+        yield remainder
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -916,7 +3489,7 @@ def get_start_end_dates(file: str | pathlib.Path, file_type: str=None) -> dict:
     date_formatter = get_formatter(file_type=file_type, which='read_date')
 
     # Open file in binary
-    with open(file, 'rb') as f:
+    with open_file(file=file) as f:
 
         # Iterate forward to find first valid start date
         start_date = None
@@ -924,61 +3497,128 @@ def get_start_end_dates(file: str | pathlib.Path, file_type: str=None) -> dict:
             try:
                 start_date = date_formatter(line_formatter(line.decode()))
                 break
-            except ValueError:
+            except (ValueError, IndexError):
                 continue
 
         # Iterate backwards to find last valid end date
         end_date = None
-        f.seek(2, os.SEEK_END)
-        while True:
+        lines = (
+            _iter_compressed_lines_reversed(file=file)
+            if is_compressed(file=file) else iter_lines_reversed(f)
+            )
+        for line in lines:
             try:
-                if f.read(1) == b'\n':
-                    pos = f.tell()
-                    try:
-                        end_date = (
-                            date_formatter(
-                                line_formatter(f.readline().decode())
-                                )
-                            )
-                        break
-                    except ValueError:
-                        f.seek(pos - f.tell(), os.SEEK_CUR)
-                f.seek(-2, os.SEEK_CUR)
-            except OSError:
+                end_date = date_formatter(line_formatter(line.decode()))
                 break
+            except (ValueError, IndexError):
+                continue
 
     return {'start_date': start_date, 'end_date': end_date}
 #------------------------------------------------------------------------------
 
-def find_date(file, date: dt.datetime, file_type: str=None):
+#------------------------------------------------------------------------------
+def find_date(
+        file: str | pathlib.Path, date: dt.datetime, file_type: str=None
+        ) -> int:
+    """Find the number of records with valid dates (counting back from the
+    end of the file) that follow the last record earlier than the passed date.
+    Lines without a valid date are not counted. The date index is searched for
+    the last indexed record earlier than the date, and only the records up to
+    the next indexed record (at most DATE_INDEX_STRIDE) and any incomplete
+    final line are scanned; the records that follow are counted from the
+    valid record counts of the index (the records are assumed to be in
+    chronological order). If the indexed dates are not in chronological
+    order, the file is searched backwards line by line instead.
+
+    Args:
+        file: absolute path of file to parse.
+        date: the date to find.
+        file_type: if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched. Defaults to None.
+
+    Returns:
+        The number of records back from the end of the file, or None if no
+            record is earlier than the passed date.
+
+    """
+
+    # If file type not supplied, detect it.
+    if not file_type:
+        file_type = get_file_type(file)
+
+    # Get the index, and fall back to the reverse search if it is unordered
+    index = update_date_index(file=file, file_type=file_type)
+    dates, offsets, _, n_valid = _get_index_arrays(index=index)
+    if np.any(np.diff(dates) < np.timedelta64(0)):
+        return _find_date_reversed(file=file, date=date, file_type=file_type)
+
+    # Scan from the last indexed record earlier than the date to the next
+    # indexed record, then the unindexed (incomplete) final line, counting
+    # the valid records up to and including the last one earlier than it
+    i = np.searchsorted(dates, np.datetime64(date), side='left') - 1
+    segments = [
+        [
+            index['data_offset'] if i < 0 else offsets[i],
+            offsets[i + 1] if i + 1 < len(offsets) else index['offset'],
+            0 if i < 0 else n_valid[i]
+            ],
+        [index['offset'], None, index['n_valid']]
+        ]
+    n_total, n_earlier = index['n_valid'], None
+    with open_file(file=file) as f:
+        for start, stop, n_preceding in segments:
+            f.seek(start)
+            lines = list(BytesIO(f.read(-1 if stop is None else stop - start)))
+            line_dates = _get_line_dates(lines=lines, file_type=file_type)
+            line_dates = line_dates[~np.isnat(line_dates)]
+            earlier = np.flatnonzero(line_dates < np.datetime64(date))
+            if len(earlier):
+                n_earlier = n_preceding + int(earlier[-1]) + 1
+            n_preceding += len(line_dates)
+            if stop is None:
+                n_total = n_preceding
+    if n_earlier is None:
+        return None
+    return n_total - n_earlier
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _find_date_reversed(
+        file: str | pathlib.Path, date: dt.datetime, file_type: str
+        ) -> int:
+    """Find the number of records (counting back from the end of the file)
+    that follow the last record earlier than the passed date, by searching
+    backwards line by line.
+
+    Args:
+        file: absolute path of file to parse.
+        date: the date to find.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The number of records back from the end of the file, or None if no
+            record is earlier than the passed date.
 
+    """
 
     line_formatter = get_formatter(file_type=file_type, which='read_line')
     date_formatter = get_formatter(file_type=file_type, which='read_date')
-    with open(file, 'rb') as f:
-        end_date = None
-        f.seek(2, os.SEEK_END)
+    with open_file(file=file) as f:
         lines_back = 0
-        while True:
+        lines = (
+            _iter_compressed_lines_reversed(file=file)
+            if is_compressed(file=file) else iter_lines_reversed(f)
+            )
+        for line in lines:
             try:
-                if f.read(1) == b'\n':
-                    pos = f.tell()
-                    line = f.readline().decode()
-                    try:
-                        end_date = (
-                            date_formatter(
-                                line_formatter(line)
-                                )
-                            )
-                        if end_date < date:
-                            return lines_back
-                        lines_back += 1
-                        f.seek(pos - f.tell(), os.SEEK_CUR)
-                    except ValueError:
-                        f.seek(pos - f.tell(), os.SEEK_CUR)
-                f.seek(-2, os.SEEK_CUR)
-            except OSError:
-                break
+                line_date = date_formatter(line_formatter(line.decode()))
+            except (ValueError, IndexError):
+                continue
+            if line_date < date:
+                return lines_back
+            lines_back += 1
+    return None
+#------------------------------------------------------------------------------
 
 ###############################################################################
 ### END DATE HANDLING FUNCTIONS ###
@@ -1034,7 +3674,9 @@ def get_TOA5_backups(file: str | pathlib.Path) -> list:
     """
 
     file_to_parse = _check_file_exists(file=file)
-    return list(file_to_parse.parent.glob(f'{file_to_parse.stem}*.backup'))
+    return _glob_with_archives(
+        path=file_to_parse.parent, pattern=f'{file_to_parse.stem}*.backup'
+        )
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -1050,13 +3692,39 @@ def get_EddyPro_files(file: str | pathlib.Path) -> list:
     """
 
     file_to_parse = _check_file_exists(file=file)
-    file_list = list(file_to_parse.parent.glob(f'*{EDDYPRO_SEARCH_STR}.txt'))
+    file_list = _glob_with_archives(
+        path=file_to_parse.parent, pattern=f'*{EDDYPRO_SEARCH_STR}.txt'
+        )
     file_list.sort()
     if file in file_list:
         file_list.remove(file_to_parse)
     return file_list
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def _glob_with_archives(path: pathlib.Path, pattern: str) -> list:
+    """Find files matching a glob pattern, and their compressed archives (an
+    archive is ignored if the uncompressed file is also present, e.g. while it
+    is being archived).
+
+    Args:
+        path: the directory to search.
+        pattern: the glob pattern for the uncompressed files.
+
+    Returns:
+        The list of files.
+
+    """
+
+    file_list = list(path.glob(pattern))
+    for suffix in COMPRESSION_SUFFIXES:
+        file_list += [
+            archive for archive in path.glob(f'{pattern}{suffix}')
+            if not archive.with_suffix('') in file_list
+            ]
+    return file_list
+#------------------------------------------------------------------------------
+
 
 
 ###############################################################################
@@ -1065,6 +3733,375 @@ def get_EddyPro_files(file: str | pathlib.Path) -> list:
 
 
 
+###############################################################################
+### BEGIN COMPRESSION FUNCTIONS ###
+###############################################################################
+
+
+
+#------------------------------------------------------------------------------
+def is_compressed(file: str | pathlib.Path) -> bool:
+    """Check whether a file is a compressed archive (by suffix).
+
+    Args:
+        file: absolute path of file.
+
+    Returns:
+        True if the suffix is one of COMPRESSION_SUFFIXES.
+
+    """
+
+    return pathlib.Path(file).suffix in COMPRESSION_SUFFIXES
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def open_file(file: str | pathlib.Path, mode: str='rb', codec: str=None):
+    """Open a file, decompressing (or compressing, if writing) compressed
+    archives as a stream.
+
+    Args:
+        file: absolute path of file.
+        mode: the file mode (`r`, `rb`, `w` or `wb`). The default is `rb`.
+        codec: one of COMPRESSION_SUFFIXES, or `None` to infer the codec from
+            the file suffix (uncompressed if not a compression suffix). The
+            default is None.
+
+    Raises:
+        ImportError: raised if the `.zst` codec is used and zstandard is not
+            installed.
+
+    Returns:
+        The file object.
+
+    """
+
+    if codec is None:
+        codec = pathlib.Path(file).suffix
+    stream_mode = mode if 'b' in mode else f'{mode}t'
+    if codec == '.gz':
+        return gzip.open(file, stream_mode)
+    if codec == '.xz':
+        return lzma.open(file, stream_mode)
+    if codec == '.zst':
+        if zstandard is None:
+            raise ImportError('The .zst codec requires zstandard!')
+        stream = zstandard.open(file, stream_mode)
+        return _ForwardSeekReader(stream) if stream_mode == 'rb' else stream
+    return open(file, mode)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _trim_tail(tail: bytes, tail_offset: int) -> bytes:
+    """Drop the (partial) first line of tail bytes that do not start at the
+    beginning of the file.
+
+    Args:
+        tail: the tail bytes.
+        tail_offset: the offset of the tail bytes in the file.
+
+    Returns:
+        The tail bytes.
+
+    """
+
+    return tail if tail_offset == 0 else tail[tail.find(b'\n') + 1:]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _read_stream_tail(f, n_bytes: int) -> tuple:
+    """Read a (non-seekable) stream to the end, keeping only the tail.
+
+    Args:
+        f: file object opened in binary mode.
+        n_bytes: the number of bytes to keep.
+
+    Returns:
+        The number of bytes read, and the last n_bytes of them.
+
+    """
+
+    blocks, n_read, n_kept = collections.deque(), 0, 0
+    while block := f.read(max(n_bytes, COUNT_BLOCK_BYTES)):
+        blocks.append(block)
+        n_read += len(block)
+        n_kept += len(block)
+        while n_kept - len(blocks[0]) >= n_bytes:
+            n_kept -= len(blocks.popleft())
+    return n_read, b''.join(blocks)[-n_bytes:]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _iter_compressed_lines_reversed(
+        file: str | pathlib.Path, block_size: int=REVERSE_BLOCK_BYTES
+        ):
+    """Iterate backwards over the lines of a compressed file. The tail is
+    kept while the stream is decompressed; if iteration continues past it,
+    the file is decompressed again in blocks to a temporary file, which is
+    then read backwards.
+
+    Args:
+        file: absolute path of file.
+        block_size: the number of bytes to keep from the tail.
+
+    Yields:
+        Lines (as bytes, excluding the newline), last line first.
+
+    """
+
+    with open_file(file=file) as f:
+        n_read, tail = _read_stream_tail(f=f, n_bytes=block_size)
+    lines = tail.split(b'\n')
+    if len(lines) > 1 and lines[-1] == b'':
+        lines.pop()
+    if n_read > len(tail):
+        lines.pop(0)
+    yield from reversed(lines)
+    if n_read > len(tail):
+        with tempfile.TemporaryFile() as tmp:
+            with open_file(file=file) as f:
+                shutil.copyfileobj(f, tmp, COUNT_BLOCK_BYTES)
+            yield from itertools.islice(
+                iter_lines_reversed(tmp, block_size=block_size),
+                len(lines),
+                None
+                )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def archive_file(
+        file: str | pathlib.Path, codec: str=ARCHIVE_CODEC
+        ) -> pathlib.Path:
+    """Compress a file in place: the archive is written alongside the file
+    (keeping its modification time) and read back to verify its content, and
+    the file is then removed.
+
+    Args:
+        file: absolute path of file.
+        codec: one of COMPRESSION_SUFFIXES. The default is ARCHIVE_CODEC.
+
+    Raises:
+        NotImplementedError: raised if codec not recognised.
+        RuntimeError: raised if the decompressed archive does not match the
+            file (the file is retained).
+
+    Returns:
+        The path of the archive.
+
+    """
+
+    if not codec in COMPRESSION_SUFFIXES:
+        raise NotImplementedError(f'Compression codec {codec} not implemented!')
+    file = _check_file_exists(file=file)
+    archive = file.with_name(f'{file.name}{codec}')
+    tmp_file = file.with_name(f'{archive.name}.tmp')
+    with open(file, 'rb') as f_in:
+        with open_file(file=tmp_file, mode='wb', codec=codec) as f_out:
+            shutil.copyfileobj(f_in, f_out, COUNT_BLOCK_BYTES)
+    if not _get_stream_hash(file=tmp_file, codec=codec) == _get_stream_hash(
+            file=file, codec=''
+            ):
+        tmp_file.unlink()
+        raise RuntimeError(
+            f'Archive of {file} does not match the original! File retained.'
+            )
+    stat = file.stat()
+    os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_file, archive)
+    file.unlink()
+    return archive
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_stream_hash(file: str | pathlib.Path, codec: str=None) -> str:
+    """Get the sha256 hash of the (decompressed) content of a file.
+
+    Args:
+        file: absolute path of file.
+        codec: one of COMPRESSION_SUFFIXES, an empty string for uncompressed,
+            or `None` to infer the codec from the file suffix. The default is
+            None.
+
+    Returns:
+        The hex digest.
+
+    """
+
+    file_hash = hashlib.sha256()
+    with open_file(file=file, codec=codec) as f:
+        while block := f.read(COUNT_BLOCK_BYTES):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def archive_old_files(
+        path: str | pathlib.Path, min_age_days: int=ARCHIVE_MIN_AGE_DAYS,
+        codec: str=ARCHIVE_CODEC
+        ) -> list:
+    """Compress in place the TOA5 backups and EddyPro summary files in a
+    directory that have not been modified for a minimum number of days.
+
+    Args:
+        path: the directory.
+        min_age_days: minimum days since last modification. The default is
+            ARCHIVE_MIN_AGE_DAYS.
+        codec: one of COMPRESSION_SUFFIXES. The default is ARCHIVE_CODEC.
+
+    Returns:
+        The paths of the archives.
+
+    """
+
+    cutoff = (dt.datetime.now() - dt.timedelta(days=min_age_days)).timestamp()
+    return [
+        archive_file(file=file, codec=codec)
+        for pattern in ['*.backup', f'*{EDDYPRO_SEARCH_STR}.txt']
+        for file in sorted(pathlib.Path(path).glob(pattern))
+        if file.stat().st_mtime < cutoff
+        ]
+#------------------------------------------------------------------------------
+
+
+
+###############################################################################
+### END COMPRESSION FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN COLUMNAR FILE FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def write_columnar_file(
+        data: pd.DataFrame, headers: pd.DataFrame,
+        abs_file_path: str | pathlib.Path, info: dict=None,
+        chunk_interval: str=COLUMNAR_CHUNK_INTERVAL
+        ):
+    """Write data to a compressed columnar (parquet) file, with one row group
+    per time chunk, and the headers and file info in the schema metadata.
+
+    Args:
+        data: the data, with DatetimeIndex (written as column TIMESTAMP).
+        headers: the dataframe containing the headers (units and sampling) as
+            columns, indexed on variable name.
+        abs_file_path: absolute path (including file name) to write to.
+        info: the file info. If None, no info is written. The default is None.
+        chunk_interval: the time interval of the row groups. The default is
+            COLUMNAR_CHUNK_INTERVAL.
+
+    Raises:
+        TypeError: if the data index is not a DatetimeIndex.
+
+    Returns:
+        None.
+
+    """
+
+    _check_columnar()
+    if not isinstance(data.index, pd.DatetimeIndex):
+        raise TypeError('Data must have a DatetimeIndex!')
+    table = pa.Table.from_pandas(
+        data.rename_axis('TIMESTAMP').reset_index(), preserve_index=False
+        )
+    metadata = {
+        'headers': headers.to_dict(orient='index'),
+        'info': info
+        }
+    table = table.replace_schema_metadata({
+        **table.schema.metadata,
+        COLUMNAR_METADATA_KEY: json.dumps(metadata)
+        })
+    chunks = data.index.floor(chunk_interval).asi8
+    bounds = np.concatenate([
+        [0], np.flatnonzero(np.diff(chunks)) + 1, [len(chunks)]
+        ])
+    with pq.ParquetWriter(
+            abs_file_path, table.schema, compression=COLUMNAR_COMPRESSION
+            ) as writer:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            writer.write_table(table.slice(start, stop - start))
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_columnar_data(
+        file: str | pathlib.Path, usecols: list=None,
+        start: dt.datetime=None, end: dt.datetime=None
+        ) -> pd.DataFrame:
+    """Read data from a columnar file. Only the requested columns, and the
+    row groups overlapping the time window, are read.
+
+    Args:
+        file: absolute path of file to read.
+        usecols: the subset of columns to keep. If None, keep all.
+        start: if specified, the first date of the window to read.
+        end: if specified, the last date of the window to read.
+
+    Returns:
+        File data content, with DatetimeIndex.
+
+    """
+
+    _check_columnar()
+    columns = None
+    if usecols is not None:
+        columns = ['TIMESTAMP'] + [col for col in usecols if col != 'TIMESTAMP']
+    filters = []
+    if start is not None:
+        filters.append(('TIMESTAMP', '>=', pd.Timestamp(start)))
+    if end is not None:
+        filters.append(('TIMESTAMP', '<=', pd.Timestamp(end)))
+    return (
+        pq.read_table(file, columns=columns, filters=filters or None)
+        .to_pandas()
+        .set_index(keys='TIMESTAMP')
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_columnar_headers(file: str | pathlib.Path) -> tuple:
+    """Read the headers and file info from a columnar file (without reading
+    the data).
+
+    Args:
+        file: absolute path of file to read.
+
+    Returns:
+        The headers (as dataframe indexed on variable name) and the file info.
+
+    """
+
+    _check_columnar()
+    metadata = json.loads(
+        pq.read_schema(file).metadata[COLUMNAR_METADATA_KEY]
+        )
+    headers = pd.DataFrame.from_dict(metadata['headers'], orient='index')
+    return headers.rename_axis('variable'), metadata['info']
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _check_columnar():
+    """Check columnar files are available.
+
+    Raises:
+        ImportError: raised if pyarrow is not installed.
+
+    Returns:
+        None
+
+    """
+
+    if pa is None:
+        raise ImportError('Columnar files require pyarrow!')
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END COLUMNAR FILE FUNCTIONS ###
+###############################################################################
+
+
+
 ###############################################################################
 ### BEGIN FILE INTERVAL FUNCTIONS ###
 ###############################################################################
@@ -1072,25 +4109,100 @@ def get_EddyPro_files(file: str | pathlib.Path) -> list:
 
 
 #------------------------------------------------------------------------------
-def get_file_interval(file: str | pathlib.Path, file_type: str=None) -> int:
-    """Find the file interval (i.e. time step)
+def get_file_interval(
+        file: str | pathlib.Path, file_type: str=None, sample: bool=True
+        ) -> int:
+    """Find the file interval (i.e. time step). Results are cached by file
+    identity (path, size and modification time), file_type and sample.
 
     Args:
         file: absolute path of file to parse.
         file_type: if specified, must be either `TOA5` or
             `EddyPro`. If None, file_type is fetched. Defaults to None.
+        sample: if True, infer the interval from line samples taken at several
+            offsets in the file, and parse all dates only if the samples
+            disagree (compressed files are always parsed in full). Defaults
+            to True.
 
     Returns:
         the inferred file interval.
 
     """
 
+    # Check the cache
+    stat = os.stat(file)
+    key = (
+        str(pathlib.Path(file).resolve()), stat.st_size, stat.st_mtime_ns,
+        file_type, sample
+        )
+    entries = FILE_INTERVAL_CACHE['entries']
+    if key in entries:
+        entries.move_to_end(key)
+        return entries[key]
+
     # If file type not supplied, detect it.
     if not file_type:
         file_type = get_file_type(file)
-    return get_datearray_interval(
-        datearray=np.unique(np.array(get_dates(file=file, file_type=file_type)))
-        )
+
+    # Infer from samples, falling back to all dates
+    interval = None
+    if sample and not is_compressed(file=file):
+        interval = _get_sampled_interval(file=file, file_type=file_type)
+    if interval is None:
+        interval = get_datearray_interval(
+            datearray=get_dates(file=file, file_type=file_type)
+            )
+    entries[key] = interval
+    while len(entries) > FILE_INTERVAL_CACHE['max_entries']:
+        entries.popitem(last=False)
+    return interval
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_sampled_interval(file: str | pathlib.Path, file_type: str) -> int:
+    """Infer the file interval from line samples taken at evenly spaced
+    offsets in the file.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type: must be either `TOA5` or `EddyPro`.
+
+    Returns:
+        The interval if all samples agree, else None.
+
+    """
+
+    line_formatter = get_formatter(file_type=file_type, which='read_line')
+    date_formatter = get_formatter(file_type=file_type, which='read_date')
+    data_offset = len(_get_header_bytes(file=file, file_type=file_type))
+    size = os.path.getsize(file)
+    offsets = np.linspace(
+        data_offset, size, INTERVAL_SAMPLE_OFFSETS, endpoint=False
+        ).astype(int)
+    intervals = set()
+    with open_file(file=file) as f:
+        for offset in offsets:
+
+            # Read the sample, discarding any partial line at the start
+            f.seek(offset)
+            if offset > data_offset:
+                f.readline()
+            dates = []
+            for line in itertools.islice(f, INTERVAL_SAMPLE_LINES):
+                try:
+                    dates.append(date_formatter(line_formatter(line.decode())))
+                except (ValueError, IndexError, UnicodeDecodeError):
+                    continue
+
+            # Get the sample interval
+            try:
+                intervals.add(get_datearray_interval(datearray=dates))
+            except RuntimeError:
+                return None
+
+    if len(intervals) == 1 and not None in intervals:
+        return intervals.pop()
+    return None
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -1098,10 +4210,11 @@ def get_datearray_interval(datearray: ArrayLike) -> int:
     """Attempts to infer the likely time interval from non-monotonic time stamps.
 
     Args:
-      datearray: the date array from which to infer the interval.
+      datearray: the date array from which to infer the interval (datetimes,
+          datetime64 or int64 nanoseconds).
 
     Returns:
-      the inferred interval.
+      the inferred interval (None if there are fewer than two unique dates).
 
     Raises:
       RuntimeError: raised if the minimum and most common values are not the
@@ -1109,13 +4222,13 @@ def get_datearray_interval(datearray: ArrayLike) -> int:
 
     """
 
-
-    if len(datearray) == 1:
+    dates = pd.DatetimeIndex(datearray)
+    values = np.unique(dates[~dates.isna()].as_unit('ns').asi8)
+    if len(values) < 2:
         return None
-    datearray = np.unique(datearray)
-    deltas, counts = np.unique(datearray[1:] - datearray[:-1], return_counts=True)
-    minimum_val = deltas[0].seconds / 60
-    common_val = (deltas[np.where(counts==counts.max())][0]).seconds / 60
+    deltas, counts = np.unique(np.diff(values) // 10**9, return_counts=True)
+    minimum_val = deltas[0] / 60
+    common_val = deltas[counts.argmax()] / 60
     if minimum_val == common_val:
         return int(minimum_val)
     raise RuntimeError('Minimum and most common values do not coincide!')
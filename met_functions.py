@@ -118,6 +118,36 @@ def apply_limits(data, data_min, data_max, inplace=False):
         return data.where(~filter_bool, np.nan)
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def iter_apply_limits(chunks, data_min, data_max):
+    """
+    Filter chunked data lazily, setting values outside the limits to NaN (as
+    for apply_limits). Each chunk is filtered only when it is requested, and
+    is neither modified nor held once yielded, so memory use is that of a
+    single chunk.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Chunks of data (e.g. dataframes from file_io.iter_data), in any order.
+        Each chunk must support the comparisons and `where` method used by
+        apply_limits.
+    data_min : float or pd.Series
+        The lower limit (a series must be indexed by the chunk columns).
+    data_max : float or pd.Series
+        The upper limit (a series must be indexed by the chunk columns).
+
+    Yields
+    ------
+    pd.core.frame.DataFrame or pd.Series
+        A filtered copy of each chunk, in the order of the chunks.
+
+    """
+
+    for chunk in chunks:
+        yield apply_limits(data=chunk, data_min=data_min, data_max=data_max)
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def convert_CO2_flux(data, from_units='mg/m^2/s'):
 
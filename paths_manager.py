@@ -346,6 +346,37 @@ class Paths():
     ### END REMOTE DATA METHODS ###
     ###########################################################################
 
+    ###########################################################################
+    ### BEGIN PROCESSING SETTINGS METHODS ###
+    ###########################################################################
+
+    #--------------------------------------------------------------------------
+    def get_processing_setting(self, setting, fallback=None):
+        """
+        Get a processing setting defined in the .ini file.
+
+        Parameters
+        ----------
+        setting : str
+            The setting to return.
+        fallback : str, optional
+            The value to return if the setting is not defined. The default is
+            None.
+
+        Returns
+        -------
+        str
+            The setting value.
+
+        """
+
+        return self._config.get('PROCESSING', setting, fallback=fallback)
+    #--------------------------------------------------------------------------
+
+    ###########################################################################
+    ### END PROCESSING SETTINGS METHODS ###
+    ###########################################################################
+
     ###########################################################################
     ### BEGIN GENERIC PUBLIC METHODS ###
     ###########################################################################
@@ -11,14 +11,19 @@ To do:
      extension is '.da')
 """
 
+import concurrent.futures as cf
 import datetime as dt
 import hashlib
 import logging
 import numpy as np
+import pandas as pd
+import sqlite3
 import subprocess as spc
 import sys
 
+import file_io as io
 import paths_manager as pm
+import tob3_decoder as tob3
 sys.path.append('../site_details')
 import sparql_site_details as sd
 
@@ -41,12 +46,141 @@ FILENAME_FORMAT = {
 TIME_FORMAT = {'TOB3': '%Y,%m,%d', 'TOA5': '%Y,%m,%d,%H%M'}
 ALIAS_DICT = {'GWW': 'GreatWesternWoodlands'}
 STREAM_DICT = {'main': 'flux_fast', 'under': 'flux_fast_aux'}
+CONVERTERS = ['native', 'CardConvert']
+ARCHIVE_FORMATS = ['TOA5', 'parquet', 'both']
+HASH_BLOCK_BYTES = 2**20
+MANIFEST_NAME = 'checksums.sqlite'
+STATS_FILE_NAME = 'quicklook_stats.csv'
+DIAG_SEARCH_STR = 'diag'
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 ### CLASSES ###
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+class ChecksumManifest():
+    """
+    SQLite manifest of the checksums of archived files, so that archived files
+    are not re-read to check against new files. Entries are recorded lazily,
+    the first time a duplicate check needs the hash of an archived file (not
+    when the file is archived), are keyed on path (relative to the manifest
+    directory), and are stale (the file is re-hashed) if the file size or
+    modification time has changed.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, path):
+        """
+        Open (or create) the manifest.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            Absolute path to the manifest database.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS checksums ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                'sha256 TEXT)'
+                )
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def get_hash(self, file):
+        """
+        Get the checksum for the file from the manifest, hashing (and
+        recording) it only if no valid entry exists.
+
+        Parameters
+        ----------
+        file : pathlib.Path
+            Absolute path to file.
+
+        Returns
+        -------
+        str
+            Hash for the file.
+
+        """
+
+        stat = file.stat()
+        row = self.connection.execute(
+            'SELECT sha256 FROM checksums '
+            'WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (self._get_key(file=file), stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row[0]
+        return self.add(file=file)
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def add(self, file):
+        """
+        Hash the file and record it in the manifest.
+
+        Parameters
+        ----------
+        file : pathlib.Path
+            Absolute path to file.
+
+        Returns
+        -------
+        str
+            Hash for the file.
+
+        """
+
+        stat = file.stat()
+        file_hash = get_hash(file=file)
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?)',
+                (
+                    self._get_key(file=file), stat.st_size,
+                    stat.st_mtime_ns, file_hash
+                    )
+                )
+        return file_hash
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _get_key(self, file):
+        """
+        Get the manifest key for the file.
+
+        Parameters
+        ----------
+        file : pathlib.Path
+            Absolute path to file.
+
+        Returns
+        -------
+        str
+            Path relative to the manifest directory (absolute path if the file
+            is outside it).
+
+        """
+
+        try:
+            return file.relative_to(self.path.parent).as_posix()
+        except ValueError:
+            return file.as_posix()
+    #--------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 class GenericHandler():
     """
@@ -165,6 +299,9 @@ class RawFileHandler(GenericHandler):
         self.output_data_path = get_path(
             site=site, system=system, data='raw', io='output'
             )
+        self.manifest = ChecksumManifest(
+            path=self.output_data_path / MANIFEST_NAME
+            )
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -195,7 +332,7 @@ class RawFileHandler(GenericHandler):
         destination = self.get_destination_path(file=file)
         if not destination.exists():
             return False
-        if get_hash(file=file) == get_hash(file=destination):
+        if get_hash(file=file) == self.manifest.get_hash(file=destination):
             return True
         raise RuntimeError(
             f'File {file.name} in {file.parent} exists in archive, but '
@@ -273,8 +410,7 @@ class RawFileHandler(GenericHandler):
 
 
         destination = self.get_destination_path(file=file)
-        if not destination.parent.exists():
-            destination.parent.mkdir(parents=True)
+        destination.parent.mkdir(parents=True, exist_ok=True)
         if not self.check_file_parsed(file=file):
             file.rename(destination)
     #--------------------------------------------------------------------------
@@ -298,6 +434,9 @@ class ConvertedFileHandler(GenericHandler):
         self.output_data_path = get_path(
             site=site, system=system, data='converted', io='output'
             )
+        self.manifest = ChecksumManifest(
+            path=self.output_data_path / MANIFEST_NAME
+            )
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -328,7 +467,7 @@ class ConvertedFileHandler(GenericHandler):
         destination = self.get_destination_path(file=file)
         if not destination.exists():
             return False
-        if get_hash(file=file) == get_hash(file=destination):
+        if get_hash(file=file) == self.manifest.get_hash(file=destination):
             return True
         raise RuntimeError(
             f'File {file.name} in {file.parent} exists in archive, but '
@@ -420,8 +559,7 @@ class ConvertedFileHandler(GenericHandler):
         """
 
         destination = self.get_destination_path(file=file)
-        if not destination.parent.exists():
-            destination.parent.mkdir(parents=True)
+        destination.parent.mkdir(parents=True, exist_ok=True)
         if not self.check_file_parsed(file=file):
             file.rename(destination)
     #--------------------------------------------------------------------------
@@ -474,7 +612,7 @@ class ConvertedFileHandler(GenericHandler):
 #------------------------------------------------------------------------------
 def get_hash(file):
     """
-    Do the checksum for the file.
+    Do the checksum for the file (read in blocks of HASH_BLOCK_BYTES).
 
     Parameters
     ----------
@@ -488,9 +626,11 @@ def get_hash(file):
 
     """
 
+    file_hash = hashlib.sha256()
     with open(file, 'rb') as f:
-        the_bytes=f.read()
-        return hashlib.sha256(the_bytes).hexdigest()
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -520,12 +660,172 @@ def get_path(site, system, data, io):
                 subdirs=['TOA5'],
                 site=site
                 )
+             },
+         'columnar': {
+            'output': PATHS.get_local_data_path(
+                data_stream=STREAM_DICT[system],
+                subdirs=['Parquet'],
+                site=site
+                )
              }
          }
 
     return ref_dict[data][io]
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def get_quicklook_stats(file):
+    """
+    Get the quick-look statistics for each numeric variable of a converted
+    file (mean, standard deviation, min, max, NaN count and sample count, plus
+    the count of non-zero flags for diagnostic variables). The file is read
+    in chunks (see file_io.iter_data), and the statistics of the chunks are
+    combined, so memory use does not depend on the file size.
+
+    Parameters
+    ----------
+    file : pathlib.Path
+        Absolute path to converted (archived) file.
+
+    Returns
+    -------
+    pd.core.frame.DataFrame
+        The statistics (one row per variable), with the file end time as
+        TIMESTAMP.
+
+    """
+
+    elems = dict(zip(FILENAME_FORMAT['TOA5'], file.stem.split('_')))
+    timestamp = dt.datetime.strptime(
+        ','.join(elems[elem] for elem in FILENAME_FORMAT['TOA5'][3:]),
+        TIME_FORMAT['TOA5']
+        )
+    stats = None
+    for chunk in io.iter_data(file=file, file_type='TOA5'):
+        if stats is None:
+            variables = chunk.select_dtypes(include='number').columns
+            stats = {
+                'n_samples': 0,
+                'n_valid': np.zeros(len(variables)),
+                'mean': np.zeros(len(variables)),
+                'm2': np.zeros(len(variables)),
+                'min': np.full(len(variables), np.inf),
+                'max': np.full(len(variables), -np.inf),
+                'n_flagged': np.zeros(len(variables))
+                }
+        _update_quicklook_stats(
+            stats=stats, values=chunk[variables].to_numpy(dtype='float64')
+            )
+    if stats is None:
+        return pd.DataFrame(columns=[
+            'TIMESTAMP', 'file', 'variable', 'n_samples', 'n_nan', 'mean',
+            'std', 'min', 'max', 'n_flagged'
+            ])
+    no_data = stats['n_valid'] == 0
+    is_diag = variables.str.contains(DIAG_SEARCH_STR, case=False)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(stats['m2'] / (stats['n_valid'] - 1))
+    return pd.DataFrame({
+        'TIMESTAMP': timestamp.strftime(io.DATE_FORMAT),
+        'file': file.name,
+        'variable': variables,
+        'n_samples': stats['n_samples'],
+        'n_nan': (stats['n_samples'] - stats['n_valid']).astype(int),
+        'mean': np.where(no_data, np.nan, stats['mean']),
+        'std': std,
+        'min': np.where(no_data, np.nan, stats['min']),
+        'max': np.where(no_data, np.nan, stats['max']),
+        'n_flagged': np.where(is_diag, stats['n_flagged'], np.nan)
+        })
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _update_quicklook_stats(stats, values):
+    """
+    Update the running quick-look statistics with a chunk of values (the
+    means and sums of squared deviations are combined pairwise, which is
+    numerically stable).
+
+    Parameters
+    ----------
+    stats : dict
+        The running statistics (updated in place).
+    values : np.ndarray
+        The values of the chunk (records x variables).
+
+    Returns
+    -------
+    None.
+
+    """
+
+    valid = ~np.isnan(values)
+    n_valid = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(
+            n_valid > 0, np.where(valid, values, 0).sum(axis=0) / n_valid, 0
+            )
+        n_total = stats['n_valid'] + n_valid
+        frac = np.where(n_total > 0, n_valid / n_total, 0)
+    m2 = (np.where(valid, values - mean, 0)**2).sum(axis=0)
+    delta = mean - stats['mean']
+    stats['m2'] += m2 + delta**2 * stats['n_valid'] * frac
+    stats['mean'] += delta * frac
+    stats['n_valid'] = n_total
+    stats['n_samples'] += len(values)
+    stats['min'] = np.minimum(
+        stats['min'], np.where(valid, values, np.inf).min(axis=0)
+        )
+    stats['max'] = np.maximum(
+        stats['max'], np.where(valid, values, -np.inf).max(axis=0)
+        )
+    stats['n_flagged'] += (np.where(valid, values, 0) != 0).sum(axis=0)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def update_quicklook_stats(site, system='main'):
+    """
+    Append the quick-look statistics of converted files not yet summarised to
+    the half-hourly statistics table (STATS_FILE_NAME in the converted file
+    archive).
+
+    Parameters
+    ----------
+    site : str
+        The site.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+        The default is 'main'.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    handler = ConvertedFileHandler(site=site, system=system)
+    stats_file = handler.output_data_path / STATS_FILE_NAME
+    done = set()
+    if stats_file.exists():
+        done = set(pd.read_csv(stats_file, usecols=['file'])['file'])
+    files = sorted(
+        file for file in
+        handler.output_data_path.rglob(f'TOA5_{handler.system_name}_*.dat')
+        if not file.name in done
+        )
+    logging.info(f'Summarising {len(files)} new converted files...')
+    for file in files:
+        try:
+            stats = get_quicklook_stats(file=file)
+        except (ValueError, KeyError, RuntimeError) as e:
+            logging.error(f'Could not summarise {file.name}: {e}')
+            continue
+        stats.to_csv(
+            stats_file, mode='a', header=not stats_file.exists(), index=False
+            )
+    logging.info('Done!')
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def get_system_name(site, system):
     """
@@ -590,6 +890,341 @@ def run_CardConvert(site, system):
     return spc.run(spc_args, capture_output=True)
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def write_columnar_archive(
+        site, system, file, time_step, header=None, data=None
+        ):
+    """
+    Write a raw (daily) TOB3 file to the columnar archive (one compressed
+    parquet file per day, chunked by time step, with the units and sampling
+    as metadata).
+
+    Parameters
+    ----------
+    site : str
+        The site.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+    file : pathlib.Path
+        Absolute path of the TOB3 file.
+    time_step : int
+        Averaging interval in minutes of the data (the chunk interval).
+    header : dict, optional
+        The TOB3 file header, if already read. The default is None.
+    data : pd.core.frame.DataFrame, optional
+        The decoded TOB3 data, if already decoded. The default is None.
+
+    Returns
+    -------
+    pathlib.Path
+        Absolute path of the columnar file.
+
+    """
+
+    elems = file.stem.split('_')
+    elems_dict = dict(zip(FILENAME_FORMAT['TOB3'], elems))
+    destination = (
+        get_path(site=site, system=system, data='columnar', io='output') /
+        '_'.join([elems_dict['Year'], elems_dict['Month']]) /
+        ('_'.join(elems[1:]) + io.COLUMNAR_SUFFIX)
+        )
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tob3.write_columnar_file(
+        file=file, abs_file_path=destination, chunk_interval=f'{time_step}min',
+        header=header, data=data
+        )
+    return destination
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def convert_raw_file(site, system, file, time_step, archive_format='TOA5'):
+    """
+    Decode a TOB3 file with the native decoder, and write it to the columnar
+    archive and / or convert it to TOA5 (output files are named as by
+    CardConvert, and written to the same location). The file is decoded only
+    once, whatever the archive format.
+
+    Parameters
+    ----------
+    site : str
+        The site.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+    file : pathlib.Path
+        Absolute path of the TOB3 file.
+    time_step : int
+        Averaging interval in minutes of the data.
+    archive_format : str, optional
+        The archive format (see ARCHIVE_FORMATS). The default is 'TOA5'.
+
+    Returns
+    -------
+    dict
+        Absolute path of the columnar file ('columnar', None if not written)
+        and of the TOA5 files written ('converted').
+
+    """
+
+    header = tob3.get_header(file=file)
+    data = tob3.get_data(file=file, header=header)
+    rslt = {'columnar': None, 'converted': []}
+    if archive_format != 'TOA5':
+        rslt['columnar'] = write_columnar_archive(
+            site=site,
+            system=system,
+            file=file,
+            time_step=time_step,
+            header=header,
+            data=data
+            )
+    if archive_format != 'parquet':
+        rslt['converted'] = tob3.convert_file(
+            file=file,
+            output_path=get_path(
+                site=site, system=system, data='converted', io='input'
+                ),
+            time_step=time_step,
+            header=header,
+            data=data
+            )
+    return rslt
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def run_native_conversion(
+        site, system, files, time_step, archive_format='TOA5'
+        ):
+    """
+    Convert TOB3 files with the native decoder (see convert_raw_file).
+
+    Parameters
+    ----------
+    site : str
+        The site for which to convert files.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+    files : list
+        Absolute paths of the TOB3 files to convert.
+    time_step : int
+        Averaging interval in minutes of the data.
+    archive_format : str, optional
+        The archive format (see ARCHIVE_FORMATS). The default is 'TOA5'.
+
+    Returns
+    -------
+    list
+        Absolute paths of the TOA5 files written.
+
+    """
+
+    converted_files = []
+    for file in files:
+        rslt = convert_raw_file(
+            site=site,
+            system=system,
+            file=file,
+            time_step=time_step,
+            archive_format=archive_format
+            )
+        if rslt['columnar']:
+            logging.info(f'{file.name} -> {rslt["columnar"]}')
+        converted_files += rslt['converted']
+    return converted_files
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def move_converted_files(raw_handler, processed_handler, files, log):
+    """
+    Check converted files and move them to final storage (files already in
+    final storage with matching checksums are deleted).
+
+    Parameters
+    ----------
+    raw_handler : RawFileHandler
+        Handler used to check the destination file name format.
+    processed_handler : ConvertedFileHandler
+        Handler used to get the destination and move the files.
+    files : list
+        Absolute paths of the converted files.
+    log : callable
+        Called with (level, msg) for each log message (e.g. logging.log).
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the file name format is invalid, or the file exists in
+        final storage with different checksum.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    for file in files:
+
+        dest = processed_handler.get_destination_path(file=file)
+
+        log(logging.INFO, f'{file.name} -> {dest}')
+
+        try:
+            raw_handler.check_file_name_format(file=dest)
+            log(logging.INFO, '    - format -> OK')
+        except RuntimeError as e:
+            log(logging.ERROR, e); raise
+
+        try:
+            if processed_handler.check_file_parsed(file=file):
+                processed_handler.remove_file(file=file)
+                log(
+                    logging.ERROR,
+                    '    - already_parsed -> True! Checksums match - deleting!'
+                    )
+                continue
+            else:
+                log(logging.INFO, '    - already parsed -> False')
+        except RuntimeError as e:
+            log(logging.ERROR, e); raise
+
+        processed_handler.move_file(file=file)
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def run_parallel_conversion(
+        site, system, files, n_workers, archive_format='TOA5'
+        ):
+    """
+    Shard the raw files across a process pool, each worker converting,
+    checking and moving the files of its shard (see _convert_shard). Worker
+    log messages are written to the log shard by shard. Each worker holds
+    about 4x the size of the raw file it is decoding in memory (the raw bytes
+    read by np.fromfile, a contiguous copy of the decoded records and the
+    DataFrame built from them), so n_workers should be set (in paths.ini) to
+    suit the available memory and the raw file size.
+
+    Parameters
+    ----------
+    site : str
+        The site for which to convert files.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+    files : list
+        Absolute paths of the TOB3 files to convert.
+    n_workers : int
+        Maximum number of worker processes.
+    archive_format : str, optional
+        The archive format (see ARCHIVE_FORMATS). The default is 'TOA5'.
+
+    Raises
+    ------
+    Exception
+        The first exception raised by a worker (after all worker messages
+        have been logged).
+
+    Returns
+    -------
+    None.
+
+    """
+
+    n_workers = min(n_workers, len(files))
+    shards = [files[i::n_workers] for i in range(n_workers)]
+    logging.info(
+        f'Converting {len(files)} raw files in {n_workers} worker processes...'
+        )
+    with cf.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(
+            _convert_shard,
+            [site] * n_workers,
+            [system] * n_workers,
+            shards,
+            [archive_format] * n_workers
+            ))
+
+    # Write the worker messages and the aggregate file counts to the log
+    error = None
+    for rslt in results:
+        for level, msg in rslt['messages']:
+            logging.log(level, msg)
+        if error is None:
+            error = rslt['error']
+    if error is not None:
+        raise error
+    n_expected_files = sum(rslt['n_expected'] for rslt in results)
+    n_yielded_files = sum(rslt['n_yielded'] for rslt in results)
+    msg = f'Expected {n_expected_files}, got {n_yielded_files}!'
+    if archive_format != 'parquet':
+        if n_yielded_files == n_expected_files:
+            logging.info(msg)
+        else:
+            logging.warning(msg)
+    logging.info('Parallel conversion and move of files complete!')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _convert_shard(site, system, files, archive_format='TOA5'):
+    """
+    Worker for parallel conversion: convert each raw file with the native
+    decoder, move it to final storage, then check and move its converted
+    files.
+
+    Parameters
+    ----------
+    site : str
+        The site for which to convert files.
+    system : str
+        The eddy covariance system - either 'main' or 'under'.
+    files : list
+        Absolute paths of the TOB3 files in the shard.
+    archive_format : str, optional
+        The archive format (see ARCHIVE_FORMATS). The default is 'TOA5'.
+
+    Returns
+    -------
+    dict
+        Log messages (as level, msg), expected and yielded number of
+        converted files and the exception raised (None if no error).
+
+    """
+
+    messages = []
+    def log(level, msg):
+        messages.append((level, str(msg)))
+
+    rslt = {
+        'messages': messages, 'n_expected': 0, 'n_yielded': 0, 'error': None
+        }
+    raw_handler = RawFileHandler(site=site, system=system)
+    processed_handler = ConvertedFileHandler(site=site, system=system)
+    try:
+        for file in files:
+            log(logging.INFO, f'Converting {file.name}...')
+            converted = convert_raw_file(
+                site=site,
+                system=system,
+                file=file,
+                time_step=processed_handler.time_step,
+                archive_format=archive_format
+                )
+            if converted['columnar']:
+                log(logging.INFO, f'{file.name} -> {converted["columnar"]}')
+            raw_handler.move_file(file=file)
+            if archive_format == 'parquet':
+                continue
+            rslt['n_expected'] += int(1440 / processed_handler.time_step)
+            rslt['n_yielded'] += len(converted['converted'])
+            move_converted_files(
+                raw_handler=raw_handler,
+                processed_handler=processed_handler,
+                files=converted['converted'],
+                log=log
+                )
+    except Exception as e:
+        log(logging.ERROR, e)
+        rslt['error'] = e
+    return rslt
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def write_ccf_file(site, time_step, system='main', overwrite=True):
     """
@@ -659,7 +1294,17 @@ def write_ccf_file(site, time_step, system='main', overwrite=True):
 ### MAIN FUNCTION ###
 #------------------------------------------------------------------------------
 
-def main(site, system, overwrite_ccf=True):
+def main(
+        site, system, overwrite_ccf=True, converter='native', n_workers=1,
+        archive_format='TOA5'
+        ):
+
+    if not converter in CONVERTERS:
+        raise KeyError(f'converter must be one of {", ".join(CONVERTERS)}')
+    if not archive_format in ARCHIVE_FORMATS:
+        raise KeyError(
+            f'archive_format must be one of {", ".join(ARCHIVE_FORMATS)}'
+            )
 
     # Instantiate raw file handler
     raw_handler = RawFileHandler(site=site, system=system)
@@ -701,28 +1346,80 @@ def main(site, system, overwrite_ccf=True):
         msg = 'Available files were all duplicates! Exiting...'
         logging.error(msg); raise FileNotFoundError(msg)
 
-    # Make the ccf file
-    logging.info('Writing CardConvert configuration file...')
-    write_ccf_file(
-        site=site,
-        time_step=raw_handler.time_step,
-        system=system,
-        overwrite=overwrite_ccf
-        )
-    logging.info('Done!')
+    # Convert, check and move the raw files in parallel (native decoder only)
+    if n_workers > 1 and converter == 'native':
+        run_parallel_conversion(
+            site=site,
+            system=system,
+            files=raw_files_to_convert,
+            n_workers=n_workers,
+            archive_format=archive_format
+            )
+        return
+    if n_workers > 1:
+        logging.warning(
+            'Parallel conversion requires the native converter! '
+            'Running CardConvert sequentially...'
+            )
 
-    # Run CardConvert
-    logging.info('Running TOA5 format conversion with CardConvert_parser...')
-    rslt = run_CardConvert(site=site, system=system)
-    try:
-        rslt.check_returncode()
+    # If converting with CardConvert, write the columnar archive with the
+    # native decoder first (otherwise it is written in the same pass as the
+    # TOA5 files)
+    if archive_format != 'TOA5' and converter != 'native':
+        logging.info('Writing columnar archive files...')
+        for file in raw_files_to_convert:
+            destination = write_columnar_archive(
+                site=site,
+                system=system,
+                file=file,
+                time_step=raw_handler.time_step
+                )
+            logging.info(f'{file.name} -> {destination}')
+        logging.info('Done!')
+
+    # Run the native decoder (the columnar archive and / or TOA5)
+    if converter == 'native':
+        logging.info('Running format conversion with native decoder...')
+        run_native_conversion(
+            site=site,
+            system=system,
+            files=raw_files_to_convert,
+            time_step=raw_handler.time_step,
+            archive_format=archive_format
+            )
         logging.info('Format conversion done!')
-    except spc.CalledProcessError():
-        logging.error(
-            'Failed to run CardConvert due to the following: '
-            f'{rslt.stderr.decode()}'
+
+    # If not writing TOA5, move the raw files and finish
+    if archive_format == 'parquet':
+        logging.info('Moving raw files to final destination...')
+        for file in raw_files_to_convert:
+            raw_handler.move_file(file=file)
+        logging.info('Raw file move complete!')
+        return
+
+    # Make the ccf file and run CardConvert (if not using the native decoder)
+    if converter != 'native':
+        logging.info('Writing CardConvert configuration file...')
+        write_ccf_file(
+            site=site,
+            time_step=raw_handler.time_step,
+            system=system,
+            overwrite=overwrite_ccf
+            )
+        logging.info('Done!')
+        logging.info(
+            'Running TOA5 format conversion with CardConvert_parser...'
             )
-        raise
+        rslt = run_CardConvert(site=site, system=system)
+        try:
+            rslt.check_returncode()
+            logging.info('Format conversion done!')
+        except spc.CalledProcessError():
+            logging.error(
+                'Failed to run CardConvert due to the following: '
+                f'{rslt.stderr.decode()}'
+                )
+            raise
 
     # Move all of the raw files...
     logging.info('Moving raw files to final destination...')
@@ -746,29 +1443,10 @@ def main(site, system, overwrite_ccf=True):
 
     # Iterate over list of converted files
     logging.info('Rebuilding and moving converted files...')
-    for file in yielded_files:
-
-        dest = processed_handler.get_destination_path(file=file)
-
-        logging.info(f'{file.name} -> {dest}')
-
-        try:
-            raw_handler.check_file_name_format(file=dest)
-            logging.info('    - format -> OK')
-        except RuntimeError as e:
-            logging.error(e); raise
-
-        try:
-            if processed_handler.check_file_parsed(file=file):
-                processed_handler.remove_file(file=file)
-                logging.error(
-                    '    - already_parsed -> True! Checksums match - deleting!'
-                    )
-            else:
-                logging.info('    - already parsed -> False')
-        except RuntimeError as e:
-            logging.error(e); raise
-
-        processed_handler.move_file(file=file)
-
+    move_converted_files(
+        raw_handler=raw_handler,
+        processed_handler=processed_handler,
+        files=yielded_files,
+        log=logging.log
+        )
     logging.info('Rebuild and move of converted files complete!')
@@ -10,8 +10,10 @@ Created on Wed Oct 12 11:25:28 2022
 #------------------------------------------------------------------------------
 
 import logging
+import os
 import pathlib
 import subprocess as spc
+import tempfile
 
 #------------------------------------------------------------------------------
 ### CUSTOM IMPORTS ###
@@ -31,12 +33,17 @@ ARGS_LIST = [
     ]
 ALLOWED_STREAMS = ['flux_slow', 'flux_fast', 'rtmc']
 ALLOWED_REMOTES = PATHS.list_remote_storages()
+COLUMNAR_DIR = 'Parquet'
+COLUMNAR_SUFFIX = '.parquet'
+# Suffixes of the local compressed archives of old backups (see
+# file_io.archive_old_files); the remote keeps the uncompressed originals
+ARCHIVE_SUFFIXES = ['.gz', '.zst', '.xz']
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 def generic_move(
         local_location, remote_location, which_way='to_remote',
-        exclude_dirs=None, timeout=600
+        exclude_dirs=None, exclude_files=None, timeout=600
         ):
 
     # Check direction is valid
@@ -67,10 +74,15 @@ def generic_move(
         from_location = remote_location
         to_location = local_location
 
-    # Do the transfer
+    # Do the transfer (file exclusions are passed in a filter file, since
+    # there may be too many for the command line)
     run_args = ARGS_LIST.copy()
     if exclude_dirs:
         run_args += _add_rclone_exclude(exclude_dirs=exclude_dirs)
+    filter_file = None
+    if exclude_files:
+        filter_file = _write_rclone_filter_file(exclude_files=exclude_files)
+        run_args += ['--exclude-from', filter_file]
     logging.info('Copying now...')
     run_list =  [APP_PATH] + run_args + [from_location, to_location]
     try:
@@ -80,15 +92,27 @@ def generic_move(
         logging.error(e)
         logging.error('Copy failed!')
         raise
+    finally:
+        if filter_file:
+            os.remove(filter_file)
     logging.info('Copy succeeded')
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 def pull_slow_flux(site):
 
+    # Backups that have been archived locally are not retrieved again (the
+    # remote still holds the uncompressed originals)
     logging.info(f'Begin retrieval of {site} slow data from UQRDM')
+    local_path = PATHS.get_local_data_path(site=site, data_stream='flux_slow')
+    exclude_files = [
+        _escape_rclone_glob(file_name=file.name.removesuffix(suffix))
+        for suffix in ARCHIVE_SUFFIXES
+        for file in local_path.glob(f'*{suffix}')
+        ]
     _move_site_data_stream(
-        site=site, stream='flux_slow', which_way='from_remote'
+        site=site, stream='flux_slow', exclude_files=exclude_files,
+        which_way='from_remote'
         )
     logging.info('Done')
 #------------------------------------------------------------------------------
@@ -108,9 +132,19 @@ def push_status_files():
 #------------------------------------------------------------------------------
 def push_fast_flux(site):
 
+    # The TOA5 text files of days that are in the columnar archive are not
+    # pushed (it holds the same data in far fewer bytes)
     logging.info(f'Begin move of {site} fast data to UQRDM flux archive')
+    local_path = PATHS.get_local_data_path(site=site, data_stream='flux_fast')
+    exclude_files = _get_columnar_day_excludes(local_path=local_path)
+    if exclude_files:
+        logging.info(
+            f'Columnar archive found - excluding TOA5 files for '
+            f'{len(exclude_files)} days'
+            )
     _move_site_data_stream(
-        site=site, stream='flux_fast', exclude_dirs=['TMP'], timeout=1200
+        site=site, stream='flux_fast', exclude_dirs=['TMP'],
+        exclude_files=exclude_files, timeout=1200
         )
     logging.info('Done.')
 #------------------------------------------------------------------------------
@@ -118,8 +152,13 @@ def push_fast_flux(site):
 #------------------------------------------------------------------------------
 def push_slow_flux(site):
 
+    # The local archives of old backups are not pushed (the remote keeps the
+    # uncompressed originals)
     logging.info(f'Begin move of {site} slow flux data to UQRDM')
-    _move_site_data_stream(site=site, stream='flux_slow')
+    _move_site_data_stream(
+        site=site, stream='flux_slow',
+        exclude_files=[f'*{suffix}' for suffix in ARCHIVE_SUFFIXES]
+        )
     logging.info('Done.')
 #------------------------------------------------------------------------------
 
@@ -141,7 +180,8 @@ def push_rtmc(site):
 
 #------------------------------------------------------------------------------
 def _move_site_data_stream(
-        site, stream, exclude_dirs=None, which_way='to_remote', timeout=600
+        site, stream, exclude_dirs=None, exclude_files=None,
+        which_way='to_remote', timeout=600
         ):
 
     local_path = _reformat_path_str(
@@ -152,7 +192,8 @@ def _move_site_data_stream(
         )
     generic_move(
         local_location=local_path, remote_location=remote_path,
-        exclude_dirs=exclude_dirs, which_way=which_way, timeout=timeout
+        exclude_dirs=exclude_dirs, exclude_files=exclude_files,
+        which_way=which_way, timeout=timeout
         )
 #------------------------------------------------------------------------------
 
@@ -175,6 +216,47 @@ def _add_rclone_exclude(exclude_dirs):
     return this_list
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def _get_columnar_day_excludes(local_path):
+
+    # Columnar files are named <site>_<freq>_<YYYY>_<MM>_<DD> (as the raw
+    # daily file) in <YYYY>_<MM> directories; the TOA5 files converted from
+    # the same raw file are named TOA5_<site>_<freq>_... in
+    # TOA5/<YYYY>_<MM>/<DD> directories
+    exclude_files = []
+    for file in sorted(
+            (local_path / COLUMNAR_DIR).glob(f'*/*{COLUMNAR_SUFFIX}')
+            ):
+        elems = file.stem.split('_')
+        prefix, (year, month, day) = '_'.join(elems[:-3]), elems[-3:]
+        exclude_files.append(
+            f'/TOA5/{year}_{month}/{day}/'
+            f'TOA5_{_escape_rclone_glob(file_name=prefix)}_*'
+            )
+    return exclude_files
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _write_rclone_filter_file(exclude_files):
+
+    # Patterns (one per line) match file names in any directory, unless
+    # anchored to the transfer root with a leading slash
+    with tempfile.NamedTemporaryFile(
+            mode='w', suffix='.txt', delete=False
+            ) as f:
+        for pattern in exclude_files:
+            f.write(f'{pattern}\n')
+    return f.name
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _escape_rclone_glob(file_name):
+
+    return ''.join(
+        f'\\{char}' if char in '*?[]{}' else char for char in file_name
+        )
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def _reformat_path_str(path_str):
 
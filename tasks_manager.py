@@ -35,6 +35,8 @@ sys.path.append(
 import ds_builder as dbuild
 import eddy_pro_concatenator as epc
 import file_constructors as fc
+import file_handler as fh
+import file_io as io
 import network_status_parser as nsp
 import paths_manager as pm
 import process_10hz_data as ptd
@@ -47,6 +49,20 @@ import rclone_transfer as rt
 
 PathsManager = pm.Paths()
 LOG_BYTE_LIMIT = 10**6
+io.set_parse_cache(
+    cache_dir=PathsManager.get_local_resource_path(resource='parse_cache')
+    )
+io.set_sidecar_cache(
+    cache_dir=PathsManager.get_local_resource_path(resource='sidecar_cache')
+    )
+N_WORKERS_10HZ = int(
+    PathsManager.get_processing_setting(
+        setting='reformat_10Hz_n_workers', fallback=1
+        )
+    )
+ARCHIVE_FORMAT_10HZ = PathsManager.get_processing_setting(
+    setting='reformat_10Hz_archive_format', fallback='TOA5'
+    )
 
 #------------------------------------------------------------------------------
 ### FUNCTIONS ###
@@ -151,6 +167,11 @@ class TasksManager():
 
         tasks_dict = {
 
+            'archive_backups': {
+                'func': archive_backups,
+                'args': site_only
+                },
+
             'concat_EddyPro_data': {
                 'func': concat_EddyPro_data,
                 'args': site_only
@@ -186,6 +207,16 @@ class TasksManager():
                 'args': site_only
                 },
 
+            'quicklook_10Hz_main': {
+                'func': ptd.update_quicklook_stats,
+                'args': {'site': site, 'system': 'main'}
+                },
+
+            'quicklook_10Hz_under': {
+                'func': ptd.update_quicklook_stats,
+                'args': {'site': site, 'system': 'under'}
+                },
+
             'Rclone_pull_slow_rdm': {
                 'func': rt.pull_slow_flux,
                 'args': site_only
@@ -218,12 +249,20 @@ class TasksManager():
 
             'reformat_10Hz_main': {
                 'func': ptd.main,
-                'args': {'site': site, 'system': 'main'}
+                'args': {
+                    'site': site, 'system': 'main',
+                    'n_workers': N_WORKERS_10HZ,
+                    'archive_format': ARCHIVE_FORMAT_10HZ
+                    }
                 },
 
             'reformat_10Hz_under': {
                 'func': ptd.main,
-                'args': {'site': site, 'system': 'under'}
+                'args': {
+                    'site': site, 'system': 'under',
+                    'n_workers': N_WORKERS_10HZ,
+                    'archive_format': ARCHIVE_FORMAT_10HZ
+                    }
                 },
 
             }
@@ -241,6 +280,33 @@ class TasksManager():
 ### FUNCTIONS ###
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def archive_backups(site):
+    """
+    Compress in place the TOA5 backups and EddyPro summary files in the slow
+    flux data directory that have not been modified recently (all file_io
+    readers read the archives transparently). The archives are kept local:
+    they are excluded from the push to the remote, which retains the
+    uncompressed originals.
+
+    Parameters
+    ----------
+    site : str
+        Site name.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    archives = io.archive_old_files(
+        path=PathsManager.get_local_data_path(data_stream='flux_slow', site=site)
+        )
+    for archive in archives:
+        logging.info(f'Archived {archive.name}')
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def concat_EddyPro_data(site):
 
@@ -379,6 +445,7 @@ def parse_task(task, site=None):
                 tasks.run_task(task=task, site=site)
             except Exception as e:
                 logging.info(f'Task failed with the following error: {e}')
+            logger.info(f'DataHandler cache: {fh.get_handler_cache_stats()}')
             logger.info('Task complete\n')
             logger.handlers.clear()
     else:
@@ -388,6 +455,7 @@ def parse_task(task, site=None):
             tasks.run_task(task=task, site=site)
         except Exception as e:
             logging.info(f'Task failed with the following error: {e}')
+        logger.info(f'DataHandler cache: {fh.get_handler_cache_stats()}')
         logger.info('Task complete\n')
         logger.handlers.clear()
 
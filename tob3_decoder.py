@@ -0,0 +1,719 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 10:02:17 2026
+
+Decoder for Campbell Scientific TOB3 binary files (as written to card by the
+CRBasic loggers for the 10Hz eddy covariance tables), replacing conversion to
+TOA5 with the CardConvert utility.
+
+A TOB3 file consists of six comma-separated ASCII header lines followed by
+fixed-size data frames:
+
+    1. file info: format, station, logger model, serial number, OS version,
+       program name, program signature, file creation time;
+    2. table info: table name, record interval (e.g. `100 MSEC`), frame size
+       (bytes), intended table size, validation stamp, frame time resolution
+       (e.g. `Sec100Usec`) ...;
+    3. field names;
+    4. field units;
+    5. field processing (e.g. `Smp`);
+    6. field data types (e.g. `FP2`, `IEEE4`, `ULONG`).
+
+Each frame has a 12-byte header (seconds since 1990-01-01, sub-seconds in
+units of the frame time resolution and the record number of the first record
+in the frame; all little-endian uint32), as many fixed-size records as fit,
+and a 4-byte little-endian footer (bits 0-10 minor frame size in bytes, then
+the file mark, remove mark, empty frame and minor frame flags, and the
+validation stamp in bits 16-31). The timestamp of each record is the frame
+timestamp plus the record interval times its position in the frame.
+
+Frames are decoded in bulk by viewing the file as a 2D array of frames, with
+only minor (partially filled) frames walked individually.
+"""
+
+import pathlib
+import re
+
+import numpy as np
+import pandas as pd
+
+import file_io as io
+
+###############################################################################
+### CONSTANTS ###
+###############################################################################
+
+
+
+TOB3_EPOCH = np.datetime64('1990-01-01T00:00:00', 'ns')
+
+HEADER_LINES = 6
+
+FRAME_HEADER_BYTES = 12
+
+FRAME_FOOTER_BYTES = 4
+
+# Footer bit layout (after the 11-bit minor frame size)
+FOOTER_FLAGS = {
+    'file_mark': 11, 'remove_mark': 12, 'empty_frame': 13, 'minor_frame': 14
+    }
+
+FOOTER_OFFSET_MASK = 0x7FF
+
+# Numpy dtypes of the TOB3 field data types (FP2 is decoded after reading
+# as big-endian uint16; ASCII fields are declared as `ASCII(n)`)
+FIELD_DTYPES = {
+    'FP2': '>u2',
+    'IEEE4': '<f4',
+    'IEEE4L': '<f4',
+    'IEEE4B': '>f4',
+    'IEEE8': '<f8',
+    'IEEE8L': '<f8',
+    'IEEE8B': '>f8',
+    'ULONG': '<u4',
+    'LONG': '<i4',
+    'UINT4': '>u4',
+    'INT4': '>i4',
+    'UINT2': '>u2',
+    'INT2': '>i2',
+    'BOOL': 'u1',
+    'BOOL2': '>u2',
+    'BOOL4': '<u4',
+    }
+
+# FP2 special values (raw big-endian words)
+FP2_SPECIALS = {0x1FFF: np.inf, 0x9FFF: -np.inf, 0x9FFE: np.nan}
+
+# Frame time resolution (ns per sub-second tick)
+FRAME_RESOLUTIONS = {
+    'SecMsec': 10**6,
+    'Sec100Usec': 10**5,
+    'Sec10Usec': 10**4,
+    'SecUsec': 10**3,
+    'SecNano': 1
+    }
+
+# Record interval units (ns)
+INTERVAL_UNITS = {
+    'NSEC': 1,
+    'USEC': 10**3,
+    'MSEC': 10**6,
+    'SEC': 10**9,
+    'MIN': 60 * 10**9,
+    'HR': 3600 * 10**9,
+    'HOUR': 3600 * 10**9,
+    'DAY': 86400 * 10**9
+    }
+
+OUTPUT_FORMATS = ['TOA5', 'parquet']
+
+
+
+###############################################################################
+### FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN HEADER FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def get_header(file: str | pathlib.Path) -> dict:
+    """Parse the ASCII header of a TOB3 file.
+
+    Args:
+        file: absolute path to TOB3 file.
+
+    Raises:
+        RuntimeError: if the file is not a TOB3 file.
+
+    Returns:
+        The file info, table info, field attributes (as dataframe indexed on
+            field name), record dtype and size, and the header size in bytes.
+
+    """
+
+    with open(file, 'rb') as f:
+        lines = [f.readline() for i in range(HEADER_LINES)]
+        header_bytes = f.tell()
+    lines = [
+        [elem.strip('"') for elem in line.decode().strip().split(',')]
+        for line in lines
+        ]
+    if not lines[0][0] == 'TOB3':
+        raise RuntimeError(f'{pathlib.Path(file).name} is not a TOB3 file!')
+    table_line = lines[1]
+    fields = pd.DataFrame(
+        data={
+            'units': lines[3],
+            'sampling': lines[4],
+            'data_type': lines[5]
+            },
+        index=pd.Index(lines[2], name='variable')
+        )
+    record_dtype = get_record_dtype(data_types=fields.data_type.tolist())
+    return {
+        'info': dict(zip(io.INFO_FIELDS, lines[0][:7] + [table_line[0]])),
+        'table_name': table_line[0],
+        'interval_ns': _parse_interval(table_line[1]),
+        'frame_bytes': int(table_line[2]),
+        'validation_stamp': int(table_line[4]),
+        'resolution_ns': FRAME_RESOLUTIONS[table_line[5]],
+        'fields': fields,
+        'record_dtype': record_dtype,
+        'record_bytes': record_dtype.itemsize,
+        'header_bytes': header_bytes
+        }
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def get_record_dtype(data_types: list) -> np.dtype:
+    """Build the structured (packed) numpy dtype of a TOB3 record.
+
+    Args:
+        data_types: the TOB3 data types of the fields.
+
+    Raises:
+        KeyError: if a data type is not supported.
+
+    Returns:
+        The record dtype (fields are named by position).
+
+    """
+
+    formats = []
+    for data_type in data_types:
+        ascii_match = re.fullmatch(r'ASCII\((\d+)\)', data_type)
+        if ascii_match:
+            formats.append(f'S{ascii_match.group(1)}')
+            continue
+        try:
+            formats.append(FIELD_DTYPES[data_type])
+        except KeyError as e:
+            raise KeyError(f'Unsupported TOB3 data type: {data_type}') from e
+    return np.dtype({
+        'names': [f'f{i}' for i in range(len(formats))],
+        'formats': formats
+        })
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _parse_interval(interval: str) -> int:
+    """Parse the TOB3 record interval string (e.g. `100 MSEC`) to ns.
+
+    Args:
+        interval: the interval string.
+
+    Returns:
+        The interval in ns.
+
+    """
+
+    value, units = interval.split()
+    return int(value) * INTERVAL_UNITS[units.upper()]
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END HEADER FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN FRAME DECODING FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def get_data(file: str | pathlib.Path, header: dict=None) -> pd.DataFrame:
+    """Decode the data frames of a TOB3 file.
+
+    Args:
+        file: absolute path to TOB3 file.
+        header: the parsed header (from get_header). Parsed if not supplied.
+            The default is None.
+
+    Returns:
+        The data, with DatetimeIndex (named TIMESTAMP), sorted and with
+            duplicate records (e.g. from ring memory wrap) removed. The record
+            number is included as column `RECORD`.
+
+    """
+
+    if header is None:
+        header = get_header(file=file)
+    raw = np.fromfile(file, dtype='u1', offset=header['header_bytes'])
+    n_frames = len(raw) // header['frame_bytes']
+    frames = raw[:n_frames * header['frame_bytes']].reshape(
+        n_frames, header['frame_bytes']
+        )
+    footers = _get_footers(frames=frames)
+    valid = _get_valid_frames(footers=footers, header=header)
+
+    # Full frames in bulk, minor frames (if any) walked individually
+    is_minor = footers['minor_frame'] & valid
+    is_major = ~footers['minor_frame'] & valid
+    pieces = [_decode_major_frames(frames=frames[is_major], header=header)]
+    for frame in frames[is_minor]:
+        pieces.append(_decode_minor_frame(frame=frame, header=header))
+    records, times, record_nums = (
+        np.concatenate([piece[i] for piece in pieces]) for i in range(3)
+        )
+
+    # Sort and drop duplicate records
+    order = np.argsort(times, kind='stable')
+    times, record_nums, records = (
+        times[order], record_nums[order], records[order]
+        )
+    keep = np.ones(len(times), dtype=bool)
+    keep[1:] = np.diff(times.view('i8')) > 0
+    return _build_frame(
+        records=records[keep],
+        times=times[keep],
+        record_nums=record_nums[keep],
+        fields=header['fields']
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_footers(frames: np.ndarray) -> dict:
+    """Get the footer attributes of each frame.
+
+    Args:
+        frames: 2D (n_frames x frame_bytes) uint8 array.
+
+    Returns:
+        Minor frame size, flags and validation stamp, as arrays.
+
+    """
+
+    footer = (
+        np.ascontiguousarray(frames[:, -FRAME_FOOTER_BYTES:])
+        .view('<u4')
+        .ravel()
+        )
+    rslt = {
+        flag: ((footer >> bit) & 1).astype(bool)
+        for flag, bit in FOOTER_FLAGS.items()
+        }
+    rslt['offset'] = footer & FOOTER_OFFSET_MASK
+    rslt['validation_stamp'] = footer >> 16
+    return rslt
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_valid_frames(footers: dict, header: dict) -> np.ndarray:
+    """Check frame footers against the validation stamp in the header (the
+    logger alternates between the stamp and its complement as the ring
+    memory wraps; unwritten or corrupt frames match neither).
+
+    Args:
+        footers: the footer attributes (from _get_footers).
+        header: the parsed header.
+
+    Returns:
+        Boolean array, True for frames with data.
+
+    """
+
+    stamp = header['validation_stamp']
+    return (
+        np.isin(footers['validation_stamp'], [stamp, 0xFFFF ^ stamp]) &
+        ~footers['empty_frame']
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _decode_major_frames(frames: np.ndarray, header: dict) -> tuple:
+    """Decode full frames.
+
+    Args:
+        frames: 2D (n_frames x frame_bytes) uint8 array of valid full frames.
+        header: the parsed header.
+
+    Returns:
+        Records (structured array), timestamps (datetime64[ns]) and record
+            numbers.
+
+    """
+
+    record_bytes = header['record_bytes']
+    n_per_frame = (
+        (header['frame_bytes'] - FRAME_HEADER_BYTES - FRAME_FOOTER_BYTES) //
+        record_bytes
+        )
+    records = (
+        np.ascontiguousarray(
+            frames[
+                :,
+                FRAME_HEADER_BYTES:
+                FRAME_HEADER_BYTES + n_per_frame * record_bytes
+                ]
+            )
+        .view(header['record_dtype'])
+        .ravel()
+        )
+    times, record_nums = _get_record_times(
+        frame_headers=frames[:, :FRAME_HEADER_BYTES],
+        n_records=np.full(len(frames), n_per_frame),
+        header=header
+        )
+    return records, times, record_nums
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _decode_minor_frame(frame: np.ndarray, header: dict) -> tuple:
+    """Decode a major frame made up of minor frames (each with own header and
+    footer) by walking back from the last footer.
+
+    Args:
+        frame: 1D uint8 array of the major frame.
+        header: the parsed header.
+
+    Returns:
+        Records (structured array), timestamps (datetime64[ns]) and record
+            numbers.
+
+    """
+
+    record_bytes = header['record_bytes']
+    pieces = []
+    end = len(frame)
+    while end > FRAME_HEADER_BYTES + FRAME_FOOTER_BYTES:
+        footers = _get_footers(frames=frame[None, :end])
+        size = int(footers['offset'][0])
+        if (
+            size < FRAME_HEADER_BYTES + FRAME_FOOTER_BYTES or size > end or
+            not _get_valid_frames(footers=footers, header=header)[0]
+            ):
+            break
+        minor = frame[end - size: end]
+        n_records = (
+            (size - FRAME_HEADER_BYTES - FRAME_FOOTER_BYTES) // record_bytes
+            )
+        records = (
+            np.ascontiguousarray(
+                minor[
+                    FRAME_HEADER_BYTES:
+                    FRAME_HEADER_BYTES + n_records * record_bytes
+                    ]
+                )
+            .view(header['record_dtype'])
+            )
+        times, record_nums = _get_record_times(
+            frame_headers=minor[None, :FRAME_HEADER_BYTES],
+            n_records=np.array([n_records]),
+            header=header
+            )
+        pieces.insert(0, (records, times, record_nums))
+        if not footers['minor_frame'][0]:
+            break
+        end -= size
+    if not pieces:
+        return (
+            np.empty(0, dtype=header['record_dtype']),
+            np.empty(0, dtype='datetime64[ns]'),
+            np.empty(0, dtype='u4')
+            )
+    return tuple(
+        np.concatenate([piece[i] for piece in pieces]) for i in range(3)
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_record_times(
+        frame_headers: np.ndarray, n_records: np.ndarray, header: dict
+        ) -> tuple:
+    """Get the timestamps and record numbers of the records in frames.
+
+    Args:
+        frame_headers: 2D (n_frames x 12) uint8 array of frame headers.
+        n_records: number of records in each frame.
+        header: the parsed header.
+
+    Returns:
+        Timestamps (datetime64[ns]) and record numbers of each record.
+
+    """
+
+    frame_header = (
+        np.ascontiguousarray(frame_headers).view('<u4').reshape(-1, 3)
+        )
+    frame_ns = (
+        frame_header[:, 0].astype('i8') * 10**9 +
+        frame_header[:, 1].astype('i8') * header['resolution_ns']
+        )
+    position = (
+        np.arange(n_records.sum()) -
+        np.repeat(np.cumsum(n_records) - n_records, n_records)
+        )
+    times = (
+        TOB3_EPOCH +
+        (np.repeat(frame_ns, n_records) + position * header['interval_ns'])
+        .astype('m8[ns]')
+        )
+    record_nums = np.repeat(frame_header[:, 2], n_records) + position
+    return times, record_nums.astype('u4')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def decode_fp2(raw: np.ndarray) -> np.ndarray:
+    """Decode Campbell FP2 values (big-endian 16-bit words: sign bit, 2-bit
+    negative decimal exponent and 13-bit mantissa).
+
+    Args:
+        raw: the raw FP2 words (as unsigned integers).
+
+    Returns:
+        Decoded values (float64).
+
+    """
+
+    raw = np.asarray(raw, dtype='u2')
+    mantissa = (raw & 0x1FFF).astype('f8')
+    exponent = (raw >> 13) & 0x3
+    values = mantissa / np.array([1, 10, 100, 1000], dtype='f8')[exponent]
+    values[raw >> 15 == 1] *= -1
+    for word, value in FP2_SPECIALS.items():
+        values[raw == word] = value
+    return values
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _build_frame(
+        records: np.ndarray, times: np.ndarray, record_nums: np.ndarray,
+        fields: pd.DataFrame
+        ) -> pd.DataFrame:
+    """Build the output dataframe from decoded records.
+
+    Args:
+        records: the records (structured array).
+        times: the record timestamps.
+        record_nums: the record numbers.
+        fields: the field attributes.
+
+    Returns:
+        The data.
+
+    """
+
+    data = {'RECORD': record_nums.astype('i8')}
+    for i, (variable, data_type) in enumerate(fields.data_type.items()):
+        values = records[f'f{i}']
+        if data_type == 'FP2':
+            values = decode_fp2(raw=values)
+        elif values.dtype.kind == 'S':
+            values = np.char.decode(
+                np.char.rstrip(values, b'\x00'), 'ascii', errors='replace'
+                ).astype(object)
+        else:
+            values = values.astype(values.dtype.newbyteorder('='))
+        data[variable] = values
+    return pd.DataFrame(
+        data=data, index=pd.DatetimeIndex(times, name='TIMESTAMP')
+        )
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END FRAME DECODING FUNCTIONS ###
+###############################################################################
+
+
+
+###############################################################################
+### BEGIN CONVERSION FUNCTIONS ###
+###############################################################################
+
+#------------------------------------------------------------------------------
+def convert_file(
+        file: str | pathlib.Path, output_path: str | pathlib.Path,
+        time_step: int, output_format: str='TOA5', record_nums: bool=False,
+        header: dict=None, data: pd.DataFrame=None
+        ) -> list:
+    """Convert a TOB3 file to per-interval output files, named as CardConvert
+    names baled output (`TOA5_<TOB3 file stem>_<YYYY>_<MM>_<DD>_<HHMM>.dat`,
+    with the time being the start of the interval), so that
+    ConvertedFileHandler.get_destination_path applies unchanged.
+
+    Args:
+        file: absolute path to TOB3 file.
+        output_path: directory to write the output files to.
+        time_step: interval (minutes) of the output files.
+        output_format: `TOA5` (as CardConvert) or `parquet` (columnar, see
+            file_io.write_columnar_file; written with `.parquet` suffix).
+            The default is 'TOA5'.
+        record_nums: whether to include the record numbers. The default is
+            False (as the CardConvert configuration in process_10hz_data).
+        header: the file header (see get_header), if already read. The
+            default is None.
+        data: the decoded data (see get_data), if already decoded (so that a
+            file written to several formats is decoded only once). The default
+            is None.
+
+    Raises:
+        KeyError: if the output format is not supported.
+
+    Returns:
+        List of the files written.
+
+    """
+
+    if not output_format in OUTPUT_FORMATS:
+        raise KeyError(
+            f'output_format must be one of {", ".join(OUTPUT_FORMATS)}'
+            )
+    file = pathlib.Path(file)
+    if header is None:
+        header = get_header(file=file)
+    if data is None:
+        data = get_data(file=file, header=header)
+    if not record_nums:
+        data = data.drop('RECORD', axis=1)
+    headers = _get_output_headers(
+        fields=header['fields'], record_nums=record_nums
+        )
+    bales = data.index.floor(f'{time_step}min')
+    suffix = '.dat' if output_format == 'TOA5' else io.COLUMNAR_SUFFIX
+    files = []
+    for bale_start, bale_data in data.groupby(bales, sort=True):
+        output_file = (
+            pathlib.Path(output_path) /
+            f'TOA5_{file.stem}_{bale_start.strftime("%Y_%m_%d_%H%M")}{suffix}'
+            )
+        _write_bale(
+            data=bale_data,
+            headers=headers,
+            info=header['info'],
+            abs_file_path=output_file,
+            output_format=output_format
+            )
+        files.append(output_file)
+    return files
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def write_columnar_file(
+        file: str | pathlib.Path, abs_file_path: str | pathlib.Path,
+        chunk_interval: str=io.COLUMNAR_CHUNK_INTERVAL, header: dict=None,
+        data: pd.DataFrame=None
+        ):
+    """Convert a TOB3 file to a single columnar file (typed columns, one row
+    group per chunk interval, see file_io.write_columnar_file).
+
+    Args:
+        file: absolute path to TOB3 file.
+        abs_file_path: absolute path (including file name) to write to.
+        chunk_interval: the time interval of the row groups. The default is
+            file_io.COLUMNAR_CHUNK_INTERVAL.
+        header: the file header (see get_header), if already read. The
+            default is None.
+        data: the decoded data (see get_data), if already decoded. The
+            default is None.
+
+    Returns:
+        None.
+
+    """
+
+    if header is None:
+        header = get_header(file=file)
+    if data is None:
+        data = get_data(file=file, header=header)
+    io.write_columnar_file(
+        data=data.drop('RECORD', axis=1),
+        headers=header['fields'][['units', 'sampling']],
+        abs_file_path=abs_file_path,
+        info=header['info'],
+        chunk_interval=chunk_interval
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _get_output_headers(
+        fields: pd.DataFrame, record_nums: bool=False
+        ) -> pd.DataFrame:
+    """Get the TOA5 headers (with timestamp and, optionally, record number).
+
+    Args:
+        fields: the field attributes.
+        record_nums: whether to include the record number.
+
+    Returns:
+        The headers.
+
+    """
+
+    index = {'TIMESTAMP': ['TS', '']}
+    if record_nums:
+        index['RECORD'] = ['RN', '']
+    return pd.concat([
+        pd.DataFrame.from_dict(
+            index, orient='index', columns=['units', 'sampling']
+            ),
+        fields[['units', 'sampling']]
+        ]).rename_axis('variable')
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def _write_bale(
+        data: pd.DataFrame, headers: pd.DataFrame, info: dict,
+        abs_file_path: pathlib.Path, output_format: str
+        ):
+    """Write a single interval of data to file.
+
+    Args:
+        data: the data, with DatetimeIndex.
+        headers: the TOA5 headers.
+        info: the TOA5 file info.
+        abs_file_path: absolute path (including file name) to write to.
+        output_format: `TOA5` or `parquet`.
+
+    Returns:
+        None.
+
+    """
+
+    if output_format == 'parquet':
+        io.write_columnar_file(
+            data=data, headers=headers.drop('TIMESTAMP'),
+            abs_file_path=abs_file_path, info=info
+            )
+        return
+    # Write IEEE4 values at float32 precision (as CardConvert)
+    data = data.copy()
+    float32_cols = data.select_dtypes(include='float32').columns
+    data[float32_cols] = data[float32_cols].astype(str).astype('float64')
+    data.insert(0, 'TIMESTAMP', format_timestamps(index=data.index))
+    io.write_data_to_file(
+        headers=headers,
+        data=data,
+        abs_file_path=abs_file_path,
+        output_format='TOA5',
+        info={**info, 'format': 'TOA5'},
+        float_precision=None
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def format_timestamps(index: pd.DatetimeIndex) -> np.ndarray:
+    """Format timestamps as CardConvert does (fractional seconds written only
+    where non-zero, without trailing zeros).
+
+    Args:
+        index: the timestamps.
+
+    Returns:
+        Timestamp strings.
+
+    """
+
+    strings = pd.Series(
+        np.datetime_as_string(index.values, unit='ns')
+        ).str.replace('T', ' ').str.rstrip('0').str.rstrip('.')
+    return strings.to_numpy(dtype=object)
+#------------------------------------------------------------------------------
+
+###############################################################################
+### END CONVERSION FUNCTIONS ###
+###############################################################################